@@ -0,0 +1,250 @@
+"""Benchmarks of the api calls, wall time and peak memory of the methods of
+Operator, run against a FakeClient injecting a latency in every api call.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 10 100 --cases clean_dataset
+    python -m benchmarks.run_benchmarks --sizes 10000 \
+        --cases run_queries clean_dataset
+    python -m benchmarks.run_benchmarks --update
+
+Each case is run for every number of tables of ``--sizes`` and, for the
+cases which pack queries, every batch size of ``--batch-sizes``. In the
+cases which run jobs, each job is done at its ``--job-polls``-th poll, so
+that the polls of the running jobs are counted, the same whatever the
+wall time. The results are compared with the baselines stored in
+benchmarks/baselines.json: a case regresses if it makes more api calls than
+its baseline, or if its wall time or peak memory exceed the baseline by
+more than ``--tolerance``. The exit code is 1 if a case regresses. With
+``--update``, the baselines of the cases run are replaced by the results.
+The stored baselines cover 10, 100 and 1000 tables, and 10000 tables for
+the run_queries and clean_dataset cases: the results without baseline are
+printed but never count as regressions.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Optional, List, Dict, Callable
+from google.cloud import bigquery
+from bigquery_operator import Operator, FakeClient, RetryPolicy
+
+DATASET_ID = 'project_id.dataset_name'
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+SCHEMA = [bigquery.SchemaField('a', 'STRING'),
+          bigquery.SchemaField('b', 'INTEGER')]
+EVOLVED_SCHEMA = SCHEMA + [bigquery.SchemaField('c', 'DATE')]
+
+
+def build_table_names(nb_tables: int) -> List[str]:
+    return [f'table_name_{i}' for i in range(nb_tables)]
+
+
+def create_tables(
+        operator: Operator,
+        nb_tables: int,
+        schemas: Optional[List[List[bigquery.SchemaField]]] = None) -> None:
+    operator.create_dataset('EU')
+    if schemas is None:
+        schemas = [SCHEMA]
+    for i, n in enumerate(build_table_names(nb_tables)):
+        operator.create_empty_table(n, schema=schemas[i % len(schemas)])
+
+
+def setup_mismatches(operator: Operator, nb_tables: int) -> None:
+    create_tables(operator, nb_tables, [SCHEMA, SCHEMA[:1]])
+    operator.create_empty_table('reference', schema=SCHEMA)
+
+
+def setup_evolutions(operator: Operator, nb_tables: int) -> None:
+    create_tables(operator, nb_tables)
+    operator.create_empty_table('reference', schema=EVOLVED_SCHEMA)
+
+
+def delete_tables_if_mismatch(
+        operator: Operator,
+        nb_tables: int,
+        evolve_schema: bool) -> None:
+    for n in build_table_names(nb_tables):
+        operator.delete_table_if_mismatches('reference', n, evolve_schema)
+
+
+def run_queries(
+        operator: Operator,
+        nb_tables: int,
+        batch_size: Optional[int],
+        inline_time_to_live: bool) -> None:
+    operator.run_queries(
+        queries=['select 1 as x'] * nb_tables,
+        destination_table_names=build_table_names(nb_tables),
+        time_to_live=2,
+        inline_time_to_live=inline_time_to_live,
+        pack_size=batch_size)
+
+
+CASES = {
+    'create_dataset_if_not_exist/new': (
+        lambda o, n: None,
+        lambda o, n, b: o.create_dataset_if_not_exist('EU')),
+    'create_dataset_if_not_exist/existing': (
+        create_tables,
+        lambda o, n, b: o.create_dataset_if_not_exist('EU')),
+    'delete_table_if_mismatches': (
+        setup_mismatches,
+        lambda o, n, b: delete_tables_if_mismatch(o, n, False)),
+    'delete_table_if_mismatches/evolve_schema': (
+        setup_evolutions,
+        lambda o, n, b: delete_tables_if_mismatch(o, n, True)),
+    'run_queries/time_to_live': (
+        lambda o, n: o.create_dataset('EU'),
+        lambda o, n, b: run_queries(o, n, b, False)),
+    'run_queries/inline_time_to_live': (
+        lambda o, n: o.create_dataset('EU'),
+        lambda o, n, b: run_queries(o, n, b, True)),
+    'clean_dataset/delete_tables': (
+        create_tables,
+        lambda o, n, b: o.clean_dataset()),
+    'clean_dataset/auto': (
+        create_tables,
+        lambda o, n, b: o.clean_dataset(mode='auto')),
+}
+BATCHED_CASES = ['run_queries/time_to_live']
+JOB_CASES = ['run_queries/time_to_live', 'run_queries/inline_time_to_live']
+
+
+def run_case(
+        setup: Callable,
+        run: Callable,
+        nb_tables: int,
+        batch_size: Optional[int],
+        latency: float,
+        nb_job_polls: Optional[int],
+        max_workers: int) -> dict:
+    """Run a case with a FakeClient and return its api calls by method,
+    their number, the wall time in seconds and the peak memory in MB."""
+    client = FakeClient(project='project_id', nb_job_polls=nb_job_polls)
+    operator = Operator(
+        client=client,
+        dataset_id=DATASET_ID,
+        max_workers=max_workers,
+        retry_policy=RetryPolicy(initial_delay=0.01))
+    setup(operator, nb_tables)
+    client.reset_calls()
+    client.latency = latency
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        run(operator, nb_tables, batch_size)
+        wall_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'calls': dict(sorted(client.calls.items())),
+        'nb_calls': client.nb_calls,
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_memory_mb': round(peak / 2 ** 20, 3)}
+
+
+def build_key(case: str, nb_tables: int, batch_size: Optional[int]) -> str:
+    return f'{case}[nb_tables={nb_tables},batch_size={batch_size}]'
+
+
+def find_regressions(
+        result: dict,
+        baseline: Optional[dict],
+        tolerance: float) -> List[str]:
+    """Return the descriptions of the metrics of a result which regress
+    compared to its baseline. Wall time and memory differences below 0.1
+    seconds and 1 MB are ignored."""
+    if baseline is None:
+        return []
+    res = []
+    if result['nb_calls'] > baseline['nb_calls']:
+        res.append(f"nb_calls {baseline['nb_calls']} -> {result['nb_calls']}")
+    for metric, margin in [('wall_seconds', 0.1), ('peak_memory_mb', 1)]:
+        limit = max(baseline[metric] * (1 + tolerance),
+                    baseline[metric] + margin)
+        if result[metric] > limit:
+            res.append(f'{metric} {baseline[metric]} -> {result[metric]}')
+    return res
+
+
+def load_baselines(path: str) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def parse_batch_size(value: str) -> Optional[int]:
+    return None if value == 'none' else int(value)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 100, 1000],
+        help='numbers of tables, such as 10000 for a long run')
+    parser.add_argument(
+        '--batch-sizes', type=parse_batch_size, nargs='+',
+        default=[None, 100],
+        help="pack sizes of the batched cases, 'none' for no packing")
+    parser.add_argument(
+        '--cases', nargs='+', default=None,
+        help='run only the cases whose names contain one of these strings')
+    parser.add_argument(
+        '--latency', type=float, default=0.001,
+        help='duration of every api call, in seconds')
+    parser.add_argument(
+        '--job-polls', type=int, default=3,
+        help='number of polls after which every job of the cases which '
+             'run jobs is done')
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument(
+        '--tolerance', type=float, default=0.5,
+        help='relative increase of wall time and memory counted as a '
+             'regression')
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    parser.add_argument(
+        '--update', action='store_true',
+        help='store the results as the new baselines')
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baselines)
+    nb_regressions = 0
+    for case, (setup, run) in CASES.items():
+        if args.cases and not any(c in case for c in args.cases):
+            continue
+        batch_sizes = args.batch_sizes if case in BATCHED_CASES else [None]
+        nb_job_polls = args.job_polls if case in JOB_CASES else None
+        for nb_tables in args.sizes:
+            for batch_size in batch_sizes:
+                key = build_key(case, nb_tables, batch_size)
+                result = run_case(setup, run, nb_tables, batch_size,
+                                  args.latency, nb_job_polls,
+                                  args.max_workers)
+                regressions = find_regressions(
+                    result, baselines.get(key), args.tolerance)
+                nb_regressions += bool(regressions)
+                status = 'REGRESSION ' + ', '.join(regressions) \
+                    if regressions else 'ok'
+                print(f"{key}: {result['nb_calls']} calls "
+                      f"({result['nb_calls'] / max(nb_tables, 1):.2f} per "
+                      f"table), {result['wall_seconds']} s, "
+                      f"{result['peak_memory_mb']} MB: {status}")
+                print(f"    {result['calls']}")
+                if args.update:
+                    baselines[key] = result
+    if args.update:
+        with open(args.baselines, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
+    return 1 if nb_regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,2 +1,7 @@
 from bigquery_operator.operator import Operator
 from bigquery_operator.operator_quick_setup import OperatorQuickSetup
+from bigquery_operator.table_cache import TableCache
+from bigquery_operator.retry_policy import RetryPolicy
+from bigquery_operator.table_writer import TableWriter
+from bigquery_operator.job_scheduler import JobScheduler
+from bigquery_operator.fake_client import FakeClient
@@ -0,0 +1,1355 @@
+import copy
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Optional, List, Dict, Union, Iterator, Any, Tuple
+from google.api_core import exceptions
+from google.cloud import bigquery
+
+TableLike = Union[str, bigquery.Table, bigquery.TableReference,
+                  bigquery.table.TableListItem]
+DatasetLike = Union[str, bigquery.Dataset, bigquery.DatasetReference]
+
+ERROR_STATUS_CODES = {
+    'invalid': 400, 'invalidQuery': 400, 'notFound': 404, 'duplicate': 409,
+    'rateLimitExceeded': 403, 'jobRateLimitExceeded': 403,
+    'quotaExceeded': 403, 'backendError': 500, 'stopped': 400}
+
+CREATE_PATTERN = re.compile(
+    r'\s*create\s+(or\s+replace\s+)?table\s+`([^`]+)`\s*'
+    r'(?:options\s*\((.*?)\)\s*)?as\s+(.*)', re.I | re.S)
+ALTER_PATTERN = re.compile(
+    r'\s*alter\s+table\s+`([^`]+)`\s+(.*)', re.I | re.S)
+ALTER_COLUMN_PATTERN = re.compile(
+    r'alter\s+column\s+`?(\w+)`?\s+set\s+data\s+type\s+(\w+)', re.I)
+DROP_PATTERN = re.compile(
+    r'\s*drop\s+table\s+(if\s+exists\s+)?`([^`]+)`\s*', re.I | re.S)
+DML_PATTERN = re.compile(
+    r'\s*(insert|update|delete|merge)\b\s*(?:into\s+|from\s+)?`([^`]+)`',
+    re.I | re.S)
+EXPIRATION_PATTERN = re.compile(
+    r"expiration_timestamp\s*=\s*timestamp\s*'([^']+)'", re.I)
+PARTITIONS_PATTERN = re.compile(r'(.+)\.INFORMATION_SCHEMA\.PARTITIONS', re.I)
+UNNEST_PATTERN = re.compile(r'\bunnest\s*\(\s*(@\w+)\s*\)', re.I)
+
+PARTITIONS_SCHEMA = [
+    bigquery.SchemaField('table_name', 'STRING'),
+    bigquery.SchemaField('partition_id', 'STRING'),
+    bigquery.SchemaField('last_modified_time', 'TIMESTAMP'),
+    bigquery.SchemaField('total_rows', 'INTEGER')]
+
+SQL_TYPES = {
+    'INT64': 'INTEGER', 'FLOAT64': 'FLOAT', 'BOOL': 'BOOLEAN',
+    'STRUCT': 'RECORD', 'DECIMAL': 'NUMERIC', 'BIGDECIMAL': 'BIGNUMERIC'}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _millis(dt: datetime) -> str:
+    return str(int(dt.timestamp() * 1000))
+
+
+def _to_exception(error_result: dict) -> exceptions.GoogleAPICallError:
+    code = ERROR_STATUS_CODES.get(error_result.get('reason'), 400)
+    return exceptions.from_http_status(
+        code, error_result.get('message', ''), errors=[error_result])
+
+
+def _to_error_result(error: Exception) -> dict:
+    if isinstance(error, exceptions.GoogleAPICallError):
+        reason = 'invalid'
+        if error.errors:
+            reason = error.errors[0].get('reason', reason)
+        elif isinstance(error, exceptions.NotFound):
+            reason = 'notFound'
+        elif isinstance(error, exceptions.Conflict):
+            reason = 'duplicate'
+        return {'reason': reason, 'message': error.message}
+    return {'reason': 'invalidQuery', 'message': str(error)}
+
+
+def _infer_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'BOOLEAN'
+    if isinstance(value, int):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'FLOAT'
+    if isinstance(value, Decimal):
+        return 'NUMERIC'
+    if isinstance(value, bytes):
+        return 'BYTES'
+    if isinstance(value, datetime):
+        return 'TIMESTAMP'
+    if isinstance(value, date):
+        return 'DATE'
+    return 'STRING'
+
+
+def _parse_text(value: Optional[str]) -> Any:
+    if value is None or value == '':
+        return None
+    for parse in [int, float]:
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    if value.lower() in ['true', 'false']:
+        return value.lower() == 'true'
+    return value
+
+
+def _to_sqlite(value: Any) -> Any:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _from_sqlite(value: Any, field_type: str) -> Any:
+    if value is None:
+        return None
+    if field_type == 'BOOLEAN':
+        return bool(value)
+    if field_type == 'INTEGER':
+        return int(value)
+    if field_type == 'FLOAT':
+        return float(value)
+    if field_type in ['NUMERIC', 'BIGNUMERIC']:
+        return Decimal(str(value))
+    if field_type == 'DATE':
+        return date.fromisoformat(str(value))
+    if field_type == 'TIMESTAMP':
+        res = datetime.fromisoformat(str(value))
+        if res.tzinfo is None:
+            res = res.replace(tzinfo=timezone.utc)
+        return res
+    if field_type == 'DATETIME':
+        return datetime.fromisoformat(str(value))
+    if field_type == 'RECORD' and isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def _normalize_type(field_type: str) -> str:
+    field_type = field_type.upper()
+    return SQL_TYPES.get(field_type, field_type)
+
+
+class FakeRowIterator(list):
+    """List of bigquery.Row returned by the FakeClient instead of a
+    RowIterator."""
+    def __init__(
+            self,
+            rows: List[bigquery.Row],
+            schema: List[bigquery.SchemaField]) -> None:
+        super().__init__(rows)
+        self.schema = schema
+        self.total_rows = len(rows)
+
+    def to_arrow(self, **kwargs) -> 'pyarrow.Table':
+        import pyarrow
+        names = [f.name for f in self.schema]
+        return pyarrow.Table.from_pydict(
+            {n: [r[n] for r in self] for n in names})
+
+    def to_dataframe(self, **kwargs) -> 'pandas.DataFrame':
+        import pandas
+        names = [f.name for f in self.schema]
+        return pandas.DataFrame([list(r.values()) for r in self],
+                                columns=names)
+
+
+class _FakeJob:
+    def _init_fake(self, client: 'FakeClient') -> None:
+        self._fake_client = client
+        self._fake_error = None
+        self._fake_end = time.monotonic() + client.job_duration
+        self._fake_nb_polls = 0
+        self._fake_rows = None
+        self._fake_children = []
+        now = int(_millis(_now()))
+        self._properties['jobReference']['location'] = client.location
+        self._properties['status'] = {'state': 'RUNNING'}
+        self._properties.setdefault('statistics', {}).update(
+            {'creationTime': now, 'startTime': now, 'totalSlotMs': '0'})
+
+    def _finish_fake(self) -> None:
+        if self._properties['status']['state'] == 'DONE':
+            return
+        status = {'state': 'DONE'}
+        if self._fake_error is not None:
+            status['errorResult'] = self._fake_error
+            status['errors'] = [self._fake_error]
+        self._properties['statistics']['endTime'] = int(_millis(_now()))
+        self._properties['status'] = status
+
+    def reload(self, client=None, retry=None, timeout=None) -> None:
+        self._fake_client._call('get_job')
+        self._fake_nb_polls += 1
+        nb_job_polls = self._fake_client.nb_job_polls
+        if nb_job_polls is not None:
+            if self._fake_nb_polls >= nb_job_polls:
+                self._finish_fake()
+        elif time.monotonic() >= self._fake_end:
+            self._finish_fake()
+
+    def cancel(self, client=None, retry=None, timeout=None) -> bool:
+        self._fake_client._call('cancel_job')
+        if self._properties['status']['state'] != 'DONE':
+            self._fake_error = {
+                'reason': 'stopped',
+                'message': 'Job execution was cancelled: User requested '
+                           'cancellation'}
+            self._finish_fake()
+        return True
+
+    def result(self, *args, **kwargs) -> Any:
+        while not self.done():
+            time.sleep(max(0.0, min(
+                self._fake_end - time.monotonic(), 0.1)))
+        if self.error_result is not None:
+            raise _to_exception(self.error_result)
+        if self._fake_rows is None:
+            return self
+        rows = self._fake_rows
+        max_results = kwargs.get('max_results')
+        if max_results is not None:
+            rows = FakeRowIterator(rows[:max_results], rows.schema)
+        return rows
+
+
+class FakeQueryJob(_FakeJob, bigquery.QueryJob):
+    """QueryJob of the FakeClient."""
+
+
+class FakeCopyJob(_FakeJob, bigquery.CopyJob):
+    """CopyJob of the FakeClient."""
+
+
+class FakeExtractJob(_FakeJob, bigquery.ExtractJob):
+    """ExtractJob of the FakeClient."""
+
+
+class FakeLoadJob(_FakeJob, bigquery.LoadJob):
+    """LoadJob of the FakeClient."""
+
+
+class FakeClient:
+    """Local stand-in for google.cloud.bigquery.Client, which can be passed
+    to Operator to run it without network nor credentials, for instance in
+    tests and benchmarks.
+
+    The datasets and the metadata of the tables are kept in memory and the
+    rows of the tables in an in-memory SQLite database, which executes the
+    queries. The SQL therefore has to be common to BigQuery and SQLite and
+    the tables have to be referenced between backquotes, such as
+    `dataset_name.table_name`. The statements CREATE [OR REPLACE] TABLE AS,
+    ALTER TABLE ALTER COLUMN SET DATA TYPE, DROP TABLE, INSERT, UPDATE and
+    DELETE are supported, as well as scripts of several statements
+    separated by semicolons. Among the INFORMATION_SCHEMA views, only
+    PARTITIONS is supported, each table having a single partition whose id
+    is NULL and whose last_modified_time only changes with its rows. The
+    partition decorators are not supported.
+
+    The Cloud Storage uris 'gs://bucket/path' are mapped to the files
+    'gcs_dir/bucket/path'. The CSV, NEWLINE_DELIMITED_JSON and PARQUET
+    formats are supported, the latter requiring pyarrow.
+
+    Each call to a method of the client, and each poll of a job, is
+    recorded in the property calls under the name of the method, or
+    get_job for the polls. It sleeps ``latency`` seconds, or the latency
+    given for its name in ``latencies``, and fails with an error injected
+    by the method inject_error, or with ServiceUnavailable with probability
+    ``error_rate``. A job is applied when it is inserted but stays running
+    for ``job_duration`` seconds, or until its ``nb_job_polls``-th poll if
+    passed, which makes the number of polls independent of the wall time.
+    Its failure can be injected by the method inject_job_error.
+
+    Args:
+        project (str): The id of the project of the client.
+        location (str): The default location of the datasets.
+        gcs_dir (str): The local directory standing for Cloud Storage. If
+            not passed, a temporary directory is used.
+        latency (float): The duration of every api call, in seconds.
+        latencies (dict): Maps method names, such as 'get_table', to the
+            duration of their api calls, in seconds, instead of latency.
+        job_duration (float): The time a job is running, in seconds.
+        nb_job_polls (int): If passed, the number of polls after which a
+            job is done, instead of after job_duration.
+        error_rate (float): The probability for an api call to fail with
+            ServiceUnavailable.
+        seed (int): The seed of the random errors.
+    """
+    def __init__(
+            self,
+            project: Optional[str] = 'project_id',
+            location: Optional[str] = 'EU',
+            gcs_dir: Optional[str] = None,
+            latency: Optional[float] = 0,
+            latencies: Optional[Dict[str, float]] = None,
+            job_duration: Optional[float] = 0,
+            nb_job_polls: Optional[int] = None,
+            error_rate: Optional[float] = 0,
+            seed: Optional[int] = None) -> None:
+        self.project = project
+        self._location = location
+        self._temporary_dir = None
+        if gcs_dir is None:
+            self._temporary_dir = tempfile.TemporaryDirectory()
+            gcs_dir = self._temporary_dir.name
+        self._gcs_dir = gcs_dir
+        self._latency = latency
+        self._latencies = dict(latencies or {})
+        self._job_duration = job_duration
+        self._nb_job_polls = nb_job_polls
+        self._error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._calls = Counter()
+        self._nb_running_calls = 0
+        self._max_nb_running_calls = 0
+        self._errors = {}
+        self._job_errors = []
+        self._datasets = {}
+        self._tables = {}
+        self._jobs = {}
+        self._row_ids = {}
+        self._data_modified = {}
+        self._db = sqlite3.connect(':memory:', check_same_thread=False)
+
+    @property
+    def location(self) -> str:
+        """str: The default location of the datasets."""
+        return self._location
+
+    @property
+    def gcs_dir(self) -> str:
+        """str: The local directory standing for Cloud Storage."""
+        return self._gcs_dir
+
+    @property
+    def latency(self) -> float:
+        """float: The duration of the api calls without a latency in
+        latencies, in seconds. It can be changed, for instance after the
+        setup of a benchmark."""
+        return self._latency
+
+    @latency.setter
+    def latency(self, value: float) -> None:
+        self._latency = value
+
+    @property
+    def job_duration(self) -> float:
+        """float: The time a job is running, in seconds."""
+        return self._job_duration
+
+    @property
+    def nb_job_polls(self) -> Optional[int]:
+        """int: The number of polls after which a job is done, or None if
+        it is done after job_duration."""
+        return self._nb_job_polls
+
+    @property
+    def calls(self) -> Dict[str, int]:
+        """dict: The number of api calls by method name."""
+        with self._lock:
+            return dict(self._calls)
+
+    @property
+    def nb_calls(self) -> int:
+        """int: The total number of api calls."""
+        with self._lock:
+            return sum(self._calls.values())
+
+    @property
+    def max_nb_running_calls(self) -> int:
+        """int: The maximum number of api calls which were running at the
+        same time."""
+        with self._lock:
+            return self._max_nb_running_calls
+
+    def reset_calls(self) -> None:
+        """Reset the counts of api calls."""
+        with self._lock:
+            self._calls = Counter()
+            self._max_nb_running_calls = self._nb_running_calls
+
+    def inject_error(
+            self,
+            method: str,
+            error: Exception,
+            count: Optional[int] = 1) -> None:
+        """Make the next ``count`` calls to ``method`` raise ``error``."""
+        with self._lock:
+            self._errors.setdefault(method, []).extend([error] * count)
+
+    def inject_job_error(
+            self,
+            reason: str,
+            message: Optional[str] = '',
+            count: Optional[int] = 1) -> None:
+        """Make the next ``count`` inserted jobs fail with an error result
+        with this reason and message, without being applied."""
+        with self._lock:
+            self._job_errors.extend(
+                [{'reason': reason, 'message': message}] * count)
+
+    def _call(self, method: str) -> None:
+        with self._lock:
+            self._calls[method] += 1
+            self._nb_running_calls += 1
+            self._max_nb_running_calls = max(
+                self._max_nb_running_calls, self._nb_running_calls)
+            error = None
+            if self._errors.get(method):
+                error = self._errors[method].pop(0)
+            elif self._error_rate and \
+                    self._random.random() < self._error_rate:
+                error = exceptions.ServiceUnavailable(
+                    f'{method}: injected error')
+        try:
+            delay = self._latencies.get(method, self._latency)
+            if delay:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self._nb_running_calls -= 1
+        if error is not None:
+            raise error
+
+    def _resolve_dataset_id(self, dataset: DatasetLike) -> str:
+        if isinstance(dataset, str):
+            if '.' not in dataset:
+                dataset = f'{self.project}.{dataset}'
+            return dataset
+        return f'{dataset.project}.{dataset.dataset_id}'
+
+    def _resolve_table_id(self, table: TableLike) -> str:
+        if not isinstance(table, str):
+            table = f'{table.project}.{table.dataset_id}.{table.table_id}'
+        if '$' in table:
+            raise exceptions.BadRequest(
+                'partition decorators are not supported by FakeClient')
+        if table.count('.') == 1:
+            table = f'{self.project}.{table}'
+        return table
+
+    def _get_dataset_resource(self, dataset_id: str) -> dict:
+        if dataset_id not in self._datasets:
+            raise exceptions.NotFound(f'Not found: Dataset {dataset_id}')
+        return self._datasets[dataset_id]
+
+    def _get_table_resource(self, table_id: str) -> dict:
+        if table_id not in self._tables:
+            raise exceptions.NotFound(f'Not found: Table {table_id}')
+        return self._tables[table_id]
+
+    @staticmethod
+    def _touch(resource: dict) -> None:
+        resource['lastModifiedTime'] = _millis(_now())
+        resource['etag'] = uuid.uuid4().hex
+
+    @staticmethod
+    def _get_schema(resource: dict) -> List[bigquery.SchemaField]:
+        return [bigquery.SchemaField.from_api_repr(f)
+                for f in (resource.get('schema') or {}).get('fields') or []]
+
+    def _create_table_resource(
+            self,
+            table_id: str,
+            schema: List[bigquery.SchemaField],
+            resource: Optional[dict] = None) -> dict:
+        project, dataset_name, table_name = table_id.split('.')
+        self._get_dataset_resource(f'{project}.{dataset_name}')
+        if resource is None:
+            resource = {}
+        resource.update({
+            'tableReference': {
+                'projectId': project, 'datasetId': dataset_name,
+                'tableId': table_name},
+            'id': f'{project}:{dataset_name}.{table_name}',
+            'creationTime': _millis(_now()),
+            'location': self._datasets[
+                f'{project}.{dataset_name}']['location']})
+        resource.setdefault('type', 'TABLE')
+        if schema is not None:
+            resource['schema'] = {'fields': [f.to_api_repr() for f in schema]}
+        self._touch(resource)
+        self._drop_data(table_id)
+        self._tables[table_id] = resource
+        if resource['type'] == 'VIEW':
+            query, _ = self._translate(resource['view']['query'])
+            self._db.execute(f'create view "{table_id}" as {query}')
+        else:
+            self._create_data(table_id, self._get_schema(resource))
+        return resource
+
+    def _create_data(
+            self,
+            table_id: str,
+            schema: List[bigquery.SchemaField]) -> None:
+        columns = ', '.join(f'"{f.name}"' for f in schema) or '_empty'
+        self._db.execute(f'create table "{table_id}" ({columns})')
+        self._row_ids[table_id] = set()
+        self._data_modified[table_id] = _now()
+
+    def _drop_data(self, table_id: str) -> None:
+        kinds = self._db.execute(
+            'select type from sqlite_master where name = ?',
+            [table_id]).fetchall()
+        for (kind,) in kinds:
+            self._db.execute(f'drop {kind} "{table_id}"')
+        self._row_ids.pop(table_id, None)
+        self._data_modified.pop(table_id, None)
+
+    def _delete_table_resource(self, table_id: str) -> None:
+        self._drop_data(table_id)
+        del self._tables[table_id]
+
+    def _read_rows(self, table_id: str) -> FakeRowIterator:
+        resource = self._get_table_resource(table_id)
+        schema = self._get_schema(resource)
+        if resource['type'] == 'VIEW':
+            cursor = self._db.execute(f'select * from "{table_id}"')
+            return self._build_rows(cursor, [])
+        names = ', '.join(f'"{f.name}"' for f in schema)
+        if not names:
+            return FakeRowIterator([], [])
+        cursor = self._db.execute(
+            f'select {names} from "{table_id}" order by rowid')
+        return self._build_rows(cursor, schema)
+
+    @staticmethod
+    def _build_rows(
+            cursor: sqlite3.Cursor,
+            schema: List[bigquery.SchemaField]) -> FakeRowIterator:
+        records = cursor.fetchall()
+        names = [d[0] for d in cursor.description or []]
+        fields = {f.name: f for f in schema}
+        res_schema = []
+        for i, n in enumerate(names):
+            if n in fields:
+                res_schema.append(fields[n])
+                continue
+            values = [r[i] for r in records if r[i] is not None]
+            field_type = _infer_type(values[0]) if values else 'STRING'
+            res_schema.append(bigquery.SchemaField(n, field_type))
+        types = [_normalize_type(f.field_type) for f in res_schema]
+        index = {n: i for i, n in enumerate(names)}
+        rows = [bigquery.Row(
+            tuple(_from_sqlite(v, t) for v, t in zip(r, types)), index)
+            for r in records]
+        return FakeRowIterator(rows, res_schema)
+
+    def _count_bytes(self, table_id: str) -> int:
+        resource = self._tables[table_id]
+        schema = self._get_schema(resource)
+        if resource['type'] == 'VIEW' or not schema:
+            return 0
+        lengths = ' + '.join(
+            f'coalesce(length(cast("{f.name}" as blob)), 0)' for f in schema)
+        return self._db.execute(
+            f'select coalesce(sum({lengths}), 0) from "{table_id}"'
+        ).fetchone()[0]
+
+    def _count_rows(self, table_id: str) -> int:
+        return self._db.execute(
+            f'select count(*) from "{table_id}"').fetchone()[0]
+
+    def _write_rows(
+            self,
+            table_id: str,
+            rows: FakeRowIterator,
+            write_disposition: Optional[str],
+            create_disposition: Optional[str] = None) -> None:
+        write_disposition = write_disposition or 'WRITE_EMPTY'
+        resource = self._tables.get(table_id)
+        if resource is None:
+            if create_disposition == 'CREATE_NEVER':
+                raise exceptions.NotFound(f'Not found: Table {table_id}')
+            resource = self._create_table_resource(table_id, rows.schema)
+        elif write_disposition == 'WRITE_TRUNCATE':
+            resource['schema'] = {
+                'fields': [f.to_api_repr() for f in rows.schema]}
+            self._drop_data(table_id)
+            self._create_data(table_id, rows.schema)
+        elif write_disposition == 'WRITE_EMPTY' and \
+                self._count_rows(table_id) > 0:
+            raise exceptions.Conflict(
+                f'Already Exists: Table {table_id}',
+                errors=[{'reason': 'duplicate'}])
+        schema = self._get_schema(resource)
+        self._insert(table_id, schema, [list(r.values()) for r in rows])
+        self._touch(resource)
+
+    def _insert(
+            self,
+            table_id: str,
+            schema: List[bigquery.SchemaField],
+            records: List[List[Any]]) -> None:
+        if not records:
+            return
+        columns = ', '.join(f'"{f.name}"' for f in schema)
+        marks = ', '.join('?' for _ in schema)
+        self._db.executemany(
+            f'insert into "{table_id}" ({columns}) values ({marks})',
+            [[_to_sqlite(v) for v in r] for r in records])
+        self._data_modified[table_id] = _now()
+
+    def _translate(self, sql: str) -> Tuple[str, List[str]]:
+        referenced = []
+
+        def replace(match):
+            name = match.group(1)
+            if '.' not in name:
+                return f'"{name}"'
+            partitions_match = PARTITIONS_PATTERN.fullmatch(name)
+            if partitions_match is not None:
+                table_id = self._build_partitions_view(
+                    self._resolve_dataset_id(partitions_match.group(1)))
+            else:
+                table_id = self._resolve_table_id(name)
+            if table_id not in referenced:
+                referenced.append(table_id)
+            return f'"{table_id}"'
+
+        sql = UNNEST_PATTERN.sub(r'(select value from json_each(\1))', sql)
+        return re.sub(r'`([^`]+)`', replace, sql), referenced
+
+    def _build_partitions_view(self, dataset_id: str) -> str:
+        self._get_dataset_resource(dataset_id)
+        view_id = f'{dataset_id}.INFORMATION_SCHEMA.PARTITIONS'
+        self._db.execute(f'drop table if exists "{view_id}"')
+        self._db.execute(
+            f'create temp table "{view_id}" '
+            f'({", ".join(f.name for f in PARTITIONS_SCHEMA)})')
+        records = [
+            [t.split('.')[-1], None,
+             _to_sqlite(self._data_modified[t]),
+             self._count_rows(t)]
+            for t, r in self._tables.items()
+            if t.startswith(f'{dataset_id}.') and r['type'] != 'VIEW']
+        self._db.executemany(
+            f'insert into "{view_id}" values (?, ?, ?, ?)', records)
+        return view_id
+
+    def _get_source_schema(
+            self, table_id: str) -> List[bigquery.SchemaField]:
+        if PARTITIONS_PATTERN.fullmatch(table_id) is not None:
+            return PARTITIONS_SCHEMA
+        return self._get_schema(self._get_table_resource(table_id))
+
+    def _execute_select(
+            self,
+            query: str,
+            parameters: Dict[str, Any]) -> Tuple[FakeRowIterator, List[str]]:
+        sql, referenced = self._translate(query)
+        schema = []
+        for t in referenced:
+            schema += self._get_source_schema(t)
+        cursor = self._db.execute(sql, parameters)
+        return self._build_rows(cursor, schema), referenced
+
+    @staticmethod
+    def _get_parameters(job_config: bigquery.QueryJobConfig) -> dict:
+        res = {}
+        for p in job_config.query_parameters:
+            if isinstance(p, bigquery.ScalarQueryParameter):
+                res[p.name] = _to_sqlite(p.value)
+            elif isinstance(p, bigquery.ArrayQueryParameter):
+                res[p.name] = _to_sqlite(list(p.values))
+        return res
+
+    def _run_statement(
+            self,
+            job: FakeQueryJob,
+            statement: str,
+            job_config: bigquery.QueryJobConfig) -> None:
+        statistics = {}
+        parameters = self._get_parameters(job_config)
+        create_match = CREATE_PATTERN.fullmatch(statement)
+        alter_match = ALTER_PATTERN.fullmatch(statement)
+        drop_match = DROP_PATTERN.fullmatch(statement)
+        dml_match = DML_PATTERN.match(statement)
+        referenced = []
+        if create_match is not None:
+            or_replace, name, options, query = create_match.groups()
+            table_id = self._resolve_table_id(name)
+            rows, referenced = self._execute_select(query, parameters)
+            if table_id in self._tables:
+                if not or_replace:
+                    raise exceptions.Conflict(
+                        f'Already Exists: Table {table_id}',
+                        errors=[{'reason': 'duplicate'}])
+                self._delete_table_resource(table_id)
+            resource = {}
+            expiration = EXPIRATION_PATTERN.search(options or '')
+            if expiration is not None:
+                resource['expirationTime'] = _millis(
+                    datetime.fromisoformat(expiration.group(1)))
+            self._create_table_resource(table_id, rows.schema, resource)
+            self._write_rows(table_id, rows, 'WRITE_APPEND')
+            statistics['statementType'] = 'CREATE_TABLE_AS_SELECT'
+            statistics['ddlTargetTable'] = \
+                self._tables[table_id]['tableReference']
+        elif alter_match is not None:
+            table_id = self._resolve_table_id(alter_match.group(1))
+            resource = self._get_table_resource(table_id)
+            changes = dict(ALTER_COLUMN_PATTERN.findall(alter_match.group(2)))
+            if not changes:
+                raise exceptions.BadRequest(
+                    'only ALTER COLUMN SET DATA TYPE is supported by '
+                    'FakeClient', errors=[{'reason': 'invalidQuery'}])
+            for f in resource['schema']['fields']:
+                if f['name'] in changes:
+                    f['type'] = _normalize_type(changes[f['name']])
+            self._touch(resource)
+            statistics['statementType'] = 'ALTER_TABLE'
+            statistics['ddlTargetTable'] = resource['tableReference']
+        elif drop_match is not None:
+            if_exists, name = drop_match.groups()
+            table_id = self._resolve_table_id(name)
+            if table_id in self._tables:
+                self._delete_table_resource(table_id)
+            elif not if_exists:
+                raise exceptions.NotFound(f'Not found: Table {table_id}')
+            statistics['statementType'] = 'DROP_TABLE'
+        elif dml_match is not None:
+            table_id = self._resolve_table_id(dml_match.group(2))
+            resource = self._get_table_resource(table_id)
+            sql, referenced = self._translate(statement)
+            cursor = self._db.execute(sql, parameters)
+            self._touch(resource)
+            self._data_modified[table_id] = _now()
+            statistics['statementType'] = dml_match.group(1).upper()
+            statistics['numDmlAffectedRows'] = str(cursor.rowcount)
+        else:
+            rows, referenced = self._execute_select(statement, parameters)
+            if job_config.destination is not None:
+                self._write_rows(
+                    self._resolve_table_id(job_config.destination), rows,
+                    job_config.write_disposition or 'WRITE_EMPTY',
+                    job_config.create_disposition)
+            job._fake_rows = rows
+            statistics['statementType'] = 'SELECT'
+            statistics['schema'] = {
+                'fields': [f.to_api_repr() for f in rows.schema]}
+        self._set_query_statistics(job, statistics, referenced)
+
+    def _set_query_statistics(
+            self,
+            job: FakeQueryJob,
+            statistics: dict,
+            referenced: List[str]) -> None:
+        nb_bytes = sum(self._count_bytes(t) for t in referenced
+                       if t in self._tables)
+        nb_billed = 0 if nb_bytes == 0 else max(nb_bytes, 10 * 1024 ** 2)
+        statistics.update({
+            'totalBytesProcessed': str(nb_bytes),
+            'totalBytesBilled': str(nb_billed),
+            'cacheHit': False,
+            'referencedTables': [
+                self._tables[t]['tableReference'] for t in referenced
+                if t in self._tables]})
+        job._properties['statistics'].setdefault('query', {}).update(
+            statistics)
+
+    @staticmethod
+    def _split_script(query: str) -> List[str]:
+        return [s for s in re.split(r';(?=(?:[^\']*\'[^\']*\')*[^\']*$)',
+                                    query) if s.strip()]
+
+    def _run_query(
+            self,
+            job: FakeQueryJob,
+            job_config: bigquery.QueryJobConfig) -> None:
+        statements = self._split_script(job.query)
+        if len(statements) == 1:
+            self._run_statement(job, statements[0], job_config)
+            return
+        child_config = bigquery.QueryJobConfig()
+        child_config.query_parameters = job_config.query_parameters
+        nb_bytes = 0
+        for s in statements:
+            child = FakeQueryJob(
+                str(uuid.uuid4()), s, self, bigquery.QueryJobConfig())
+            child._init_fake(self)
+            child._properties['statistics']['parentJobId'] = job.job_id
+            job._fake_children.append(child)
+            self._jobs[child.job_id] = child
+            try:
+                self._run_statement(child, s, child_config)
+            except (exceptions.GoogleAPICallError, sqlite3.Error) as e:
+                child._fake_error = _to_error_result(e)
+                child._finish_fake()
+                raise
+            child._finish_fake()
+            nb_bytes += child.total_bytes_processed or 0
+        job._properties['statistics']['numChildJobs'] = str(len(statements))
+        job._properties['statistics']['query'] = {
+            'statementType': 'SCRIPT',
+            'totalBytesProcessed': str(nb_bytes),
+            'totalBytesBilled': str(
+                sum(c.total_bytes_billed or 0 for c in job._fake_children))}
+
+    def _dry_run(
+            self,
+            job: FakeQueryJob,
+            job_config: bigquery.QueryJobConfig) -> None:
+        sql, referenced = self._translate(job.query)
+        schema = []
+        for t in referenced:
+            schema += self._get_source_schema(t)
+        try:
+            cursor = self._db.execute(
+                f'select * from ({sql}) limit 0',
+                self._get_parameters(job_config))
+        except sqlite3.Error as e:
+            raise exceptions.BadRequest(
+                str(e), errors=[{'reason': 'invalidQuery'}])
+        rows = self._build_rows(cursor, schema)
+        self._set_query_statistics(job, {
+            'statementType': 'SELECT',
+            'schema': {'fields': [f.to_api_repr() for f in rows.schema]}},
+            referenced)
+        job._properties['status'] = {'state': 'DONE'}
+
+    def _start_job(self, job: _FakeJob, job_id: str, run, *args) -> Any:
+        with self._lock:
+            if job_id in self._jobs:
+                raise exceptions.Conflict(
+                    f'Already Exists: Job {self.project}:{self._location}.'
+                    f'{job_id}')
+            job._init_fake(self)
+            if self._job_errors:
+                job._fake_error = self._job_errors.pop(0)
+            else:
+                try:
+                    run(job, *args)
+                except (exceptions.GoogleAPICallError, sqlite3.Error,
+                        ValueError, OSError) as e:
+                    job._fake_error = _to_error_result(e)
+            self._jobs[job_id] = job
+        if self._job_duration == 0 and self._nb_job_polls is None:
+            job._finish_fake()
+        return job
+
+    def query(
+            self,
+            query: str,
+            job_config: Optional[bigquery.QueryJobConfig] = None,
+            job_id: Optional[str] = None,
+            location: Optional[str] = None,
+            **kwargs) -> FakeQueryJob:
+        """Insert a query job, or make a dry run."""
+        self._call('query')
+        if job_config is None:
+            job_config = bigquery.QueryJobConfig()
+        job_id = job_id or str(uuid.uuid4())
+        job = FakeQueryJob(job_id, query, self, job_config)
+        if job_config.dry_run:
+            with self._lock:
+                job._init_fake(self)
+                self._dry_run(job, job_config)
+            return job
+        return self._start_job(job, job_id, self._run_query, job_config)
+
+    def _run_copy(
+            self,
+            job: FakeCopyJob,
+            source_ids: List[str],
+            destination_id: str,
+            job_config: bigquery.CopyJobConfig) -> None:
+        rows = FakeRowIterator([], [])
+        for s in source_ids:
+            source_rows = self._read_rows(s)
+            rows = FakeRowIterator(
+                list(rows) + list(source_rows),
+                rows.schema or source_rows.schema)
+        write_disposition = job_config.write_disposition or 'WRITE_EMPTY'
+        self._write_rows(
+            destination_id, rows, write_disposition,
+            job_config.create_disposition)
+        if job_config.operation_type == 'SNAPSHOT':
+            self._tables[destination_id]['type'] = 'SNAPSHOT'
+
+    def copy_table(
+            self,
+            sources: Union[TableLike, List[TableLike]],
+            destination: TableLike,
+            job_id: Optional[str] = None,
+            job_config: Optional[bigquery.CopyJobConfig] = None,
+            **kwargs) -> FakeCopyJob:
+        """Insert a copy job."""
+        self._call('copy_table')
+        if job_config is None:
+            job_config = bigquery.CopyJobConfig()
+        if not isinstance(sources, list):
+            sources = [sources]
+        source_ids = [self._resolve_table_id(s) for s in sources]
+        destination_id = self._resolve_table_id(destination)
+        job_id = job_id or str(uuid.uuid4())
+        job = FakeCopyJob(
+            job_id,
+            [bigquery.TableReference.from_string(s) for s in source_ids],
+            bigquery.TableReference.from_string(destination_id),
+            self, job_config)
+        return self._start_job(
+            job, job_id, self._run_copy, source_ids, destination_id,
+            job_config)
+
+    def _build_path(self, uri: str) -> str:
+        if not uri.startswith('gs://'):
+            raise exceptions.BadRequest(f'invalid uri: {uri}')
+        return os.path.join(self._gcs_dir, uri[len('gs://'):])
+
+    @staticmethod
+    def _open(path: str, mode: str, compression: Optional[str]):
+        if compression == 'GZIP':
+            return gzip.open(path, mode)
+        return open(path, mode)
+
+    def _run_extract(
+            self,
+            job: FakeExtractJob,
+            source_id: str,
+            destination_uris: List[str],
+            job_config: bigquery.ExtractJobConfig) -> None:
+        rows = self._read_rows(source_id)
+        path = self._build_path(destination_uris[0].replace(
+            '*', '000000000000'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        destination_format = job_config.destination_format or 'CSV'
+        names = [f.name for f in rows.schema]
+        if destination_format == 'CSV':
+            with self._open(path, 'wt', job_config.compression) as f:
+                writer = csv.writer(
+                    f, delimiter=job_config.field_delimiter or ',')
+                if job_config.print_header is not False:
+                    writer.writerow(names)
+                writer.writerows(
+                    [_to_sqlite(v) for v in r.values()] for r in rows)
+        elif destination_format == 'NEWLINE_DELIMITED_JSON':
+            with self._open(path, 'wt', job_config.compression) as f:
+                for r in rows:
+                    f.write(json.dumps(dict(r.items()), default=str) + '\n')
+        elif destination_format == 'PARQUET':
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(rows.to_arrow(), path)
+        else:
+            raise exceptions.BadRequest(
+                f'{destination_format} is not supported by FakeClient')
+
+    def extract_table(
+            self,
+            source: TableLike,
+            destination_uris: Union[str, List[str]],
+            job_id: Optional[str] = None,
+            job_config: Optional[bigquery.ExtractJobConfig] = None,
+            **kwargs) -> FakeExtractJob:
+        """Insert an extract job."""
+        self._call('extract_table')
+        if job_config is None:
+            job_config = bigquery.ExtractJobConfig()
+        if isinstance(destination_uris, str):
+            destination_uris = [destination_uris]
+        source_id = self._resolve_table_id(source)
+        job_id = job_id or str(uuid.uuid4())
+        job = FakeExtractJob(
+            job_id, bigquery.TableReference.from_string(source_id),
+            destination_uris, self, job_config)
+        return self._start_job(
+            job, job_id, self._run_extract, source_id, destination_uris,
+            job_config)
+
+    @staticmethod
+    def _parse_file(
+            data: bytes,
+            job_config: bigquery.LoadJobConfig) -> FakeRowIterator:
+        if data[:2] == b'\x1f\x8b':
+            data = gzip.decompress(data)
+        source_format = job_config.source_format or 'CSV'
+        if source_format == 'CSV':
+            reader = csv.reader(
+                io.StringIO(data.decode()),
+                delimiter=job_config.field_delimiter or ',')
+            records = list(reader)
+            header = []
+            skip = job_config.skip_leading_rows or 0
+            if job_config.schema is None and records:
+                header = records[0]
+                skip = max(skip, 1)
+            records = records[skip:]
+            dicts = [dict(zip(header or [f.name for f in job_config.schema],
+                              [_parse_text(v) for v in r]))
+                     for r in records]
+        elif source_format == 'NEWLINE_DELIMITED_JSON':
+            dicts = [json.loads(line)
+                     for line in data.decode().splitlines() if line.strip()]
+        elif source_format == 'PARQUET':
+            import pyarrow.parquet
+            dicts = pyarrow.parquet.read_table(
+                io.BytesIO(data)).to_pylist()
+        else:
+            raise exceptions.BadRequest(
+                f'{source_format} is not supported by FakeClient')
+        schema = job_config.schema
+        if schema is None:
+            names = list(dict.fromkeys(k for d in dicts for k in d))
+            schema = []
+            for n in names:
+                values = [d.get(n) for d in dicts if d.get(n) is not None]
+                field_type = _infer_type(values[0]) if values else 'STRING'
+                schema.append(bigquery.SchemaField(n, field_type))
+        index = {f.name: i for i, f in enumerate(schema)}
+        rows = [bigquery.Row(tuple(d.get(f.name) for f in schema), index)
+                for d in dicts]
+        return FakeRowIterator(rows, list(schema))
+
+    def _run_load(
+            self,
+            job: FakeLoadJob,
+            contents: List[bytes],
+            destination_id: str,
+            job_config: bigquery.LoadJobConfig) -> None:
+        rows = FakeRowIterator([], [])
+        for data in contents:
+            file_rows = self._parse_file(data, job_config)
+            rows = FakeRowIterator(
+                list(rows) + list(file_rows), rows.schema or file_rows.schema)
+        self._write_rows(
+            destination_id, rows,
+            job_config.write_disposition or 'WRITE_APPEND',
+            job_config.create_disposition)
+        job._properties['statistics']['load'] = {'outputRows': str(len(rows))}
+
+    def load_table_from_uri(
+            self,
+            source_uris: Union[str, List[str]],
+            destination: TableLike,
+            job_id: Optional[str] = None,
+            job_config: Optional[bigquery.LoadJobConfig] = None,
+            **kwargs) -> FakeLoadJob:
+        """Insert a load job reading files of the fake Cloud Storage."""
+        self._call('load_table_from_uri')
+        if job_config is None:
+            job_config = bigquery.LoadJobConfig()
+        if isinstance(source_uris, str):
+            source_uris = [source_uris]
+        paths = sorted(
+            p for u in source_uris for p in glob.glob(self._build_path(u)))
+        contents = []
+        for p in paths:
+            with open(p, 'rb') as f:
+                contents.append(f.read())
+        destination_id = self._resolve_table_id(destination)
+        job_id = job_id or str(uuid.uuid4())
+        job = FakeLoadJob(
+            job_id, source_uris,
+            bigquery.TableReference.from_string(destination_id), self,
+            job_config)
+        if not paths:
+            raise exceptions.NotFound(f'Not found: Uris {source_uris}')
+        return self._start_job(
+            job, job_id, self._run_load, contents, destination_id,
+            job_config)
+
+    def load_table_from_file(
+            self,
+            file_obj: io.IOBase,
+            destination: TableLike,
+            job_id: Optional[str] = None,
+            job_config: Optional[bigquery.LoadJobConfig] = None,
+            **kwargs) -> FakeLoadJob:
+        """Insert a load job reading a local file object."""
+        self._call('load_table_from_file')
+        if job_config is None:
+            job_config = bigquery.LoadJobConfig()
+        destination_id = self._resolve_table_id(destination)
+        job_id = job_id or str(uuid.uuid4())
+        job = FakeLoadJob(
+            job_id, None,
+            bigquery.TableReference.from_string(destination_id), self,
+            job_config)
+        return self._start_job(
+            job, job_id, self._run_load, [file_obj.read()], destination_id,
+            job_config)
+
+    def get_job(self, job_id: str, **kwargs) -> _FakeJob:
+        """Get a job."""
+        self._call('get_job')
+        with self._lock:
+            if job_id not in self._jobs:
+                raise exceptions.NotFound(f'Not found: Job {job_id}')
+            return self._jobs[job_id]
+
+    def list_jobs(
+            self,
+            parent_job: Optional[Union[str, _FakeJob]] = None,
+            **kwargs) -> List[_FakeJob]:
+        """List the child jobs of a script job."""
+        self._call('list_jobs')
+        with self._lock:
+            if parent_job is None:
+                return list(self._jobs.values())
+            if isinstance(parent_job, str):
+                parent_job = self._jobs[parent_job]
+            return list(parent_job._fake_children)
+
+    def create_dataset(
+            self,
+            dataset: DatasetLike,
+            exists_ok: Optional[bool] = False,
+            **kwargs) -> bigquery.Dataset:
+        """Create a dataset."""
+        self._call('create_dataset')
+        if isinstance(dataset, str):
+            dataset = bigquery.Dataset(self._resolve_dataset_id(dataset))
+        dataset_id = self._resolve_dataset_id(dataset)
+        with self._lock:
+            if dataset_id in self._datasets:
+                if exists_ok:
+                    return self._build_dataset(dataset_id)
+                raise exceptions.Conflict(
+                    f'Already Exists: Dataset {dataset_id}')
+            resource = copy.deepcopy(dataset.to_api_repr())
+            resource.setdefault('location', None)
+            if resource['location'] is None:
+                resource['location'] = self._location
+            resource['id'] = dataset_id.replace('.', ':')
+            resource['creationTime'] = _millis(_now())
+            self._touch(resource)
+            self._datasets[dataset_id] = resource
+            return self._build_dataset(dataset_id)
+
+    def _build_dataset(self, dataset_id: str) -> bigquery.Dataset:
+        return bigquery.Dataset.from_api_repr(
+            copy.deepcopy(self._datasets[dataset_id]))
+
+    def get_dataset(self, dataset_ref: DatasetLike, **kwargs
+                    ) -> bigquery.Dataset:
+        """Get a dataset."""
+        self._call('get_dataset')
+        dataset_id = self._resolve_dataset_id(dataset_ref)
+        with self._lock:
+            self._get_dataset_resource(dataset_id)
+            return self._build_dataset(dataset_id)
+
+    def delete_dataset(
+            self,
+            dataset: DatasetLike,
+            delete_contents: Optional[bool] = False,
+            not_found_ok: Optional[bool] = False,
+            **kwargs) -> None:
+        """Delete a dataset."""
+        self._call('delete_dataset')
+        dataset_id = self._resolve_dataset_id(dataset)
+        with self._lock:
+            if dataset_id not in self._datasets:
+                if not_found_ok:
+                    return
+                raise exceptions.NotFound(f'Not found: Dataset {dataset_id}')
+            table_ids = [t for t in self._tables
+                         if t.startswith(f'{dataset_id}.')]
+            if table_ids and not delete_contents:
+                raise exceptions.BadRequest(
+                    f'Dataset {dataset_id} is still in use')
+            for t in table_ids:
+                self._delete_table_resource(t)
+            del self._datasets[dataset_id]
+
+    def _list_table_items(
+            self,
+            table_ids: List[str],
+            page_size: int) -> Iterator[bigquery.table.TableListItem]:
+        for i in range(0, max(len(table_ids), 1), page_size):
+            if i > 0:
+                self._call('list_tables')
+            with self._lock:
+                resources = [copy.deepcopy(self._tables[t])
+                             for t in table_ids[i:i + page_size]
+                             if t in self._tables]
+            for r in resources:
+                yield bigquery.table.TableListItem(r)
+
+    def list_tables(
+            self,
+            dataset: DatasetLike,
+            page_size: Optional[int] = None,
+            **kwargs) -> Iterator[bigquery.table.TableListItem]:
+        """List the tables of a dataset, one api call being made per page of
+        ``page_size`` tables, 50 by default."""
+        self._call('list_tables')
+        dataset_id = self._resolve_dataset_id(dataset)
+        with self._lock:
+            self._get_dataset_resource(dataset_id)
+            table_ids = sorted(t for t in self._tables
+                               if t.startswith(f'{dataset_id}.'))
+        return self._list_table_items(table_ids, page_size or 50)
+
+    def create_table(
+            self,
+            table: TableLike,
+            exists_ok: Optional[bool] = False,
+            **kwargs) -> bigquery.Table:
+        """Create a table or a view."""
+        self._call('create_table')
+        if isinstance(table, str):
+            table = bigquery.Table(self._resolve_table_id(table))
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            if table_id in self._tables:
+                if exists_ok:
+                    return self._build_table(table_id)
+                raise exceptions.Conflict(f'Already Exists: Table {table_id}')
+            resource = {k: v for k, v in
+                        copy.deepcopy(table.to_api_repr()).items()
+                        if v is not None}
+            if 'view' in resource:
+                resource['type'] = 'VIEW'
+            self._create_table_resource(table_id, None, resource)
+            return self._build_table(table_id)
+
+    def _build_table(self, table_id: str) -> bigquery.Table:
+        resource = copy.deepcopy(self._get_table_resource(table_id))
+        if resource['type'] != 'VIEW':
+            resource['numRows'] = str(self._count_rows(table_id))
+            resource['numBytes'] = str(self._count_bytes(table_id))
+        return bigquery.Table.from_api_repr(resource)
+
+    def get_table(self, table: TableLike, **kwargs) -> bigquery.Table:
+        """Get a table."""
+        self._call('get_table')
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            return self._build_table(table_id)
+
+    def delete_table(
+            self,
+            table: TableLike,
+            not_found_ok: Optional[bool] = False,
+            **kwargs) -> None:
+        """Delete a table."""
+        self._call('delete_table')
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            if table_id not in self._tables:
+                if not_found_ok:
+                    return
+                raise exceptions.NotFound(f'Not found: Table {table_id}')
+            self._delete_table_resource(table_id)
+
+    def update_table(
+            self,
+            table: bigquery.Table,
+            fields: List[str],
+            **kwargs) -> bigquery.Table:
+        """Update the given fields of a table. Raise PreconditionFailed if
+        the etag of the table is set and is not the current one."""
+        self._call('update_table')
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            resource = self._get_table_resource(table_id)
+            if table.etag is not None and table.etag != resource['etag']:
+                raise exceptions.PreconditionFailed(
+                    f'Precondition check failed: Table {table_id}')
+            partial_resource = copy.deepcopy(table._build_resource(fields))
+            if 'schema' in partial_resource:
+                old_names = [f.name for f in self._get_schema(resource)]
+                new_names = [f['name']
+                             for f in partial_resource['schema']['fields']]
+                if new_names[:len(old_names)] != old_names:
+                    raise exceptions.BadRequest(
+                        f'Provided Schema does not match Table {table_id}')
+                for n in new_names[len(old_names):]:
+                    self._db.execute(
+                        f'alter table "{table_id}" add column "{n}"')
+            for k, v in partial_resource.items():
+                if v is None:
+                    resource.pop(k, None)
+                else:
+                    resource[k] = v
+            self._touch(resource)
+            return self._build_table(table_id)
+
+    def list_rows(
+            self,
+            table: TableLike,
+            selected_fields: Optional[List[bigquery.SchemaField]] = None,
+            max_results: Optional[int] = None,
+            page_size: Optional[int] = None,
+            **kwargs) -> FakeRowIterator:
+        """Return the rows of a table, one api call being made per page."""
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            rows = self._read_rows(table_id)
+        if max_results is not None:
+            rows = FakeRowIterator(rows[:max_results], rows.schema)
+        nb_pages = 1
+        if page_size:
+            nb_pages = max(1, -(-len(rows) // page_size))
+        for _ in range(nb_pages):
+            self._call('list_rows')
+        if selected_fields is None:
+            return rows
+        names = [f.name for f in selected_fields]
+        index = {n: i for i, n in enumerate(names)}
+        return FakeRowIterator(
+            [bigquery.Row(tuple(r[n] for n in names), index) for r in rows],
+            list(selected_fields))
+
+    def insert_rows(
+            self,
+            table: TableLike,
+            rows: List[Union[dict, tuple]],
+            row_ids: Optional[List[str]] = None,
+            **kwargs) -> List[dict]:
+        """Stream rows into a table. The rows whose insert id has already
+        been inserted are skipped. Return the errors of the rows."""
+        self._call('insert_rows')
+        table_id = self._resolve_table_id(table)
+        with self._lock:
+            resource = self._get_table_resource(table_id)
+            schema = self._get_schema(resource)
+            names = [f.name for f in schema]
+            if row_ids is None:
+                row_ids = [None] * len(rows)
+            errors = []
+            records = {}
+            seen = self._row_ids[table_id]
+            for i, (r, row_id) in enumerate(zip(rows, row_ids)):
+                if not isinstance(r, dict):
+                    r = dict(zip(names, r))
+                unknown = [k for k in r if k not in names]
+                if unknown:
+                    errors.append({'index': i, 'errors': [{
+                        'reason': 'invalid',
+                        'message': f'no such field: {unknown[0]}.'}]})
+                elif row_id is None or row_id not in seen:
+                    records[row_id or i] = [r.get(n) for n in names]
+            if not errors:
+                seen.update(k for k in records if isinstance(k, str))
+                self._insert(table_id, schema, list(records.values()))
+                self._touch(resource)
+            return errors
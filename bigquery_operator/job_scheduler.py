@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Optional
+
+
+class _TokenBucket:
+    def __init__(self, rate: float) -> None:
+        self._rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self._rate)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class JobScheduler:
+    """Scheduler of the jobs and metadata updates of an Operator, to stay
+    within the quotas of a project.
+
+    At most ``max_in_flight_jobs`` jobs are running at the same time: a job
+    takes a slot when it is submitted and gives it back when it ends, the
+    next jobs waiting for a free slot. The job insertions, including the
+    dry runs, and the metadata updates are limited by token buckets
+    refilled at ``job_inserts_per_second`` and ``updates_per_second`` and
+    holding one second of tokens.
+
+    A job which fails with a rate limit error is put back in the queue of
+    its batch and submitted again later, at most ``max_requeues`` times. The
+    insertions rejected with a rate limit error are retried by the retry
+    policy of the operator only.
+
+    An instance can be shared by several operators acting on the same
+    project, the limits then applying to all their batches together.
+
+    Args:
+        max_in_flight_jobs (int): The maximum number of running jobs. If
+            None, all the jobs of a batch are submitted at once.
+        job_inserts_per_second (float): The maximum rate of job
+            insertions. If None, it is not limited.
+        updates_per_second (float): The maximum rate of metadata updates.
+            If None, it is not limited.
+        max_requeues (int): The maximum number of times a job failing with
+            a rate limit error is submitted again.
+    """
+    RATE_LIMIT_REASONS = ('rateLimitExceeded', 'jobRateLimitExceeded')
+
+    def __init__(
+            self,
+            max_in_flight_jobs: Optional[int] = None,
+            job_inserts_per_second: Optional[float] = None,
+            updates_per_second: Optional[float] = None,
+            max_requeues: Optional[int] = 10) -> None:
+        self._max_in_flight_jobs = max_in_flight_jobs
+        self._job_inserts_per_second = job_inserts_per_second
+        self._updates_per_second = updates_per_second
+        self._max_requeues = max_requeues
+        self._check_arguments()
+        self._job_slots = None
+        if max_in_flight_jobs is not None:
+            self._job_slots = threading.BoundedSemaphore(max_in_flight_jobs)
+        self._job_inserts = None
+        if job_inserts_per_second is not None:
+            self._job_inserts = _TokenBucket(job_inserts_per_second)
+        self._updates = None
+        if updates_per_second is not None:
+            self._updates = _TokenBucket(updates_per_second)
+
+    def _check_arguments(self) -> None:
+        if self._max_in_flight_jobs is not None and \
+                self._max_in_flight_jobs < 1:
+            raise ValueError('max_in_flight_jobs must be a positive integer')
+        for name in ['job_inserts_per_second', 'updates_per_second']:
+            rate = getattr(self, f'_{name}')
+            if rate is not None and rate <= 0:
+                raise ValueError(f'{name} must be positive')
+        if self._max_requeues < 0:
+            raise ValueError('max_requeues must not be negative')
+
+    @property
+    def max_in_flight_jobs(self) -> Optional[int]:
+        """int: The maximum number of running jobs."""
+        return self._max_in_flight_jobs
+
+    @property
+    def job_inserts_per_second(self) -> Optional[float]:
+        """float: The maximum rate of job insertions."""
+        return self._job_inserts_per_second
+
+    @property
+    def updates_per_second(self) -> Optional[float]:
+        """float: The maximum rate of metadata updates."""
+        return self._updates_per_second
+
+    @property
+    def max_requeues(self) -> int:
+        """int: The maximum number of times a job failing with a rate limit
+        error is submitted again."""
+        return self._max_requeues
+
+    def acquire_job_slot(self) -> bool:
+        """Take a slot for a job about to be submitted, without blocking.
+        Return False if max_in_flight_jobs jobs are already running."""
+        if self._job_slots is None:
+            return True
+        return self._job_slots.acquire(blocking=False)
+
+    def release_job_slot(self) -> None:
+        """Give back the slot of a job which has ended."""
+        if self._job_slots is not None:
+            self._job_slots.release()
+
+    def acquire_job_insert(self) -> None:
+        """Block until a job can be inserted."""
+        if self._job_inserts is not None:
+            self._job_inserts.acquire()
+
+    def acquire_update(self) -> None:
+        """Block until a metadata update can be made."""
+        if self._updates is not None:
+            self._updates.acquire()
+
+    def is_rate_limited(self, error_result: Optional[dict]) -> bool:
+        """Return True if the error result of a job reports a rate
+        limit."""
+        return (error_result is not None and
+                error_result.get('reason') in self.RATE_LIMIT_REASONS)
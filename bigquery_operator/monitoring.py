@@ -0,0 +1,109 @@
+from datetime import datetime
+from typing import List, Optional
+from google.cloud import bigquery
+
+
+def get_job_destination(job: bigquery.UnknownJob) -> str:
+    """Return the destination of a job: a table id in the format
+    'project_id.dataset_name.table_name', or the comma-separated destination
+    uris of an extract job."""
+    if isinstance(job, bigquery.ExtractJob):
+        return ', '.join(job.destination_uris)
+    destination = getattr(job, 'destination', None)
+    if destination is None:
+        destination = getattr(job, 'ddl_target_table', None)
+    if destination is None:
+        return 'no destination'
+    return (f'{destination.project}.{destination.dataset_id}.'
+            f'{destination.table_id}')
+
+
+def _compute_seconds(
+        start: Optional[datetime],
+        end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+def _get_slot_millis(job: bigquery.UnknownJob) -> Optional[int]:
+    slot_millis = getattr(job, 'slot_millis', None)
+    if slot_millis is None:
+        statistics = job._properties.get('statistics', {})
+        slot_millis = statistics.get('totalSlotMs')
+    if slot_millis is None:
+        return None
+    return int(slot_millis)
+
+
+def build_job_report(job: bigquery.UnknownJob) -> dict:
+    """Return the statistics of a finished job as a dict with the keys:
+
+    - job_id, job_type, destination and state;
+    - created, started and ended, the timestamps of the job;
+    - queue_seconds, between created and started, and run_seconds, between
+      started and ended;
+    - slot_millis;
+    - total_bytes_processed, total_bytes_billed, cache_hit,
+      num_dml_affected_rows and shuffle_output_bytes_spilled, which are None
+      for the jobs other than query jobs;
+    - output_rows, which is None for the jobs other than load jobs.
+    """
+    query_plan = getattr(job, 'query_plan', None) or []
+    spilled_bytes = None
+    if query_plan:
+        spilled_bytes = sum(
+            s.shuffle_output_bytes_spilled or 0 for s in query_plan)
+    return {
+        'job_id': job.job_id,
+        'job_type': job.job_type,
+        'destination': get_job_destination(job),
+        'state': job.state,
+        'created': job.created,
+        'started': job.started,
+        'ended': job.ended,
+        'queue_seconds': _compute_seconds(job.created, job.started),
+        'run_seconds': _compute_seconds(job.started, job.ended),
+        'slot_millis': _get_slot_millis(job),
+        'total_bytes_processed': getattr(job, 'total_bytes_processed', None),
+        'total_bytes_billed': getattr(job, 'total_bytes_billed', None),
+        'cache_hit': getattr(job, 'cache_hit', None),
+        'num_dml_affected_rows': getattr(job, 'num_dml_affected_rows', None),
+        'shuffle_output_bytes_spilled': spilled_bytes,
+        'output_rows': getattr(job, 'output_rows', None)}
+
+
+def build_batch_report(
+        jobs: List[bigquery.UnknownJob],
+        start: datetime,
+        end: datetime) -> dict:
+    """Return the statistics of a batch of finished jobs as a dict with the
+    keys:
+
+    - jobs, the list of the job reports given by build_job_report;
+    - nb_jobs;
+    - duration, the wall time of the batch in seconds, between start and
+      end;
+    - longest_job_seconds, the longest time between the creation and the
+      end of a single job, which is a lower bound of the duration;
+    - total_slot_millis, total_bytes_processed and total_bytes_billed, the
+      sums over the jobs;
+    - nb_cache_hits.
+    """
+    job_reports = [build_job_report(j) for j in jobs]
+
+    def total(key):
+        return sum(r[key] or 0 for r in job_reports)
+
+    longest_job_seconds = max(
+        [_compute_seconds(r['created'], r['ended']) or 0
+         for r in job_reports], default=0)
+    return {
+        'jobs': job_reports,
+        'nb_jobs': len(job_reports),
+        'duration': _compute_seconds(start, end),
+        'longest_job_seconds': longest_job_seconds,
+        'total_slot_millis': total('slot_millis'),
+        'total_bytes_processed': total('total_bytes_processed'),
+        'total_bytes_billed': total('total_bytes_billed'),
+        'nb_cache_hits': sum(1 for r in job_reports if r['cache_hit'])}
@@ -1,10 +1,31 @@
+import hashlib
 import logging
+import os
+import re
+import tempfile
 import time
-from typing import Optional, List, Tuple
-from datetime import datetime, timezone, timedelta
+import uuid
+from itertools import islice
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Tuple, Callable, Iterable, Iterator, \
+    Any, Dict, Union
+from datetime import date, datetime, timezone, timedelta
 from google.cloud import bigquery, exceptions
+from google.cloud.bigquery.job.base import _error_result_to_exception
 from google.api_core.exceptions import PreconditionFailed
+from bigquery_operator.table_cache import TableCache
+from bigquery_operator.retry_policy import RetryPolicy
+from bigquery_operator.table_writer import TableWriter
+from bigquery_operator.job_scheduler import JobScheduler
+from bigquery_operator import monitoring
+from bigquery_operator import schema_diff
 logger = logging.getLogger(__name__)
+QUERY_HASH_LABEL = 'bigquery_operator_query_hash'
+SOURCES_MODIFIED_LABEL = 'bigquery_operator_sources_modified'
+SOURCE_FORMATS = ['CSV', 'NEWLINE_DELIMITED_JSON', 'AVRO', 'PARQUET', 'ORC']
+DESTINATION_FORMATS = ['CSV', 'NEWLINE_DELIMITED_JSON', 'AVRO', 'PARQUET']
+COPY_OPERATION_TYPES = ['COPY', 'CLONE', 'SNAPSHOT']
 
 
 class Operator:
@@ -15,23 +36,63 @@ class Operator:
             manage connections to the BigQuery API.
         dataset_id (str): The dataset id in the format
             'project_id.dataset_name'.
+        max_workers (int): The maximum number of threads used to issue api
+            calls concurrently, for instance to submit the jobs of
+            run_queries, load_tables, copy_tables and extract_tables.
+            If 1, the api calls are issued one after the other.
+        cancel_on_error (bool): When the jobs of a batch are awaited, the
+            first failing job raises an exception carrying its job id and
+            destination. If True, the jobs of the batch which are still
+            running at that moment are cancelled.
+        table_cache (bigquery_operator.table_cache.TableCache): If passed,
+            the results of get_table, and therefore of table_exists,
+            get_columns, table_is_empty and get_format_attributes, are
+            cached. The methods of the operator which write a table
+            invalidate its cache entry.
+        retry_policy (bigquery_operator.retry_policy.RetryPolicy): The
+            policy used to retry the metadata updates, the deletions and the
+            job submissions which fail with a transient error. If not
+            passed, falls back to RetryPolicy().
+        job_scheduler (bigquery_operator.job_scheduler.JobScheduler): If
+            passed, limits the number of running jobs and the rates of job
+            insertions and metadata updates, and submits again the jobs
+            failing with a rate limit error.
     """
     def __init__(
             self,
             client: bigquery.Client,
-            dataset_id: str) -> None:
+            dataset_id: str,
+            max_workers: Optional[int] = 8,
+            cancel_on_error: Optional[bool] = False,
+            table_cache: Optional[TableCache] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            job_scheduler: Optional[JobScheduler] = None) -> None:
         self._client = client
         self._dataset_id = dataset_id
         self._check_dataset_id_format()
         dataset_id_splitted = self._dataset_id.split('.')
         self._dataset_project_id = dataset_id_splitted[0]
         self._dataset_name = dataset_id_splitted[1]
+        self._max_workers = max_workers
+        self._check_max_workers()
+        self._cancel_on_error = cancel_on_error
+        self._table_cache = table_cache
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self._retry_policy = retry_policy
+        self._job_scheduler = job_scheduler
+        self._last_report = None
 
     def _check_dataset_id_format(self) -> None:
         if self._dataset_id.count('.') != 1:
             msg = 'dataset_id must contain exactly one dot'
             raise ValueError(msg)
 
+    def _check_max_workers(self) -> None:
+        if not isinstance(self._max_workers, int) or self._max_workers < 1:
+            msg = 'max_workers must be a positive integer'
+            raise ValueError(msg)
+
     @property
     def client(self) -> bigquery.Client:
         """google.cloud.bigquery.client.Client: The client."""
@@ -57,22 +118,336 @@ class Operator:
         """str: The dataset name."""
         return self._dataset_name
 
-    @staticmethod
-    def _wait_for_jobs(jobs: List[bigquery.UnknownJob]) -> None:
-        for job in jobs:
+    @property
+    def max_workers(self) -> int:
+        """int: The maximum number of threads issuing api calls
+        concurrently."""
+        return self._max_workers
+
+    @property
+    def cancel_on_error(self) -> bool:
+        """bool: Whether the running jobs of a batch are cancelled when one
+        of them fails."""
+        return self._cancel_on_error
+
+    @property
+    def table_cache(self) -> Optional[TableCache]:
+        """bigquery_operator.table_cache.TableCache: The table cache, if
+        any."""
+        return self._table_cache
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """bigquery_operator.retry_policy.RetryPolicy: The retry
+        policy."""
+        return self._retry_policy
+
+    @property
+    def job_scheduler(self) -> Optional[JobScheduler]:
+        """bigquery_operator.job_scheduler.JobScheduler: The job scheduler,
+        if any."""
+        return self._job_scheduler
+
+    @property
+    def last_report(self) -> Optional[dict]:
+        """dict: The statistics of the jobs of the last batch run by
+        run_queries, load_tables, copy_tables or extract_tables, in the
+        format given by bigquery_operator.monitoring.build_batch_report. None
+        if no batch has succeeded yet."""
+        return self._last_report
+
+    def _map(self, func: Callable, *iterables: Iterable) -> List[Any]:
+        args_list = list(zip(*iterables))
+        if self._max_workers == 1 or len(args_list) <= 1:
+            return [func(*args) for args in args_list]
+        nb_workers = min(self._max_workers, len(args_list))
+        with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+            return list(executor.map(lambda args: func(*args), args_list))
+
+    def _map_lazily(self, func: Callable, iterable: Iterable) -> None:
+        if self._max_workers == 1:
+            for x in iterable:
+                func(x)
+            return
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(func, x) for x in iterable]
+        for f in futures:
+            f.result()
+
+    def _cancel_jobs(self, jobs: List[bigquery.UnknownJob]) -> None:
+        def cancel(job):
+            try:
+                job.cancel()
+            except exceptions.GoogleCloudError as e:
+                logger.warning(e)
+        self._map(cancel, jobs)
+
+    def _run_jobs(
+            self,
+            submits: List[Callable[[], bigquery.UnknownJob]],
+            dependencies: Optional[Dict[int, List[int]]] = None,
+            max_in_flight: Optional[int] = None,
+            max_retries: Optional[int] = 0,
+            min_poll_interval: Optional[float] = 0.5,
+            max_poll_interval: Optional[float] = 10
+    ) -> List[bigquery.UnknownJob]:
+        """Submit the jobs as soon as the jobs they depend on, given by
+        their indexes, are done, with at most max_in_flight jobs of the
+        batch running and within the max_in_flight_jobs of the job
+        scheduler, and wait for them. A running job is polled
+        min_poll_interval seconds after its submission, then after delays
+        doubling up to max_poll_interval. A job failing with an error which
+        the retry policy retries is submitted again at most max_retries
+        times and a job failing with a rate limit error at most
+        max_requeues times of the job scheduler. Raise on the first
+        failure which is not retried.
+        Return the last submitted job of each submit, in the order of the
+        submits."""
+        scheduler = self._job_scheduler
+        max_requeues = 0
+        if scheduler is not None:
+            max_requeues = scheduler.max_requeues
+        if dependencies is None:
+            dependencies = {}
+        nb_parents = {}
+        children = {}
+        for i in range(len(submits)):
+            parents = set(dependencies.get(i, [])) - {i}
+            nb_parents[i] = len(parents)
+            for p in parents:
+                children.setdefault(p, []).append(i)
+        ready = [i for i in nb_parents if not nb_parents[i]]
+        not_before = {}
+        nb_requeues = {}
+        nb_retries = {}
+        running = {}
+        poll_delays = {}
+        next_polls = {}
+        slots = set()
+        jobs = {}
+
+        def requeue(i, reason, counts):
+            counts[i] = counts.get(i, 0) + 1
+            nb_attempts = nb_requeues.get(i, 0) + nb_retries.get(i, 0)
+            logger.warning(f'{reason}: submitting the job again')
+            not_before[i] = (time.monotonic() +
+                             self._retry_policy.compute_delay(nb_attempts - 1))
+            ready.append(i)
+
+        def acquire_slots(indexes):
+            if scheduler is None:
+                return indexes
+            res = []
+            for i in indexes:
+                if not scheduler.acquire_job_slot():
+                    break
+                slots.add(i)
+                res.append(i)
+            return res
+
+        def release_slot(i):
+            if i in slots:
+                slots.remove(i)
+                scheduler.release_job_slot()
+
+        try:
+            while ready or running:
+                now = time.monotonic()
+                nb_free = len(ready)
+                if max_in_flight is not None:
+                    nb_free = max_in_flight - len(running)
+                to_submit = [i for i in ready
+                             if not_before.get(i, 0) <= now][:nb_free]
+                nb_wanted = len(to_submit)
+                to_submit = acquire_slots(to_submit)
+                slots_full = len(to_submit) < nb_wanted
+                submitted_indexes = set(to_submit)
+                ready = [i for i in ready if i not in submitted_indexes]
+                submitted = self._map(lambda i: submits[i](), to_submit)
+                for i, job in zip(to_submit, submitted):
+                    running[i] = job
+                    jobs[i] = job
+                    poll_delays[i] = min_poll_interval
+                    next_polls[i] = time.monotonic() + min_poll_interval
+                now = time.monotonic()
+                due = [i for i in running if next_polls[i] <= now]
+                done_flags = self._map(lambda i: running[i].done(), due)
+                finished = [i for i, d in zip(due, done_flags) if d]
+                finished_indexes = set(finished)
+                for i in due:
+                    if i not in finished_indexes:
+                        poll_delays[i] = min(
+                            2 * poll_delays[i], max_poll_interval)
+                        next_polls[i] = time.monotonic() + poll_delays[i]
+                finished_jobs = [running.pop(i) for i in finished]
+                for i, job in zip(finished, finished_jobs):
+                    release_slot(i)
+                    if job.error_result is None:
+                        continue
+                    message = job.error_result.get('message')
+                    if (scheduler is not None and
+                            scheduler.is_rate_limited(job.error_result) and
+                            nb_requeues.get(i, 0) < max_requeues):
+                        requeue(i, message, nb_requeues)
+                        continue
+                    if (nb_retries.get(i, 0) < max_retries and
+                            self._retry_policy.is_retryable(
+                                _error_result_to_exception(
+                                    job.error_result))):
+                        requeue(i, message, nb_retries)
+                        continue
+                    self._raise_job_failure(job, list(running.values()))
+                unblocked = []
+                for i, job in zip(finished, finished_jobs):
+                    if job.error_result is not None:
+                        continue
+                    for c in children.get(i, []):
+                        nb_parents[c] -= 1
+                        if not nb_parents[c]:
+                            unblocked.append(c)
+                ready.extend(sorted(unblocked))
+                if not finished:
+                    now = time.monotonic()
+                    delays = [next_polls[i] - now for i in running]
+                    delays += [not_before[i] - now for i in ready
+                               if i in not_before]
+                    if slots_full:
+                        delays.append(min_poll_interval)
+                    if delays:
+                        time.sleep(max(0, min(delays)))
+        finally:
+            for i in list(slots):
+                release_slot(i)
+        return [jobs[i] for i in sorted(jobs)]
+
+    def _run_batch(
+            self,
+            submits: List[Callable[[], bigquery.UnknownJob]],
+            destination_table_names: List[str],
+            dependencies: Optional[Dict[int, List[int]]] = None,
+            max_in_flight: Optional[int] = None,
+            max_retries: Optional[int] = 0
+    ) -> List[bigquery.UnknownJob]:
+        start_timestamp = datetime.now(timezone.utc)
+        try:
+            jobs = self._run_jobs(
+                submits, dependencies, max_in_flight, max_retries)
+        finally:
+            self._invalidate_tables(destination_table_names)
+        end_timestamp = datetime.now(timezone.utc)
+        self._last_report = monitoring.build_batch_report(
+            self._expand_script_jobs(jobs, destination_table_names),
+            start_timestamp, end_timestamp)
+        return jobs
+
+    def _raise_job_failure(
+            self,
+            job: bigquery.UnknownJob,
+            running_jobs: List[bigquery.UnknownJob]) -> None:
+        if self._cancel_on_error and running_jobs:
+            logger.warning(f'cancelling {len(running_jobs)} running jobs')
+            self._cancel_jobs(running_jobs)
+        try:
             job.result()
+        except exceptions.GoogleCloudError as e:
+            destination = monitoring.get_job_destination(job)
+            e.message = (
+                f'job {job.job_id} ({destination}) failed: {e.message}')
+            raise
 
     @staticmethod
-    def sample_query(query: str, size: int) -> str:
+    def sample_query(
+            query: str,
+            size: int,
+            method: Optional[str] = 'count',
+            key: Optional[str] = None) -> str:
         """Sample randomly a query.
 
         The output query gives a subset of the lines given by the input query.
         This subset has approximately ``size`` lines. Nonetheless, the number
         of gigabytes processed is the same for the output query and the
         input query.
+
+        With the method 'count', the input query is evaluated twice: once to
+        count its lines and once to sample them. With the method 'window',
+        it is evaluated once, its lines being counted with a window
+        function. The method 'hash' is like 'window' but the lines are kept
+        according to the FARM_FINGERPRINT of the ``key`` column instead of
+        rand(), so the sample is the same from one run to the next.
         """
-        return (f'select * from ({query}) '
-                f'where rand() < {size}/(select count(*) from ({query}))')
+        if method == 'count':
+            return (f'select * from ({query}) '
+                    f'where rand() < {size}/(select count(*) from ({query}))')
+        if method == 'window':
+            condition = f'rand() < {size}/_sample_count'
+        elif method == 'hash':
+            if key is None:
+                raise ValueError("key must be passed with the method 'hash'")
+            condition = (
+                f'abs(mod(farm_fingerprint(to_json_string({key})), 1000000))'
+                f' < 1000000*{size}/_sample_count')
+        else:
+            raise ValueError(
+                "method must be one of ['count', 'window', 'hash']")
+        return (f'select * except(_sample_count) from '
+                f'(select *, count(*) over () as _sample_count '
+                f'from ({query})) '
+                f'where {condition}')
+
+    def sample_table(
+            self,
+            table_name: str,
+            size: int,
+            source_dataset_id: Optional[str] = None) -> str:
+        """Return a query sampling randomly a table with TABLESAMPLE SYSTEM.
+
+        The output query gives approximately ``size`` lines of the table.
+        The percentage of the table to sample is computed from its number of
+        rows, which costs one api call. Unlike the method sample_query, the
+        number of gigabytes processed is reduced in the same proportion,
+        because whole storage blocks are skipped. For the same reason, a
+        small table stored in a single block is either fully kept or fully
+        skipped. ``source_dataset_id`` must be given in the format
+        'project_id.dataset_name'. If not passed, falls back to
+        self.dataset_id.
+        """
+        if source_dataset_id is None:
+            source_dataset_id = self._dataset_id
+            num_rows = self.get_table(table_name).num_rows
+        else:
+            num_rows = self._client.get_table(self._build_table_id(
+                source_dataset_id, table_name)).num_rows
+        table_id = self._build_table_id(source_dataset_id, table_name)
+        percent = 100.0
+        if num_rows:
+            percent = min(percent, 100 * size / num_rows)
+        return (f'select * from `{table_id}` '
+                f'tablesample system ({percent:f} percent)')
+
+    def _sample_queries(
+            self,
+            queries: List[str],
+            size: int,
+            method: str,
+            key: Optional[str]) -> List[str]:
+        if method != 'tablesample':
+            return [self.sample_query(q, size, method, key) for q in queries]
+        res = []
+        for q in queries:
+            match = re.fullmatch(r'\s*`?([\w.-]+)`?\s*', q)
+            if match is None:
+                res.append(self.sample_query(q, size, 'window'))
+                continue
+            parts = match.group(1).split('.')
+            if len(parts) == 1:
+                res.append(self.sample_table(parts[0], size))
+            elif len(parts) == 2:
+                res.append(self.sample_table(
+                    parts[1], size, f'{self.client_project_id}.{parts[0]}'))
+            else:
+                res.append(self.sample_table(
+                    parts[-1], size, '.'.join(parts[:-1])))
+        return res
 
     def instantiate_dataset(self) -> bigquery.Dataset:
         """Instantiate the dataset. No api call is made."""
@@ -92,10 +467,13 @@ class Operator:
 
     def delete_dataset(self) -> None:
         """Delete the dataset."""
-        self._client.delete_dataset(
+        self._retry_policy.call(
+            self._client.delete_dataset,
             self._dataset_id,
             delete_contents=False,
             not_found_ok=False)
+        if self._table_cache is not None:
+            self._table_cache.invalidate_dataset(self._dataset_id)
 
     def create_dataset(self, location: str) -> None:
         """Create the dataset."""
@@ -112,21 +490,121 @@ class Operator:
         else:
             self.create_dataset(location)
 
-    def list_tables(self) -> List[str]:
-        """List the names of the tables in the dataset."""
-        tables = list(self._client.list_tables(self._dataset_id))
-        table_names = sorted([t.table_id for t in tables])
-        return table_names
+    def iter_tables(
+            self,
+            prefix: Optional[str] = None,
+            page_size: Optional[int] = None,
+            table_type: Optional[str] = None) -> Iterator[str]:
+        """Iterate over the names of the tables in the dataset, in the
+        order given by the api.
 
-    def clean_dataset(self) -> None:
-        """Delete all the tables from the dataset."""
-        for table_name in self.list_tables():
-            self.delete_table(table_name)
+        The pages of the listing are fetched lazily: the names of a page are
+        yielded before the next page is requested. The tables can be
+        filtered by a name prefix and by a table type such as 'TABLE',
+        'VIEW', 'EXTERNAL', 'MATERIALIZED_VIEW' or 'SNAPSHOT'. These filters
+        are applied client-side.
+        """
+        tables = self._client.list_tables(
+            self._dataset_id, page_size=page_size)
+        for t in tables:
+            if prefix is not None and not t.table_id.startswith(prefix):
+                continue
+            if table_type is not None and t.table_type != table_type:
+                continue
+            yield t.table_id
+
+    def list_tables(
+            self,
+            prefix: Optional[str] = None,
+            table_type: Optional[str] = None) -> List[str]:
+        """List the names of the tables in the dataset. See the method
+        iter_tables for the filters."""
+        return sorted(self.iter_tables(prefix=prefix, table_type=table_type))
+
+    def clean_dataset(
+            self,
+            mode: Optional[str] = 'delete_tables',
+            recreate_threshold: Optional[int] = 100) -> None:
+        """Delete all the tables from the dataset.
+
+        With the mode 'delete_tables', the tables are deleted concurrently,
+        starting as soon as the first page of the listing is received. The
+        deletions which hit a rate limit are retried according to the retry
+        policy of the operator.
+
+        With the mode 'recreate_dataset', the settings of the dataset are
+        captured, then the dataset is deleted with its contents and created
+        again with the same settings. This takes three api calls whatever
+        the number of tables. The routines and models of the dataset are
+        deleted too and the dataset does not exist for a short time.
+
+        With the mode 'auto', the dataset is recreated if it contains at
+        least ``recreate_threshold`` tables. Otherwise the tables are
+        deleted.
+        """
+        modes = ['delete_tables', 'recreate_dataset', 'auto']
+        if mode not in modes:
+            raise ValueError(f'mode must be one of {modes}')
+        if mode == 'recreate_dataset':
+            self._recreate_dataset()
+            return
+        table_names = self.iter_tables()
+        if mode == 'auto':
+            table_names = list(islice(table_names, recreate_threshold))
+            if len(table_names) >= recreate_threshold:
+                self._recreate_dataset()
+                return
+        self._map_lazily(self.delete_table, table_names)
+
+    def _recreate_dataset(self) -> None:
+        resource = self.get_dataset().to_api_repr()
+        for k in ['etag', 'id', 'selfLink', 'creationTime',
+                  'lastModifiedTime']:
+            resource.pop(k, None)
+        self._retry_policy.call(
+            self._client.delete_dataset,
+            self._dataset_id,
+            delete_contents=True,
+            not_found_ok=False)
+        if self._table_cache is not None:
+            self._table_cache.invalidate_dataset(self._dataset_id)
+        self._retry_policy.call(
+            self._client.create_dataset,
+            bigquery.Dataset.from_api_repr(resource),
+            exists_ok=False)
 
     @staticmethod
     def _build_table_id(dataset_id: str, table_name: str) -> str:
         return f'{dataset_id}.{table_name}'
 
+    @staticmethod
+    def build_partition_name(
+            table_name: str,
+            partition: Union[date, datetime, int, str]) -> str:
+        """Return the name of a partition, with a partition decorator,
+        which can be passed as destination table name to run_queries,
+        load_tables and copy_tables to write only this partition.
+
+        Args:
+            table_name (str): A table name.
+            partition (Union[date, datetime, int, str]): A date for a
+                partition by day, a datetime for a partition by hour, an int
+                for the start of an integer range partition, or a string
+                already in the format of the decorator, for instance
+                '202401' for a partition by month.
+        Returns:
+            str: The name in the format 'table_name$partition_id'.
+        """
+        if isinstance(partition, datetime):
+            partition = partition.strftime('%Y%m%d%H')
+        elif isinstance(partition, date):
+            partition = partition.strftime('%Y%m%d')
+        return f'{table_name}${partition}'
+
+    @staticmethod
+    def _strip_partition(table_name: str) -> str:
+        return table_name.split('$')[0]
+
     def build_table_id(self, table_name: str) -> str:
         """Return a table id.
 
@@ -144,9 +622,31 @@ class Operator:
         return bigquery.Table(table_id)
 
     def get_table(self, table_name: str) -> bigquery.Table:
-        """Get a table. An api call is made."""
+        """Get a table. An api call is made, unless a valid entry is found
+        in the table cache."""
         table_id = self.build_table_id(table_name)
-        return self._client.get_table(table_id)
+        if self._table_cache is None:
+            return self._client.get_table(table_id)
+        try:
+            table = self._table_cache.get(table_id)
+        except KeyError:
+            try:
+                table = self._client.get_table(table_id)
+            except exceptions.NotFound:
+                self._table_cache.set(table_id, None)
+                raise
+            self._table_cache.set(table_id, table)
+            return table
+        if table is None:
+            raise exceptions.NotFound(
+                f'Not found: Table {table_id} (cached)')
+        return table
+
+    def _invalidate_tables(self, table_names: List[str]) -> None:
+        if self._table_cache is not None:
+            for n in table_names:
+                self._table_cache.invalidate(
+                    self.build_table_id(self._strip_partition(n)))
 
     def table_exists(self, table_name: str) -> bool:
         """Return True if the table exists."""
@@ -159,24 +659,81 @@ class Operator:
     def delete_table(self, table_name: str) -> None:
         """Delete a table."""
         table_id = self.build_table_id(table_name)
-        self._client.delete_table(table_id, not_found_ok=False)
+        try:
+            self._retry_policy.call(
+                self._client.delete_table, table_id, not_found_ok=False)
+        finally:
+            self._invalidate_tables([table_name])
 
     def delete_table_if_exists(self, table_name: str) -> None:
         """Delete a table if it exists."""
         if self.table_exists(table_name):
             self.delete_table(table_name)
 
+    def diff_format_attributes(
+            self, reference: str, table_name: str) -> List[dict]:
+        """Return the changes turning the format attributes of a table into
+        those of the reference table. The changes are classified by the
+        function diff_format_attributes of the module
+        bigquery_operator.schema_diff: each one is a dict with the keys
+        kind, field, reference, table and compatible, the latter being True
+        if the change can be applied in place."""
+        return schema_diff.diff_format_attributes(
+            self.get_format_attributes(reference),
+            self.get_format_attributes(table_name))
+
     def delete_table_if_mismatches(
-            self, reference: str, table_name: str) -> None:
+            self,
+            reference: str,
+            table_name: str,
+            evolve_schema: Optional[bool] = False) -> None:
         """Delete a table if the format attributes of the table and the
         reference table are not the same. The format attributes are given
-        by the method get_format_attributes."""
+        by the method get_format_attributes.
+
+        If ``evolve_schema`` is True and all the changes given by the method
+        diff_format_attributes are compatible, that is are added nullable
+        columns, relaxed columns, integer or numeric columns widened to
+        a numeric, bignumeric or float type, changed descriptions or a
+        changed require_partition_filter, the table is updated in place
+        instead of being deleted: the columns are widened with an ALTER
+        TABLE statement and the schema is then replaced by the one of the
+        reference table. The table is deleted if any change, such as a
+        removed column or a change of partitioning or clustering, cannot be
+        applied in place.
+        """
         if self.table_exists(reference) and self.table_exists(table_name):
             reference_format = self.get_format_attributes(reference)
             table_format = self.get_format_attributes(table_name)
-            if reference_format != table_format:
+            if reference_format == table_format:
+                return
+            changes = schema_diff.diff_format_attributes(
+                reference_format, table_format)
+            if evolve_schema and schema_diff.is_compatible(changes):
+                self._evolve_table(table_name, reference_format, changes)
+            else:
                 self.delete_table(table_name)
 
+    def _evolve_table(
+            self,
+            table_name: str,
+            reference_format: dict,
+            changes: List[dict]) -> None:
+        statement = schema_diff.build_alter_statement(
+            self.build_table_id(table_name), changes)
+        if statement is not None:
+            try:
+                self._submit_job(lambda job_id: self._client.query(
+                    query=statement, job_id=job_id)).result()
+            finally:
+                self._invalidate_tables([table_name])
+        table = self.get_table(table_name)
+        table.schema = reference_format['schema']
+        table.require_partition_filter = \
+            reference_format['require_partition_filter']
+        self._update_table(
+            table_name, table, ['schema', 'require_partition_filter'])
+
     def create_empty_table(
             self,
             table_name: str,
@@ -198,7 +755,10 @@ class Operator:
         table.range_partitioning = range_partitioning
         table.require_partition_filter = require_partition_filter
         table.clustering_fields = clustering_fields
-        self._client.create_table(table, exists_ok=False)
+        try:
+            self._client.create_table(table, exists_ok=False)
+        finally:
+            self._invalidate_tables([table_name])
         if time_to_live is not None:
             self.set_time_to_live(table_name, time_to_live)
 
@@ -211,33 +771,272 @@ class Operator:
         schema = self.get_table(table_name).schema
         return [f.name for f in schema]
 
-    def get_table_rows(self, table_name: str) -> List[bigquery.Row]:
-        """Return the rows of a table."""
+    def _get_selected_fields(
+            self,
+            table_name: str,
+            selected_fields: Optional[List[str]]
+    ) -> Optional[List[bigquery.SchemaField]]:
+        if selected_fields is None:
+            return None
+        schema = {f.name: f for f in self.get_table(table_name).schema}
+        unknown_fields = [n for n in selected_fields if n not in schema]
+        if unknown_fields:
+            raise ValueError(f'unknown selected fields: {unknown_fields}')
+        return [schema[n] for n in selected_fields]
+
+    def _list_rows(
+            self,
+            table_name: str,
+            selected_fields: Optional[List[str]],
+            max_results: Optional[int],
+            page_size: Optional[int] = None) -> bigquery.table.RowIterator:
         table_id = self.build_table_id(table_name)
-        res = list(self._client.list_rows(table_id))
-        return res
+        return self._client.list_rows(
+            table_id,
+            selected_fields=self._get_selected_fields(
+                table_name, selected_fields),
+            max_results=max_results,
+            page_size=page_size)
 
-    def get_query_rows(self, query: str) -> List[bigquery.Row]:
-        """Return the rows of a query."""
-        res = list(self._client.query(query).result())
-        return res
+    def _query_rows(
+            self,
+            query: str,
+            max_results: Optional[int],
+            page_size: Optional[int] = None) -> bigquery.table.RowIterator:
+        return self._client.query(query).result(
+            max_results=max_results, page_size=page_size)
+
+    @staticmethod
+    def _iter_batches(
+            rows: Iterable[bigquery.Row],
+            batch_size: int) -> Iterator[List[bigquery.Row]]:
+        rows = iter(rows)
+        batch = list(islice(rows, batch_size))
+        while batch:
+            yield batch
+            batch = list(islice(rows, batch_size))
+
+    def get_table_rows(
+            self,
+            table_name: str,
+            selected_fields: Optional[List[str]] = None,
+            max_results: Optional[int] = None) -> List[bigquery.Row]:
+        """Return the rows of a table. If passed, only the columns named in
+        ``selected_fields`` and at most ``max_results`` rows are
+        fetched."""
+        return list(self._list_rows(table_name, selected_fields, max_results))
+
+    def get_query_rows(
+            self,
+            query: str,
+            max_results: Optional[int] = None) -> List[bigquery.Row]:
+        """Return the rows of a query. If passed, at most ``max_results``
+        rows are fetched."""
+        return list(self._query_rows(query, max_results))
+
+    def iter_table_rows(
+            self,
+            table_name: str,
+            batch_size: Optional[int] = 10000,
+            selected_fields: Optional[List[str]] = None,
+            max_results: Optional[int] = None
+    ) -> Iterator[List[bigquery.Row]]:
+        """Iterate over the rows of a table by lists of ``batch_size``
+        rows, the last one being possibly shorter. The pages of rows are
+        fetched lazily, so only one batch is held in memory at a time. See
+        the method get_table_rows for the other arguments."""
+        rows = self._list_rows(
+            table_name, selected_fields, max_results, batch_size)
+        return self._iter_batches(rows, batch_size)
+
+    def iter_query_rows(
+            self,
+            query: str,
+            batch_size: Optional[int] = 10000,
+            max_results: Optional[int] = None
+    ) -> Iterator[List[bigquery.Row]]:
+        """Iterate over the rows of a query by lists of ``batch_size``
+        rows, the last one being possibly shorter. The pages of rows are
+        fetched lazily, so only one batch is held in memory at a time."""
+        rows = self._query_rows(query, max_results, batch_size)
+        return self._iter_batches(rows, batch_size)
+
+    def get_table_arrow(
+            self,
+            table_name: str,
+            selected_fields: Optional[List[str]] = None,
+            max_results: Optional[int] = None) -> 'pyarrow.Table':
+        """Return the rows of a table as a pyarrow.Table, pyarrow being
+        required.
+
+        If the package google-cloud-bigquery-storage is installed, the rows
+        are downloaded with the BigQuery Storage Read API, which reads
+        several streams in parallel. Otherwise, or if ``max_results`` is
+        passed, falls back to the paginated REST api. See the method
+        get_table_rows for the other arguments.
+        """
+        return self._list_rows(
+            table_name, selected_fields, max_results).to_arrow(
+            create_bqstorage_client=True)
+
+    def get_table_dataframe(
+            self,
+            table_name: str,
+            selected_fields: Optional[List[str]] = None,
+            max_results: Optional[int] = None) -> 'pandas.DataFrame':
+        """Return the rows of a table as a pandas.DataFrame, pandas being
+        required. See the method get_table_arrow for the download
+        method."""
+        return self._list_rows(
+            table_name, selected_fields, max_results).to_dataframe(
+            create_bqstorage_client=True)
+
+    def get_query_arrow(
+            self,
+            query: str,
+            max_results: Optional[int] = None) -> 'pyarrow.Table':
+        """Return the rows of a query as a pyarrow.Table, pyarrow being
+        required. See the method get_table_arrow for the download
+        method."""
+        return self._query_rows(query, max_results).to_arrow(
+            create_bqstorage_client=True)
+
+    def get_query_dataframe(
+            self,
+            query: str,
+            max_results: Optional[int] = None) -> 'pandas.DataFrame':
+        """Return the rows of a query as a pandas.DataFrame, pandas being
+        required. See the method get_table_arrow for the download
+        method."""
+        return self._query_rows(query, max_results).to_dataframe(
+            create_bqstorage_client=True)
 
     def get_format_attributes(self, table_name):
         """Return the following table attributes:
         schema, time_partitioning, range_partitioning,
         require_partition_filter, clustering_fields.
         """
+        table = self.get_table(table_name)
         res = dict()
         for a in ['schema', 'time_partitioning', 'range_partitioning',
                   'require_partition_filter', 'clustering_fields']:
-            res[a] = getattr(self.get_table(table_name), a)
+            res[a] = getattr(table, a)
         return res
 
+    def _get_metadata_rows(
+            self,
+            query: str,
+            location: str,
+            table_names: Optional[List[str]]) -> List[bigquery.Row]:
+        job_config = bigquery.QueryJobConfig()
+        job_config.query_parameters = [
+            bigquery.ScalarQueryParameter(
+                'all_tables', 'BOOL', table_names is None),
+            bigquery.ArrayQueryParameter(
+                'table_names', 'STRING', table_names or [])]
+        job = self._client.query(
+            query=query, job_config=job_config, location=location)
+        return list(job.result())
+
+    def get_tables_metadata(
+            self, table_names: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Return the metadata of several tables with two INFORMATION_SCHEMA
+        queries, whatever the number of tables. If ``table_names`` is not
+        passed, all the tables of the dataset are described.
+
+        The result maps the name of each existing table to a dict with the
+        keys table_type, created, modified, num_rows, num_bytes, columns and
+        data_types. The tables which do not exist are absent from the result.
+
+        The values of modified, num_rows and num_bytes come from the
+        TABLE_STORAGE view, which is refreshed asynchronously by BigQuery and
+        requires the permission to list the tables of the dataset project.
+        They are None for views.
+        """
+        location = self.get_dataset().location
+        region = f'region-{location.lower()}'
+        tables_query = f"""
+        select
+        t.table_name,
+        t.table_type,
+        t.creation_time,
+        s.storage_last_modified_time,
+        s.total_rows,
+        s.total_logical_bytes
+        from `{self._dataset_id}.INFORMATION_SCHEMA.TABLES` as t
+        left join
+        `{self._dataset_project_id}.{region}.INFORMATION_SCHEMA.TABLE_STORAGE`
+        as s
+        on s.table_schema = t.table_schema
+        and s.table_name = t.table_name
+        and not s.deleted
+        where @all_tables or t.table_name in unnest(@table_names)
+        """
+        columns_query = f"""
+        select table_name, column_name, data_type
+        from `{self._dataset_id}.INFORMATION_SCHEMA.COLUMNS`
+        where @all_tables or table_name in unnest(@table_names)
+        order by table_name, ordinal_position
+        """
+        table_rows, column_rows = self._map(
+            lambda q: self._get_metadata_rows(q, location, table_names),
+            [tables_query, columns_query])
+        res = dict()
+        for r in sorted(table_rows, key=lambda r: r.table_name):
+            res[r.table_name] = {
+                'table_type': r.table_type,
+                'created': r.creation_time,
+                'modified': r.storage_last_modified_time,
+                'num_rows': r.total_rows,
+                'num_bytes': r.total_logical_bytes,
+                'columns': [],
+                'data_types': []}
+        for r in column_rows:
+            if r.table_name in res:
+                res[r.table_name]['columns'].append(r.column_name)
+                res[r.table_name]['data_types'].append(r.data_type)
+        return res
+
+    def get_partitions_metadata(
+            self,
+            table_names: Optional[List[str]] = None,
+            dataset_id: Optional[str] = None) -> Dict[str, Dict[str, dict]]:
+        """Return the partitions of several tables with one query on the
+        INFORMATION_SCHEMA.PARTITIONS view. ``dataset_id`` must be given in
+        the format 'project_id.dataset_name'. If not passed, falls back to
+        self.dataset_id. If ``table_names`` is not passed, all the tables of
+        the dataset are described.
+
+        The result maps the name of each existing table to a dict which
+        maps the id of each partition to a dict with the keys modified and
+        num_rows. An unpartitioned table has a single partition whose id is
+        None.
+        """
+        if dataset_id is None:
+            dataset_id = self._dataset_id
+        location = self._client.get_dataset(dataset_id).location
+        query = f"""
+        select table_name, partition_id, last_modified_time, total_rows
+        from `{dataset_id}.INFORMATION_SCHEMA.PARTITIONS`
+        where @all_tables or table_name in unnest(@table_names)
+        """
+        res = dict()
+        for r in self._get_metadata_rows(query, location, table_names):
+            res.setdefault(r.table_name, dict())[r.partition_id] = {
+                'modified': r.last_modified_time,
+                'num_rows': r.total_rows}
+        return res
+
+    def describe_dataset(self) -> Dict[str, dict]:
+        """Return the metadata of all the tables of the dataset. See the
+        method get_tables_metadata for the format of the result."""
+        return self.get_tables_metadata()
+
     def set_time_to_live(
             self,
             table_name: str,
             nb_days: int,
-            retry_delays: Tuple[int, ...] = (10, 30)) -> None:
+            retry_delays: Optional[Tuple[int, ...]] = None) -> None:
         """Set the time to live of a table in days. More precisely the
         expires attribute of the table is set to UTC midnight between
         (today + nb_days) and (today + nb_days + 1), if it has not already
@@ -245,22 +1044,23 @@ class Operator:
 
         We have noticed that some
         unexpected google.api_core.exceptions.PreconditionFailed can
-        happen. That is why we try to update the table several times. If this
-        exception is raised, we try again after a delay. The retry delays
-        are specified in seconds in the argument retry_delays.
+        happen. That is why we try to update the table several times. By
+        default, the table is fetched and updated again according to the
+        retry policy of the operator. If the argument retry_delays is
+        passed, the retries are instead done after these fixed delays,
+        specified in seconds, and only for PreconditionFailed.
         """
-        expiration_date = (
-                datetime.now(timezone.utc) +
-                timedelta(days=nb_days + 1)).date()
-        expiration_time = datetime.combine(
-            expiration_date, datetime.min.time(), tzinfo=timezone.utc)
+        expiration_time = self._build_expiration_time(nb_days)
+        if retry_delays is None:
+            self._set_expires(table_name, expiration_time)
+            return
         for duration in retry_delays:
             table = self.get_table(table_name)
             if expiration_time == table.expires:
                 return
             table.expires = expiration_time
             try:
-                self._client.update_table(table, ['expires'])
+                self._update_table(table_name, table, ['expires'])
             except PreconditionFailed as e:
                 logger.warning(e)
                 logger.warning(f'sleeping {duration} seconds before next try')
@@ -269,7 +1069,66 @@ class Operator:
         if expiration_time == table.expires:
             return
         table.expires = expiration_time
-        self._client.update_table(table, ['expires'])
+        self._update_table(table_name, table, ['expires'])
+
+    @staticmethod
+    def _build_expiration_time(nb_days: int) -> datetime:
+        expiration_date = (
+                datetime.now(timezone.utc) +
+                timedelta(days=nb_days + 1)).date()
+        return datetime.combine(
+            expiration_date, datetime.min.time(), tzinfo=timezone.utc)
+
+    def _set_expires(
+            self,
+            table_name: str,
+            expiration_time: datetime,
+            table: Optional[bigquery.Table] = None) -> None:
+        prefetched_tables = [] if table is None else [table]
+
+        def attempt():
+            if prefetched_tables:
+                t = prefetched_tables.pop()
+            else:
+                t = self.get_table(table_name)
+            if expiration_time == t.expires:
+                return
+            t.expires = expiration_time
+            self._update_table(table_name, t, ['expires'])
+
+        self._retry_policy.call(attempt)
+
+    def set_times_to_live(self, table_names: List[str], nb_days: int) -> None:
+        """Set the time to live of several tables in days, as the method
+        set_time_to_live does for one table.
+
+        The tables are fetched concurrently, those which have already the
+        right expires attribute are skipped and the others are updated
+        concurrently. The partition decorators of the table names are
+        ignored. A failed update is retried, after fetching the table
+        again, according to the retry policy of the operator.
+        """
+        expiration_time = self._build_expiration_time(nb_days)
+        table_names = list(dict.fromkeys(
+            self._strip_partition(n) for n in table_names))
+        tables = self._map(self.get_table, table_names)
+        outdated = [(n, t) for n, t in zip(table_names, tables)
+                    if t.expires != expiration_time]
+        self._map(
+            lambda n, t: self._set_expires(n, expiration_time, t),
+            *zip(*outdated))
+
+    def _update_table(
+            self,
+            table_name: str,
+            table: bigquery.Table,
+            fields: List[str]) -> bigquery.Table:
+        if self._job_scheduler is not None:
+            self._job_scheduler.acquire_update()
+        try:
+            return self._client.update_table(table, fields)
+        finally:
+            self._invalidate_tables([table_name])
 
     def create_view(
             self,
@@ -282,91 +1141,224 @@ class Operator:
             self.delete_table_if_exists(destination_table_name)
         view = self.instantiate_table(destination_table_name)
         view.view_query = query
-        self._client.create_table(view, exists_ok=False)
+        try:
+            self._client.create_table(view, exists_ok=False)
+        finally:
+            self._invalidate_tables([destination_table_name])
         if time_to_live is not None:
             self.set_time_to_live(destination_table_name, time_to_live)
 
+    def _submit_job(
+            self,
+            submit: Callable[[str], bigquery.UnknownJob]
+    ) -> bigquery.UnknownJob:
+        job_id = str(uuid.uuid4())
+
+        def attempt():
+            if self._job_scheduler is not None:
+                self._job_scheduler.acquire_job_insert()
+            try:
+                return submit(job_id)
+            except exceptions.Conflict:
+                # A previous attempt created the job before failing.
+                return self._client.get_job(job_id)
+
+        return self._retry_policy.call(attempt)
+
+    def _dry_run_job(self, query: str) -> bigquery.QueryJob:
+        job_config = bigquery.QueryJobConfig()
+        job_config.dry_run = True
+        job_config.use_query_cache = False
+
+        def attempt():
+            if self._job_scheduler is not None:
+                self._job_scheduler.acquire_job_insert()
+            return self._client.query(query=query, job_config=job_config)
+
+        return self._retry_policy.call(attempt)
+
+    @staticmethod
+    def _build_estimate(job: bigquery.QueryJob) -> dict:
+        nb_bytes = job.total_bytes_processed or 0
+        return {
+            'bytes': nb_bytes,
+            'GB': nb_bytes / 10 ** 9,
+            'referenced_tables': [
+                f'{t.project}.{t.dataset_id}.{t.table_id}'
+                for t in job.referenced_tables],
+            'schema': job.schema}
+
+    def estimate_queries(self, queries: List[str]) -> List[dict]:
+        """Estimate queries with dry runs, which are free and run
+        concurrently. Return for each query a dict with the keys bytes and
+        GB, the number of bytes and gigabytes the query would process,
+        referenced_tables, the ids of the tables it reads in the format
+        'project_id.dataset_name.table_name', and schema, the schema of its
+        result.
+        """
+        return self._map(
+            lambda q: self._build_estimate(self._dry_run_job(q)), queries)
+
+    def estimate_query(self, query: str) -> dict:
+        """Estimate a query. See the method estimate_queries for the
+        format of the result."""
+        return self.estimate_queries([query])[0]
+
+    def _check_budget(self, queries: List[str], max_total_gb: float) -> None:
+        total_gb = sum(e['GB'] for e in self.estimate_queries(queries))
+        if total_gb > max_total_gb:
+            raise ValueError(
+                f'the queries would process {total_gb:.2f} GB, which '
+                f'exceeds max_total_gb={max_total_gb}')
+
     def _query_job(
             self,
             query: str,
             destination_table_name: str,
-            write_disposition: bigquery.WriteDisposition
+            write_disposition: bigquery.WriteDisposition,
+            expiration_time: Optional[datetime] = None,
+            maximum_bytes_billed: Optional[int] = None,
+            priority: Optional[str] = None
     ) -> bigquery.QueryJob:
+        destination = self.build_table_id(destination_table_name)
         job_config = bigquery.QueryJobConfig()
-        job_config.destination = self.build_table_id(destination_table_name)
-        job_config.write_disposition = write_disposition
-        job = self._client.query(query=query, job_config=job_config)
-        return job
+        job_config.maximum_bytes_billed = maximum_bytes_billed
+        job_config.priority = priority
+        if expiration_time is None:
+            job_config.destination = destination
+            job_config.write_disposition = write_disposition
+        else:
+            query = self._build_create_statement(
+                query, destination, expiration_time)
+        return self._submit_job(lambda job_id: self._client.query(
+            query=query, job_config=job_config, job_id=job_id))
+
+    @staticmethod
+    def _build_create_statement(
+            query: str,
+            destination: str,
+            expiration_time: Optional[datetime]) -> str:
+        options = ''
+        if expiration_time is not None:
+            options = (f"options(expiration_timestamp=timestamp "
+                       f"'{expiration_time}') ")
+        return f'create or replace table `{destination}` {options}as {query}'
+
+    def _script_job(
+            self,
+            queries: List[str],
+            destination_table_names: List[str],
+            expiration_time: Optional[datetime] = None,
+            maximum_bytes_billed: Optional[int] = None,
+            priority: Optional[str] = None
+    ) -> bigquery.QueryJob:
+        script = '\n;\n'.join(
+            self._build_create_statement(
+                q, self.build_table_id(n), expiration_time)
+            for q, n in zip(queries, destination_table_names))
+        job_config = bigquery.QueryJobConfig()
+        if maximum_bytes_billed is not None:
+            job_config.maximum_bytes_billed = \
+                maximum_bytes_billed * len(queries)
+        job_config.priority = priority
+        return self._submit_job(lambda job_id: self._client.query(
+            query=script, job_config=job_config, job_id=job_id))
+
+    def _script_jobs(
+            self,
+            queries: List[str],
+            destination_table_names: List[str],
+            pack_size: int,
+            expiration_time: Optional[datetime] = None,
+            maximum_bytes_billed: Optional[int] = None,
+            priority: Optional[str] = None
+    ) -> List[Callable[[], bigquery.QueryJob]]:
+        self._check_queries(queries, destination_table_names)
+        return [partial(self._script_job, queries[i:i + pack_size],
+                        destination_table_names[i:i + pack_size],
+                        expiration_time, maximum_bytes_billed, priority)
+                for i in range(0, len(queries), pack_size)]
+
+    def _expand_script_jobs(
+            self,
+            jobs: List[bigquery.UnknownJob],
+            destination_table_names: List[str]
+    ) -> List[bigquery.UnknownJob]:
+        # The child jobs are ordered by destination since their creation
+        # times can be equal.
+        indexes = {self.build_table_id(n): i
+                   for i, n in enumerate(destination_table_names)}
+
+        def expand(job):
+            if getattr(job, 'statement_type', None) != 'SCRIPT':
+                return [job]
+            children = list(self._client.list_jobs(parent_job=job))
+            return sorted(children, key=lambda j: indexes.get(
+                monitoring.get_job_destination(j), len(indexes)))
+
+        return [j for children in self._map(expand, jobs) for j in children]
 
     def _extract_job(
             self,
             source_table_name: str,
             destination_uri: str,
-            compression: bigquery.Compression,
-            field_delimiter: str,
-            print_header: bool
+            job_config: bigquery.ExtractJobConfig
     ) -> bigquery.ExtractJob:
         source = self.build_table_id(source_table_name)
-        job_config = bigquery.ExtractJobConfig()
-        job_config.destination_format = 'CSV'
-        job_config.compression = compression
-        job_config.field_delimiter = field_delimiter
-        job_config.print_header = print_header
-        job = self._client.extract_table(
+        return self._submit_job(lambda job_id: self._client.extract_table(
             source=source,
             destination_uris=destination_uri,
-            job_config=job_config)
-        return job
+            job_config=job_config,
+            job_id=job_id))
 
     def _load_job(
             self,
             source_uri: str,
             destination_table_name: str,
             schema: List[bigquery.SchemaField],
-            field_delimiter: str,
-            write_disposition: bigquery.WriteDisposition
+            job_config: bigquery.LoadJobConfig
     ) -> bigquery.LoadJob:
         destination = self.build_table_id(destination_table_name)
-        job_config = bigquery.LoadJobConfig()
-        job_config.source_format = 'CSV'
-        job_config.field_delimiter = field_delimiter
-        if schema is None:
-            job_config.autodetect = True
-        else:
-            job_config.schema = schema
-            job_config.skip_leading_rows = 1
-        job_config.write_disposition = write_disposition
-        job = self._client.load_table_from_uri(
-            source_uris=source_uri,
-            destination=destination,
-            job_config=job_config)
-        return job
+        job_config = self._set_load_schema(job_config, schema)
+        return self._submit_job(
+            lambda job_id: self._client.load_table_from_uri(
+                source_uris=source_uri,
+                destination=destination,
+                job_config=job_config,
+                job_id=job_id))
 
     def _copy_job(
             self,
-            source_table_name: str,
+            source_table_name: Union[str, List[str]],
             destination_table_name: str,
             source_dataset_id: str,
-            write_disposition: bigquery.WriteDisposition
+            write_disposition: bigquery.WriteDisposition,
+            operation_type: Optional[str] = 'COPY'
     ) -> bigquery.CopyJob:
-        source_table_id = self._build_table_id(
-            source_dataset_id, source_table_name)
+        if isinstance(source_table_name, str):
+            source_table_name = [source_table_name]
+        source_table_ids = [
+            self._build_table_id(source_dataset_id, n)
+            for n in source_table_name]
         destination_table_id = self.build_table_id(
             destination_table_name)
         job_config = bigquery.CopyJobConfig()
         job_config.write_disposition = write_disposition
-        job = self._client.copy_table(
-            sources=source_table_id,
+        if operation_type != 'COPY':
+            job_config.operation_type = operation_type
+        if operation_type == 'SNAPSHOT':
+            job_config.write_disposition = \
+                bigquery.WriteDisposition.WRITE_EMPTY
+        return self._submit_job(lambda job_id: self._client.copy_table(
+            sources=source_table_ids,
             destination=destination_table_id,
-            job_config=job_config)
-        return job
+            job_config=job_config,
+            job_id=job_id))
 
-    def _query_jobs(
-            self,
+    @staticmethod
+    def _check_queries(
             queries: List[str],
-            destination_table_names: List[str],
-            write_disposition: bigquery.WriteDisposition
-    ) -> List[bigquery.QueryJob]:
+            destination_table_names: List[str]) -> None:
         len_queries = len(queries)
         len_destination_table_names = len(destination_table_names)
         if len_queries == 0:
@@ -374,17 +1366,106 @@ class Operator:
         if len_queries != len_destination_table_names:
             raise ValueError('queries and destination_table_names must have '
                              'the same length')
-        return [self._query_job(q, d, write_disposition)
+
+    def _build_fingerprints(
+            self,
+            queries: List[str],
+            destination_table_names: List[str]) -> List[dict]:
+        estimates = self.estimate_queries(queries)
+        sources_list = [
+            [t for t in e['referenced_tables']
+             if t != self.build_table_id(n)]
+            for e, n in zip(estimates, destination_table_names)]
+        source_ids = sorted({t for sources in sources_list for t in sources})
+        modified = self._get_data_modified(source_ids)
+        res = []
+        for q, sources in zip(queries, sources_list):
+            last_modified = max(
+                [modified[t] for t in sources], default=None)
+            sources_modified = 'none'
+            if last_modified is not None:
+                sources_modified = str(
+                    int(last_modified.timestamp() * 1000))
+            res.append({
+                QUERY_HASH_LABEL: hashlib.sha256(q.encode()).hexdigest()[:40],
+                SOURCES_MODIFIED_LABEL: sources_modified})
+        return res
+
+    def _get_data_modified(self, table_ids: List[str]) -> Dict[str, datetime]:
+        # The last modification time of a table also changes with its
+        # metadata, such as its labels or expiration, unlike the one of its
+        # partitions. Tables without partitions, like views, fall back on it.
+        datasets = dict()
+        for t in table_ids:
+            dataset_id, table_name = t.rsplit('.', 1)
+            datasets.setdefault(dataset_id, []).append(table_name)
+        partitions_list = self._map(
+            lambda d: self.get_partitions_metadata(datasets[d], d),
+            list(datasets))
+        res = dict()
+        for d, partitions in zip(datasets, partitions_list):
+            for n, p in partitions.items():
+                res[f'{d}.{n}'] = max(m['modified'] for m in p.values())
+        missing = [t for t in table_ids if t not in res]
+        res.update(zip(missing, self._map(
+            lambda t: self._client.get_table(t).modified, missing)))
+        return res
+
+    def _is_unchanged(self, table_name: str, fingerprint: dict) -> bool:
+        try:
+            labels = self.get_table(table_name).labels
+        except exceptions.NotFound:
+            return False
+        return all(labels.get(k) == v for k, v in fingerprint.items())
+
+    def _set_labels(self, table_name: str, labels: dict) -> None:
+        def attempt():
+            table = self.get_table(table_name)
+            table.labels = {**table.labels, **labels}
+            self._update_table(table_name, table, ['labels'])
+
+        self._retry_policy.call(attempt)
+
+    def _query_jobs(
+            self,
+            queries: List[str],
+            destination_table_names: List[str],
+            write_disposition: bigquery.WriteDisposition,
+            expiration_time: Optional[datetime] = None,
+            maximum_bytes_billed: Optional[int] = None,
+            priority: Optional[str] = None
+    ) -> List[Callable[[], bigquery.QueryJob]]:
+        self._check_queries(queries, destination_table_names)
+        return [partial(self._query_job, q, d, write_disposition,
+                        expiration_time, maximum_bytes_billed, priority)
                 for q, d in zip(queries, destination_table_names)]
 
+    @staticmethod
+    def _build_extract_job_config(
+            destination_format: str,
+            compression: bigquery.Compression,
+            field_delimiter: str,
+            print_header: bool,
+            use_avro_logical_types: bool) -> bigquery.ExtractJobConfig:
+        if destination_format not in DESTINATION_FORMATS:
+            raise ValueError(
+                f'destination_format must be one of {DESTINATION_FORMATS}')
+        job_config = bigquery.ExtractJobConfig()
+        job_config.destination_format = destination_format
+        job_config.compression = compression
+        if destination_format == 'CSV':
+            job_config.field_delimiter = field_delimiter
+            job_config.print_header = print_header
+        if destination_format == 'AVRO':
+            job_config.use_avro_logical_types = use_avro_logical_types
+        return job_config
+
     def _extract_jobs(
             self,
             source_table_names: List[str],
             destination_uris: List[str],
-            compression: bigquery.Compression,
-            field_delimiter: str,
-            print_header: bool
-    ) -> List[bigquery.ExtractJob]:
+            job_config: bigquery.ExtractJobConfig
+    ) -> List[Callable[[], bigquery.ExtractJob]]:
         len_source_table_names = len(source_table_names)
         len_destination_uris = len(destination_uris)
         if len_source_table_names == 0:
@@ -392,18 +1473,142 @@ class Operator:
         if len_source_table_names != len_destination_uris:
             raise ValueError('source_table_names and destination_uris '
                              'must have the same length')
-        return [self._extract_job(
-            s, d, compression, field_delimiter, print_header)
+        return [partial(self._extract_job, s, d, job_config)
                 for s, d in zip(source_table_names, destination_uris)]
 
+    @staticmethod
+    def _build_load_job_config(
+            source_format: str,
+            field_delimiter: str,
+            write_disposition: bigquery.WriteDisposition,
+            use_avro_logical_types: bool,
+            parquet_enable_list_inference: bool,
+            parquet_enum_as_string: bool) -> bigquery.LoadJobConfig:
+        if source_format not in SOURCE_FORMATS:
+            raise ValueError(f'source_format must be one of {SOURCE_FORMATS}')
+        job_config = bigquery.LoadJobConfig()
+        job_config.source_format = source_format
+        job_config.write_disposition = write_disposition
+        if source_format == 'CSV':
+            job_config.field_delimiter = field_delimiter
+        if source_format == 'AVRO':
+            job_config.use_avro_logical_types = use_avro_logical_types
+        if source_format == 'PARQUET':
+            parquet_options = bigquery.ParquetOptions()
+            parquet_options.enable_list_inference = \
+                parquet_enable_list_inference
+            parquet_options.enum_as_string = parquet_enum_as_string
+            job_config.parquet_options = parquet_options
+        return job_config
+
+    @staticmethod
+    def _set_load_schema(
+            job_config: bigquery.LoadJobConfig,
+            schema: Optional[List[bigquery.SchemaField]]
+    ) -> bigquery.LoadJobConfig:
+        job_config = bigquery.LoadJobConfig.from_api_repr(
+            job_config.to_api_repr())
+        is_text = job_config.source_format in ['CSV', 'NEWLINE_DELIMITED_JSON']
+        if schema is None:
+            if is_text:
+                job_config.autodetect = True
+        else:
+            job_config.schema = schema
+            if job_config.source_format == 'CSV':
+                job_config.skip_leading_rows = 1
+        return job_config
+
+    @staticmethod
+    def _check_sources(
+            sources: List[Any],
+            destination_table_names: List[str],
+            sources_name: str) -> None:
+        if len(sources) == 0:
+            raise ValueError(f'{sources_name} must not be empty')
+        if len(sources) != len(destination_table_names):
+            raise ValueError(f'{sources_name} and destination_table_names '
+                             'must have the same length')
+
+    def _load_file_job(
+            self,
+            file_path: str,
+            destination_table_name: str,
+            schema: List[bigquery.SchemaField],
+            job_config: bigquery.LoadJobConfig
+    ) -> bigquery.LoadJob:
+        destination = self.build_table_id(destination_table_name)
+        job_config = self._set_load_schema(job_config, schema)
+
+        def submit(job_id):
+            with open(file_path, 'rb') as f:
+                return self._client.load_table_from_file(
+                    f,
+                    destination=destination,
+                    job_config=job_config,
+                    job_id=job_id)
+
+        return self._submit_job(submit)
+
+    @staticmethod
+    def _write_arrow_parquet(
+            table: 'pyarrow.Table',
+            file_path: str,
+            chunk_size: int) -> None:
+        import pyarrow.parquet
+        with pyarrow.parquet.ParquetWriter(file_path, table.schema) as w:
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                w.write_batch(batch)
+
+    @staticmethod
+    def _write_dataframe_parquet(
+            dataframe: 'pandas.DataFrame',
+            file_path: str,
+            chunk_size: int) -> None:
+        import pyarrow
+        import pyarrow.parquet
+        schema = pyarrow.Schema.from_pandas(dataframe, preserve_index=False)
+        with pyarrow.parquet.ParquetWriter(file_path, schema) as w:
+            for i in range(0, max(len(dataframe), 1), chunk_size):
+                w.write_table(pyarrow.Table.from_pandas(
+                    dataframe.iloc[i:i + chunk_size],
+                    schema=schema,
+                    preserve_index=False))
+
+    def _load_parquet_files(
+            self,
+            write_files: List[Callable[[str], None]],
+            destination_table_names: List[str],
+            time_to_live: Optional[int],
+            schemas: Optional[List[List[bigquery.SchemaField]]],
+            write_disposition: bigquery.WriteDisposition) -> None:
+        if schemas is None:
+            schemas = [None]*len(write_files)
+        job_config = self._build_load_job_config(
+            'PARQUET', None, write_disposition, True, True, True)
+        with tempfile.TemporaryDirectory() as dir_path:
+            def submit(write_file, n, schema):
+                file_path = os.path.join(dir_path, f'{uuid.uuid4().hex}.pq')
+                write_file(file_path)
+                try:
+                    return self._load_file_job(
+                        file_path, n, schema, job_config)
+                finally:
+                    os.remove(file_path)
+
+            self._run_batch(
+                [partial(submit, w, n, sch) for w, n, sch in zip(
+                    write_files, destination_table_names, schemas)],
+                destination_table_names)
+        if time_to_live is not None:
+            self.set_times_to_live(destination_table_names, time_to_live)
+
     def _load_jobs(
             self,
             source_uris: List[str],
             destination_table_names: List[str],
             schemas: List[List[bigquery.SchemaField]],
-            field_delimiter: str,
-            write_disposition: bigquery.WriteDisposition
-    ) -> List[bigquery.LoadJob]:
+            job_config: bigquery.LoadJobConfig
+    ) -> List[Callable[[], bigquery.LoadJob]]:
         len_source_uris = len(source_uris)
         len_destination_table_names = len(destination_table_names)
         if len_source_uris == 0:
@@ -411,28 +1616,63 @@ class Operator:
         if len_source_uris != len_destination_table_names:
             raise ValueError('source_uris and destination_table_names '
                              'must have the same length')
-        return [
-            self._load_job(s, d, sch, field_delimiter, write_disposition)
-            for s, d, sch in
-            zip(source_uris, destination_table_names, schemas)]
+        return [partial(self._load_job, s, d, sch, job_config)
+                for s, d, sch in zip(
+                    source_uris, destination_table_names, schemas)]
 
-    def _copy_jobs(
+    def _find_changed_partitions(
             self,
             source_table_names: List[str],
             destination_table_names: List[str],
+            source_dataset_id: str) -> List[Tuple[str, str]]:
+        sources, destinations = self._map(
+            self.get_partitions_metadata,
+            [source_table_names, destination_table_names],
+            [source_dataset_id, self._dataset_id])
+        res = []
+        for s, d in zip(source_table_names, destination_table_names):
+            source_partitions = sources.get(s)
+            destination_partitions = destinations.get(d)
+            if not source_partitions or destination_partitions is None:
+                res.append((s, d))
+                continue
+            for p, m in sorted(source_partitions.items(),
+                               key=lambda x: x[0] or ''):
+                if p == '__STREAMING_UNPARTITIONED__':
+                    continue
+                other = destination_partitions.get(p)
+                if other is not None and \
+                        other['num_rows'] == m['num_rows'] and \
+                        other['modified'] >= m['modified']:
+                    continue
+                if p is None:
+                    res.append((s, d))
+                else:
+                    res.append((f'{s}${p}', f'{d}${p}'))
+        return res
+
+    def _copy_jobs(
+            self,
+            source_table_names: List[Union[str, List[str]]],
+            destination_table_names: List[str],
             source_dataset_id: str,
-            write_disposition: bigquery.WriteDisposition
-    ) -> List[bigquery.CopyJob]:
-        len_source_table_names = len(source_table_names)
-        len_destination_table_names = len(destination_table_names)
-        if len_source_table_names == 0:
-            raise ValueError('source_table_names must not be empty')
-        if len_source_table_names != len_destination_table_names:
-            raise ValueError('source_table_names and destination_table_names '
-                             'must have the same length')
-        return [
-            self._copy_job(s, d, source_dataset_id, write_disposition)
-            for s, d in zip(source_table_names, destination_table_names)]
+            write_disposition: bigquery.WriteDisposition,
+            operation_type: Optional[str] = 'COPY'
+    ) -> List[Callable[[], bigquery.CopyJob]]:
+        self._check_sources(
+            source_table_names, destination_table_names, 'source_table_names')
+        if operation_type not in COPY_OPERATION_TYPES:
+            raise ValueError(
+                f'operation_type must be one of {COPY_OPERATION_TYPES}')
+        if operation_type != 'COPY' and any(
+                not isinstance(s, str) and len(s) != 1
+                for s in source_table_names):
+            raise ValueError(
+                f'operation_type {operation_type} requires a single source '
+                'table per destination table')
+        return [partial(self._copy_job, s, d, source_dataset_id,
+                        write_disposition, operation_type)
+                for s, d in zip(source_table_names, destination_table_names)]
 
     def run_queries(
             self,
@@ -441,29 +1681,299 @@ class Operator:
             sample_size: Optional[int] = None,
             time_to_live: Optional[int] = None,
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> dict:
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            inline_time_to_live: Optional[bool] = False,
+            sample_method: Optional[str] = 'count',
+            sample_key: Optional[str] = None,
+            max_gb_billed: Optional[float] = None,
+            max_total_gb: Optional[float] = None,
+            skip_unchanged: Optional[bool] = False,
+            priority: Optional[str] = 'INTERACTIVE',
+            pack_size: Optional[int] = None) -> dict:
         """Run queries. Return monitoring as a dict in the format
         {'duration': d, 'GB': gb} where d is the execution duration in
         seconds and gb the number of gigabytes processed by the queries.
+        The statistics of each job are available afterwards in the
+        property last_report.
+
+        If ``sample_size`` is passed, the queries are sampled with the
+        method sample_query, using ``sample_method`` and ``sample_key``.
+        The additional method 'tablesample' applies the method sample_table
+        to the queries which are plain table references, given as
+        'table_name', 'dataset_name.table_name' or
+        'project_id.dataset_name.table_name', and the method 'window' of
+        sample_query to the others.
+
+        If ``max_gb_billed`` is passed, each job fails if it would bill more
+        than this number of gigabytes. If ``max_total_gb`` is passed, the
+        queries are first estimated with dry runs and a ValueError is raised,
+        before any job is launched, if they would process more than this
+        number of gigabytes in total.
+
+        If ``inline_time_to_live`` is True, the time to live is set by the
+        jobs themselves: each query is run as a CREATE OR REPLACE TABLE
+        statement with the expiration_timestamp option, so no api call is
+        needed afterwards. The destination tables are then replaced, which
+        means their partitioning and clustering are not preserved. This is
+        only possible with the WRITE_TRUNCATE write disposition.
+
+        If ``skip_unchanged`` is True, each destination table is labelled
+        with a hash of its query and the last modification time of the data
+        of the tables read by the query, as given by a dry run and the
+        INFORMATION_SCHEMA.PARTITIONS views, so that updates of their
+        metadata only, such as labels or expirations, do not count. The
+        next time, the query is skipped if these labels are unchanged, the
+        destination table itself being ignored among the tables read. The
+        names of the skipped destination tables are then listed under the
+        key skipped of the property last_report. The time to live is only
+        set on the skipped tables which do not expire yet.
+
+        A destination table name can carry a partition decorator, as
+        given by build_partition_name, to write only one partition of an
+        existing partitioned table: with WRITE_TRUNCATE, this partition is
+        replaced and the others are kept. The time to live then applies to
+        the whole table.
+
+        ``priority`` is 'INTERACTIVE' or 'BATCH'. Batch queries are queued
+        until idle resources are available and do not count towards the
+        limit of concurrent interactive queries, which suits backfills.
+
+        If ``pack_size`` is passed, the queries are packed by groups of
+        ``pack_size`` into script jobs, each query being run as a CREATE OR
+        REPLACE TABLE statement, which saves the fixed cost of a job for
+        each query. The time to live is then set inline and the
+        destination tables are replaced, as with ``inline_time_to_live``.
+        The jobs listed in last_report are the child jobs of the scripts,
+        one per destination table. If a statement fails, the statements
+        which follow it in its script are not run. As the bytes billed are
+        capped for a whole script, ``max_gb_billed`` is then multiplied by
+        the number of queries of each script.
         """
+        is_truncate = (
+            write_disposition == bigquery.WriteDisposition.WRITE_TRUNCATE)
+        if pack_size is not None:
+            if not isinstance(pack_size, int) or pack_size < 1:
+                raise ValueError('pack_size must be a positive integer')
+            if not is_truncate:
+                raise ValueError('pack_size requires the WRITE_TRUNCATE '
+                                 'write disposition')
+        expiration_time = None
+        if (inline_time_to_live or pack_size is not None) and \
+                time_to_live is not None:
+            if not is_truncate:
+                raise ValueError('inline_time_to_live requires the '
+                                 'WRITE_TRUNCATE write disposition')
+            expiration_time = self._build_expiration_time(time_to_live)
+        if any('$' in n for n in destination_table_names) and (
+                expiration_time is not None or pack_size is not None or
+                skip_unchanged):
+            raise ValueError(
+                'partition decorators are not supported with '
+                'inline_time_to_live, pack_size and skip_unchanged')
         if sample_size is not None:
-            queries = [self.sample_query(q, sample_size) for q in queries]
-        start_timestamp = datetime.now(timezone.utc)
-        jobs = self._query_jobs(
-            queries, destination_table_names, write_disposition)
-        self._wait_for_jobs(jobs)
-        end_timestamp = datetime.now(timezone.utc)
-        duration = round((end_timestamp - start_timestamp).total_seconds())
-        total_bytes_processed_list = [
-                j.total_bytes_processed for j in jobs]
-        gb_processed_list = [
-            round(tbb / 10 ** 9, 2) for tbb in total_bytes_processed_list]
-        gb_processed = sum(gb_processed_list)
-        monitoring = {'duration': duration, 'GB': gb_processed}
+            queries = self._sample_queries(
+                queries, sample_size, sample_method, sample_key)
+        self._check_queries(queries, destination_table_names)
+        run_table_names = destination_table_names
+        if skip_unchanged:
+            fingerprints = self._build_fingerprints(
+                queries, destination_table_names)
+            unchanged_flags = self._map(
+                self._is_unchanged, destination_table_names, fingerprints)
+            kept = [(q, n, f) for q, n, f, u in zip(
+                queries, destination_table_names, fingerprints,
+                unchanged_flags) if not u]
+            queries, run_table_names, fingerprints = \
+                [[k[i] for k in kept] for i in range(3)]
+        if max_total_gb is not None and queries:
+            self._check_budget(queries, max_total_gb)
+        maximum_bytes_billed = None
+        if max_gb_billed is not None:
+            maximum_bytes_billed = int(max_gb_billed * 10 ** 9)
+        if queries and pack_size is not None:
+            self._run_batch(
+                self._script_jobs(
+                    queries, run_table_names, pack_size, expiration_time,
+                    maximum_bytes_billed, priority),
+                run_table_names)
+        elif queries:
+            self._run_batch(
+                self._query_jobs(
+                    queries, run_table_names, write_disposition,
+                    expiration_time, maximum_bytes_billed, priority),
+                run_table_names)
+        else:
+            now = datetime.now(timezone.utc)
+            self._last_report = monitoring.build_batch_report([], now, now)
+        skipped_table_names = [
+            n for n in destination_table_names if n not in run_table_names]
+        if skip_unchanged:
+            self._last_report['skipped'] = skipped_table_names
+            self._map(self._set_labels, run_table_names, fingerprints)
+        if time_to_live is not None:
+            ttl_table_names = []
+            if expiration_time is None:
+                ttl_table_names = list(run_table_names)
+            skipped_tables = self._map(self.get_table, skipped_table_names)
+            ttl_table_names += [
+                n for n, t in zip(skipped_table_names, skipped_tables)
+                if t.expires is None]
+            if ttl_table_names:
+                self.set_times_to_live(ttl_table_names, time_to_live)
+        return self._build_monitoring(self._last_report)
+
+    @staticmethod
+    def _build_monitoring(report: dict) -> dict:
+        duration = round(report['duration'])
+        gb_processed = round(report['total_bytes_processed'] / 10 ** 9, 2)
+        return {'duration': duration, 'GB': float(gb_processed)}
+
+    def _is_referenced(self, query: str, table_name: str) -> bool:
+        pattern = (rf'(?<![\w.-])'
+                   rf'(?:{re.escape(self._dataset_project_id)}\.)?'
+                   rf'{re.escape(self._dataset_name)}\.'
+                   rf'{re.escape(table_name)}(?![\w-])')
+        return re.search(pattern, query.replace('`', '')) is not None
+
+    def _infer_dependencies(
+            self,
+            queries: List[str],
+            destination_table_names: List[str]) -> Dict[str, List[str]]:
+        def get_parents(query, name):
+            try:
+                table_ids = self._build_estimate(
+                    self._dry_run_job(query))['referenced_tables']
+            except (exceptions.NotFound, exceptions.BadRequest):
+                return [n for n in destination_table_names
+                        if n != name and self._is_referenced(query, n)]
+            return [n for n in destination_table_names
+                    if n != name and self.build_table_id(n) in table_ids]
+
+        return dict(zip(destination_table_names, self._map(
+            get_parents, queries, destination_table_names)))
+
+    @staticmethod
+    def _check_dependencies(
+            destination_table_names: List[str],
+            dependencies: Dict[str, List[str]]) -> None:
+        if len(set(destination_table_names)) != len(destination_table_names):
+            raise ValueError('destination_table_names must be unique')
+        names = set(destination_table_names)
+        for n, parents in dependencies.items():
+            if n not in names or not set(parents) <= names:
+                raise ValueError('dependencies must only contain names of '
+                                 'destination_table_names')
+        remaining = {n: set(dependencies.get(n, [])) - {n}
+                     for n in destination_table_names}
+        while remaining:
+            roots = [n for n, parents in remaining.items() if not parents]
+            if not roots:
+                raise ValueError('dependencies must not contain a cycle')
+            for n in roots:
+                del remaining[n]
+            for parents in remaining.values():
+                parents.difference_update(roots)
+
+    def run_dependent_queries(
+            self,
+            queries: List[str],
+            destination_table_names: List[str],
+            dependencies: Optional[Dict[str, List[str]]] = None,
+            time_to_live: Optional[int] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            priority: Optional[str] = 'INTERACTIVE') -> dict:
+        """Run queries which may read the destination tables of each other.
+        Return monitoring in the same format as run_queries. The statistics
+        of each job are available afterwards in the property last_report.
+
+        Each query is submitted as soon as the queries it depends on are
+        done, at most max_workers queries running at the same time, or
+        fewer if the job scheduler of the operator allows fewer. Its
+        duration is thus given by the critical path of the dependencies
+        rather than by successive waves of queries.
+
+        ``dependencies`` maps a destination table name to the names of the
+        destination tables its query reads. If it is not passed, the
+        dependencies are inferred from the tables referenced by the queries,
+        as given by dry runs. If a dry run fails because a table does not
+        exist yet, or does not have yet a column created by its query, the
+        query text is scanned for the ids
+        'dataset_name.table_name' or 'project_id.dataset_name.table_name' of
+        the destination tables.
+
+        If the first job fails, the exception raised carries its job id and
+        destination and the queries depending on it are not submitted.
+        See the method run_queries for ``priority``.
+        """
+        self._check_queries(queries, destination_table_names)
+        if dependencies is None:
+            dependencies = self._infer_dependencies(
+                queries, destination_table_names)
+        self._check_dependencies(destination_table_names, dependencies)
+        indexes = {n: i for i, n in enumerate(destination_table_names)}
+        self._run_batch(
+            self._query_jobs(
+                queries, destination_table_names, write_disposition,
+                priority=priority),
+            destination_table_names,
+            {indexes[n]: [indexes[p] for p in parents]
+             for n, parents in dependencies.items()},
+            self._max_workers)
         if time_to_live is not None:
-            for n in destination_table_names:
-                self.set_time_to_live(n, time_to_live)
-        return monitoring
+            self.set_times_to_live(destination_table_names, time_to_live)
+        return self._build_monitoring(self._last_report)
+
+    def backfill(
+            self,
+            query_template: str,
+            destination_table_name: str,
+            partitions: List[Union[date, datetime, int, str]],
+            time_to_live: Optional[int] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            max_retries: Optional[int] = 2,
+            max_gb_billed: Optional[float] = None,
+            priority: Optional[str] = 'INTERACTIVE') -> dict:
+        """Fill partitions of an existing partitioned table, with one
+        query job per partition. Return monitoring in the same format as
+        run_queries.
+
+        The query of a partition is query_template where '{partition}' is
+        replaced by str(p), p being an element of ``partitions``, for
+        instance "select * from t where d = '{partition}'" for dates. The
+        other braces of the template are kept as they are. Its result is
+        written into the partition, whose name is given by
+        build_partition_name: with WRITE_TRUNCATE, the partition is
+        replaced and the others are kept.
+
+        At most max_workers jobs run at the same time. A job failing with
+        an error deemed transient by the retry policy, such as
+        backendError, is submitted again at most ``max_retries`` times
+        before the exception is raised. The other errors are raised at
+        once. See the method run_queries for the other arguments.
+        """
+        if len(partitions) == 0:
+            raise ValueError('partitions must not be empty')
+        queries = [query_template.replace('{partition}', str(p))
+                   for p in partitions]
+        partition_names = [
+            self.build_partition_name(destination_table_name, p)
+            for p in partitions]
+        maximum_bytes_billed = None
+        if max_gb_billed is not None:
+            maximum_bytes_billed = int(max_gb_billed * 10 ** 9)
+        self._run_batch(
+            self._query_jobs(
+                queries, partition_names, write_disposition,
+                maximum_bytes_billed=maximum_bytes_billed,
+                priority=priority),
+            partition_names,
+            max_in_flight=self._max_workers,
+            max_retries=max_retries)
+        if time_to_live is not None:
+            self.set_times_to_live([destination_table_name], time_to_live)
+        return self._build_monitoring(self._last_report)
 
     def extract_tables(
             self,
@@ -471,16 +1981,26 @@ class Operator:
             destination_uris: List[str],
             compression: Optional[bigquery.Compression] = None,
             field_delimiter: Optional[str] = '|',
-            print_header: Optional[bool] = True) -> None:
+            print_header: Optional[bool] = True,
+            destination_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True) -> None:
         """Extract tables from BigQuery to Storage. Each source table is
-        extracted as one or more CSV files.
+        extracted as one or more files.
+
+        ``destination_format`` must be one of 'CSV',
+        'NEWLINE_DELIMITED_JSON', 'AVRO' and 'PARQUET'. The compressions
+        supported by BigQuery are GZIP for CSV and NEWLINE_DELIMITED_JSON,
+        DEFLATE and SNAPPY for AVRO, and GZIP, SNAPPY and ZSTD for PARQUET.
+        ``field_delimiter`` and ``print_header`` only apply to CSV and
+        ``use_avro_logical_types`` only applies to AVRO.
         """
-        self._wait_for_jobs(self._extract_jobs(
-            source_table_names,
-            destination_uris,
-            compression,
-            field_delimiter,
-            print_header))
+        job_config = self._build_extract_job_config(
+            destination_format, compression, field_delimiter, print_header,
+            use_avro_logical_types)
+        self._run_batch(
+            self._extract_jobs(
+                source_table_names, destination_uris, job_config),
+            [])
 
     def load_tables(
             self,
@@ -490,37 +2010,225 @@ class Operator:
             schemas: Optional[List[List[bigquery.SchemaField]]] = None,
             field_delimiter: Optional[str] = '|',
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> None:
-        """Load Storage CSV files into BigQuery tables."""
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            source_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True,
+            parquet_enable_list_inference: Optional[bool] = True,
+            parquet_enum_as_string: Optional[bool] = True) -> None:
+        """Load Storage files into BigQuery tables.
+
+        ``source_format`` must be one of 'CSV', 'NEWLINE_DELIMITED_JSON',
+        'AVRO', 'PARQUET' and 'ORC'. If a schema is not passed, it is
+        autodetected for CSV and NEWLINE_DELIMITED_JSON files and read from
+        the files for the other formats. The header of CSV files is skipped
+        when a schema is passed.
+
+        ``field_delimiter`` only applies to CSV, ``use_avro_logical_types``
+        to AVRO, and ``parquet_enable_list_inference`` and
+        ``parquet_enum_as_string`` to PARQUET.
+
+        As in run_queries, a destination table name can carry a partition
+        decorator to write only one partition.
+        """
         if schemas is None:
             schemas = [None]*len(source_uris)
-        self._wait_for_jobs(self._load_jobs(
-            source_uris, destination_table_names, schemas,
-            field_delimiter, write_disposition))
+        job_config = self._build_load_job_config(
+            source_format, field_delimiter, write_disposition,
+            use_avro_logical_types, parquet_enable_list_inference,
+            parquet_enum_as_string)
+        self._run_batch(
+            self._load_jobs(
+                source_uris, destination_table_names, schemas, job_config),
+            destination_table_names)
         if time_to_live is not None:
-            for n in destination_table_names:
-                self.set_time_to_live(n, time_to_live)
+            self.set_times_to_live(destination_table_names, time_to_live)
+
+    def load_files(
+            self,
+            file_paths: List[str],
+            destination_table_names: List[str],
+            time_to_live: Optional[int] = None,
+            schemas: Optional[List[List[bigquery.SchemaField]]] = None,
+            field_delimiter: Optional[str] = '|',
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            source_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True,
+            parquet_enable_list_inference: Optional[bool] = True,
+            parquet_enum_as_string: Optional[bool] = True) -> None:
+        """Load local files into BigQuery tables, without going through
+        Storage. The files are uploaded concurrently. See the method
+        load_tables for the other arguments."""
+        self._check_sources(file_paths, destination_table_names, 'file_paths')
+        if schemas is None:
+            schemas = [None]*len(file_paths)
+        job_config = self._build_load_job_config(
+            source_format, field_delimiter, write_disposition,
+            use_avro_logical_types, parquet_enable_list_inference,
+            parquet_enum_as_string)
+        self._run_batch(
+            [partial(self._load_file_job, f, n, sch, job_config)
+             for f, n, sch in zip(
+                file_paths, destination_table_names, schemas)],
+            destination_table_names)
+        if time_to_live is not None:
+            self.set_times_to_live(destination_table_names, time_to_live)
+
+    def load_arrow_tables(
+            self,
+            tables: List['pyarrow.Table'],
+            destination_table_names: List[str],
+            time_to_live: Optional[int] = None,
+            schemas: Optional[List[List[bigquery.SchemaField]]] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            chunk_size: Optional[int] = 100000) -> None:
+        """Load pyarrow.Table objects into BigQuery tables, pyarrow being
+        required.
+
+        Each table is written to a temporary Parquet file by record batches
+        of at most ``chunk_size`` rows, without copying its data, then
+        uploaded. The tables are written and uploaded concurrently. If a
+        schema is not passed, it is read from the Parquet file.
+        """
+        self._check_sources(tables, destination_table_names, 'tables')
+        self._load_parquet_files(
+            [lambda p, t=t: self._write_arrow_parquet(t, p, chunk_size)
+             for t in tables],
+            destination_table_names, time_to_live, schemas,
+            write_disposition)
+
+    def load_dataframes(
+            self,
+            dataframes: List['pandas.DataFrame'],
+            destination_table_names: List[str],
+            time_to_live: Optional[int] = None,
+            schemas: Optional[List[List[bigquery.SchemaField]]] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            chunk_size: Optional[int] = 100000) -> None:
+        """Load pandas.DataFrame objects into BigQuery tables, pandas and
+        pyarrow being required. The index is not loaded.
+
+        Each dataframe is converted to Parquet by chunks of ``chunk_size``
+        rows, which bounds the memory used by the conversion. See the
+        method load_arrow_tables for the other arguments.
+        """
+        self._check_sources(
+            dataframes, destination_table_names, 'dataframes')
+        self._load_parquet_files(
+            [lambda p, d=d: self._write_dataframe_parquet(d, p, chunk_size)
+             for d in dataframes],
+            destination_table_names, time_to_live, schemas,
+            write_disposition)
+
+    def table_writer(
+            self,
+            table_name: str,
+            batch_size: Optional[int] = 500,
+            flush_interval: Optional[float] = 1,
+            max_pending_batches: Optional[int] = None) -> TableWriter:
+        """Return a TableWriter appending rows to an existing table with
+        streaming inserts, using the retry policy of the operator. If
+        ``max_pending_batches`` is not passed, falls back to
+        self.max_workers. Each batch inserted invalidates the cache entry of
+        the table. The writer should be closed, or used as a context
+        manager."""
+        if max_pending_batches is None:
+            max_pending_batches = self._max_workers
+        return TableWriter(
+            client=self._client,
+            table=self.get_table(table_name),
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_pending_batches=max_pending_batches,
+            retry_policy=self._retry_policy,
+            on_commit=partial(self._invalidate_tables, [table_name]))
 
     def copy_tables(
             self,
-            source_table_names: List[str],
+            source_table_names: List[Union[str, List[str]]],
             destination_table_names: List[str],
             time_to_live: Optional[int] = None,
             source_dataset_id: Optional[str] = None,
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> None:
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            operation_type: Optional[str] = 'COPY',
+            incremental: Optional[bool] = False) -> None:
         """Copy tables. ``source_dataset_id`` must be given in the format
         'project_id.dataset_name'. If not passed, falls back to
         self.dataset_id.
+
+        An element of ``source_table_names`` can be a list of table names
+        with the same schema, for instance date shards, whose rows are then
+        all written into the destination table by a single copy job.
+
+        ``operation_type`` must be one of 'COPY', 'CLONE' and 'SNAPSHOT'.
+        A clone is a writable table which initially shares the storage of
+        its source and a snapshot is a read-only table billed only for the
+        data differing from its source: both are made instantly whatever
+        the size of the source. They require a single source table, and a
+        snapshot cannot overwrite an existing table.
+
+        As in run_queries, a source or destination table name can carry a
+        partition decorator to copy only one partition.
+
+        If ``incremental`` is True, the partitions of the source and
+        destination tables are read from INFORMATION_SCHEMA.PARTITIONS and
+        only the partitions which are missing from the destination table,
+        or whose number of rows differs or which have been modified in the
+        source table since they were written in the destination table, are
+        copied, concurrently. A destination table which does not exist is
+        copied whole. The partitions which are only in the destination
+        table are kept. The names of the copied partitions are listed under
+        the key copied of the property last_report. This requires the COPY
+        operation type, the WRITE_TRUNCATE write disposition and a single
+        source table per destination table.
         """
         if source_dataset_id is None:
             source_dataset_id = self._dataset_id
-        self._wait_for_jobs(self._copy_jobs(
-            source_table_names, destination_table_names,
-            source_dataset_id, write_disposition))
+        if not incremental:
+            self._run_batch(
+                self._copy_jobs(
+                    source_table_names, destination_table_names,
+                    source_dataset_id, write_disposition, operation_type),
+                destination_table_names)
+        else:
+            self._copy_changed_partitions(
+                source_table_names, destination_table_names,
+                source_dataset_id, write_disposition, operation_type)
         if time_to_live is not None:
-            for n in destination_table_names:
-                self.set_time_to_live(n, time_to_live)
+            self.set_times_to_live(destination_table_names, time_to_live)
+
+    def _copy_changed_partitions(
+            self,
+            source_table_names: List[str],
+            destination_table_names: List[str],
+            source_dataset_id: str,
+            write_disposition: bigquery.WriteDisposition,
+            operation_type: str) -> None:
+        if operation_type != 'COPY' or \
+                write_disposition != bigquery.WriteDisposition.WRITE_TRUNCATE \
+                or not all(isinstance(s, str) for s in source_table_names):
+            raise ValueError(
+                'incremental requires the COPY operation type, the '
+                'WRITE_TRUNCATE write disposition and a single source table '
+                'per destination table')
+        self._check_sources(
+            source_table_names, destination_table_names, 'source_table_names')
+        pairs = self._find_changed_partitions(
+            source_table_names, destination_table_names, source_dataset_id)
+        copied = [d for s, d in pairs]
+        if pairs:
+            self._run_batch(
+                self._copy_jobs(
+                    [s for s, d in pairs], copied, source_dataset_id,
+                    write_disposition),
+                copied)
+        else:
+            now = datetime.now(timezone.utc)
+            self._last_report = monitoring.build_batch_report([], now, now)
+        self._last_report['copied'] = copied
 
     def run_query(
             self,
@@ -529,14 +2237,34 @@ class Operator:
             sample_size: Optional[int] = None,
             time_to_live: Optional[int] = None,
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> dict:
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            inline_time_to_live: Optional[bool] = False,
+            sample_method: Optional[str] = 'count',
+            sample_key: Optional[str] = None,
+            max_gb_billed: Optional[float] = None,
+            max_total_gb: Optional[float] = None,
+            skip_unchanged: Optional[bool] = False,
+            priority: Optional[str] = 'INTERACTIVE',
+            pack_size: Optional[int] = None) -> dict:
         """Run a query. Return monitoring as a dict in the format
         {'duration': d, 'GB': gb} where d is the execution duration in
         seconds and gb the number of gigabytes processed by the query.
+        See the method run_queries for the other arguments.
         """
         return self.run_queries(
-            [query], [destination_table_name],
-            sample_size, time_to_live, write_disposition)
+            queries=[query],
+            destination_table_names=[destination_table_name],
+            sample_size=sample_size,
+            time_to_live=time_to_live,
+            write_disposition=write_disposition,
+            inline_time_to_live=inline_time_to_live,
+            sample_method=sample_method,
+            sample_key=sample_key,
+            max_gb_billed=max_gb_billed,
+            max_total_gb=max_total_gb,
+            skip_unchanged=skip_unchanged,
+            priority=priority,
+            pack_size=pack_size)
 
     def extract_table(
             self,
@@ -544,11 +2272,14 @@ class Operator:
             destination_uri: str,
             compression: Optional[str] = None,
             field_delimiter: Optional[str] = '|',
-            print_header: Optional[bool] = True) -> None:
-        """Extract a table."""
+            print_header: Optional[bool] = True,
+            destination_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True) -> None:
+        """Extract a table. The arguments are those of extract_tables."""
         self.extract_tables(
             [source_table_name], [destination_uri],
-            compression, field_delimiter, print_header)
+            compression, field_delimiter, print_header,
+            destination_format, use_avro_logical_types)
 
     def load_table(
             self,
@@ -558,24 +2289,84 @@ class Operator:
             schema: Optional[List[bigquery.SchemaField]] = None,
             field_delimiter: Optional[str] = '|',
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> None:
-        """Load one or more Storage CSV files into one BigQuery table."""
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            source_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True,
+            parquet_enable_list_inference: Optional[bool] = True,
+            parquet_enum_as_string: Optional[bool] = True) -> None:
+        """Load one or more Storage files into one BigQuery table. The
+        arguments are those of load_tables."""
         self.load_tables(
             [source_uri], [destination_table_name], time_to_live,
-            [schema], field_delimiter, write_disposition)
+            [schema], field_delimiter, write_disposition, source_format,
+            use_avro_logical_types, parquet_enable_list_inference,
+            parquet_enum_as_string)
+
+    def load_file(
+            self,
+            file_path: str,
+            destination_table_name: str,
+            time_to_live: Optional[int] = None,
+            schema: Optional[List[bigquery.SchemaField]] = None,
+            field_delimiter: Optional[str] = '|',
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            source_format: Optional[str] = 'CSV',
+            use_avro_logical_types: Optional[bool] = True,
+            parquet_enable_list_inference: Optional[bool] = True,
+            parquet_enum_as_string: Optional[bool] = True) -> None:
+        """Load a local file into a BigQuery table. The arguments are
+        those of load_files."""
+        self.load_files(
+            [file_path], [destination_table_name], time_to_live,
+            [schema], field_delimiter, write_disposition, source_format,
+            use_avro_logical_types, parquet_enable_list_inference,
+            parquet_enum_as_string)
+
+    def load_arrow(
+            self,
+            table: 'pyarrow.Table',
+            destination_table_name: str,
+            time_to_live: Optional[int] = None,
+            schema: Optional[List[bigquery.SchemaField]] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            chunk_size: Optional[int] = 100000) -> None:
+        """Load a pyarrow.Table into a BigQuery table. The arguments are
+        those of load_arrow_tables."""
+        self.load_arrow_tables(
+            [table], [destination_table_name], time_to_live, [schema],
+            write_disposition, chunk_size)
+
+    def load_dataframe(
+            self,
+            dataframe: 'pandas.DataFrame',
+            destination_table_name: str,
+            time_to_live: Optional[int] = None,
+            schema: Optional[List[bigquery.SchemaField]] = None,
+            write_disposition: Optional[bigquery.WriteDisposition] =
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            chunk_size: Optional[int] = 100000) -> None:
+        """Load a pandas.DataFrame into a BigQuery table. The arguments
+        are those of load_dataframes."""
+        self.load_dataframes(
+            [dataframe], [destination_table_name], time_to_live, [schema],
+            write_disposition, chunk_size)
 
     def copy_table(
             self,
-            source_table_name: str,
+            source_table_name: Union[str, List[str]],
             destination_table_name: str,
             time_to_live: Optional[int] = None,
             source_dataset_id: Optional[str] = None,
             write_disposition: Optional[bigquery.WriteDisposition] =
-            bigquery.WriteDisposition.WRITE_TRUNCATE) -> None:
-        """Copy a table. ``source_dataset_id`` must be given in the format
-        'project_id.dataset_name'. If not passed, falls back to
-        self.dataset_id.
+            bigquery.WriteDisposition.WRITE_TRUNCATE,
+            operation_type: Optional[str] = 'COPY',
+            incremental: Optional[bool] = False) -> None:
+        """Copy a table, or several tables into one. See the method
+        copy_tables for the arguments.
         """
         self.copy_tables(
             [source_table_name], [destination_table_name], time_to_live,
-            source_dataset_id, write_disposition)
+            source_dataset_id, write_disposition, operation_type,
+            incremental)
@@ -2,6 +2,9 @@ from typing import Optional
 from google.auth import credentials as cred
 from google.cloud import bigquery
 from bigquery_operator import operator
+from bigquery_operator.table_cache import TableCache
+from bigquery_operator.retry_policy import RetryPolicy
+from bigquery_operator.job_scheduler import JobScheduler
 
 
 class OperatorQuickSetup(operator.Operator):
@@ -14,6 +17,11 @@ class OperatorQuickSetup(operator.Operator):
 
          client=client
          dataset_id=dataset_id
+         max_workers=max_workers
+         cancel_on_error=cancel_on_error
+         table_cache=table_cache
+         retry_policy=retry_policy
+         job_scheduler=job_scheduler
 
     where
 
@@ -30,18 +38,35 @@ class OperatorQuickSetup(operator.Operator):
         credentials (google.auth.credentials.Credentials): Credentials used to
             build the client. If not passed, falls back to the default inferred
             from the environment.
+        max_workers (int): The maximum number of threads used to issue api
+            calls concurrently.
+        cancel_on_error (bool): If True, when a job of a batch fails, the
+            jobs of the batch which are still running are cancelled.
+        table_cache (bigquery_operator.table_cache.TableCache): If passed,
+            the table metadata is cached.
+        retry_policy (bigquery_operator.retry_policy.RetryPolicy): The
+            policy used to retry transient errors.
+        job_scheduler (bigquery_operator.job_scheduler.JobScheduler): If
+            passed, the jobs and metadata updates are throttled.
     """
     def __init__(
             self,
             project_id: str,
             dataset_name: str,
-            credentials: Optional[cred.Credentials] = None) -> None:
+            credentials: Optional[cred.Credentials] = None,
+            max_workers: Optional[int] = 8,
+            cancel_on_error: Optional[bool] = False,
+            table_cache: Optional[TableCache] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            job_scheduler: Optional[JobScheduler] = None) -> None:
         self._project_id = project_id
         client = bigquery.Client(
             project=self._project_id,
             credentials=credentials)
         dataset_id = f'{self._project_id}.{dataset_name}'
-        super().__init__(client, dataset_id)
+        super().__init__(
+            client, dataset_id, max_workers, cancel_on_error, table_cache,
+            retry_policy, job_scheduler)
 
     @property
     def project_id(self) -> str:
@@ -0,0 +1,135 @@
+import logging
+import random
+import time
+from typing import Optional, Tuple, Type, Callable, Any
+from google.api_core import exceptions
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Retry policy with exponential backoff and jitter, to be passed to an
+    Operator.
+
+    The n-th retry, counting from 0, waits at most
+    min(max_delay, initial_delay * multiplier ** n) seconds. With jitter,
+    the actual delay is drawn uniformly between 0 and this bound. No retry
+    is attempted if it would end more than ``max_elapsed`` seconds after
+    the first try.
+
+    An exception is retried if it is an instance of one of the classes in
+    ``retryable``, or if it is a google.api_core.exceptions.Forbidden with
+    the reason rateLimitExceeded, which is how BigQuery reports some of its
+    rate limits.
+
+    Args:
+        initial_delay (float): The bound of the first delay, in seconds.
+        multiplier (float): The growth factor of the bound between two
+            retries.
+        max_delay (float): The maximum bound of a delay, in seconds.
+        max_elapsed (float): The maximum time spent retrying, in seconds.
+            If 0, no retry is attempted.
+        jitter (bool): If True, the delays are randomized.
+        retryable (Tuple[Type[Exception], ...]): The exception classes to
+            retry. By default: PreconditionFailed, TooManyRequests and the
+            5xx errors InternalServerError, BadGateway, ServiceUnavailable
+            and GatewayTimeout.
+    """
+    DEFAULT_RETRYABLE = (
+        exceptions.PreconditionFailed,
+        exceptions.TooManyRequests,
+        exceptions.InternalServerError,
+        exceptions.BadGateway,
+        exceptions.ServiceUnavailable,
+        exceptions.GatewayTimeout)
+
+    def __init__(
+            self,
+            initial_delay: Optional[float] = 0.2,
+            multiplier: Optional[float] = 2,
+            max_delay: Optional[float] = 10,
+            max_elapsed: Optional[float] = 120,
+            jitter: Optional[bool] = True,
+            retryable: Optional[Tuple[Type[Exception], ...]] =
+            DEFAULT_RETRYABLE) -> None:
+        self._initial_delay = initial_delay
+        self._multiplier = multiplier
+        self._max_delay = max_delay
+        self._max_elapsed = max_elapsed
+        self._jitter = jitter
+        self._retryable = tuple(retryable)
+
+    @property
+    def initial_delay(self) -> float:
+        """float: The bound of the first delay, in seconds."""
+        return self._initial_delay
+
+    @property
+    def multiplier(self) -> float:
+        """float: The growth factor of the bound between two retries."""
+        return self._multiplier
+
+    @property
+    def max_delay(self) -> float:
+        """float: The maximum bound of a delay, in seconds."""
+        return self._max_delay
+
+    @property
+    def max_elapsed(self) -> float:
+        """float: The maximum time spent retrying, in seconds."""
+        return self._max_elapsed
+
+    @property
+    def jitter(self) -> bool:
+        """bool: Whether the delays are randomized."""
+        return self._jitter
+
+    @property
+    def retryable(self) -> Tuple[Type[Exception], ...]:
+        """Tuple[Type[Exception], ...]: The exception classes to retry."""
+        return self._retryable
+
+    @staticmethod
+    def is_rate_limit_error(exception: Exception) -> bool:
+        """Return True if the exception reports a rate limit."""
+        if isinstance(exception, exceptions.TooManyRequests):
+            return True
+        if not isinstance(exception, exceptions.Forbidden):
+            return False
+        return any(isinstance(e, dict) and e.get('reason') ==
+                   'rateLimitExceeded' for e in exception.errors)
+
+    def is_retryable(self, exception: Exception) -> bool:
+        """Return True if the exception should be retried."""
+        return (isinstance(exception, self._retryable) or
+                self.is_rate_limit_error(exception))
+
+    def compute_delay(self, attempt: int) -> float:
+        """Return the delay before the retry number ``attempt``, counting
+        from 0."""
+        bound = min(
+            self._max_delay,
+            self._initial_delay * self._multiplier ** attempt)
+        if self._jitter:
+            return random.uniform(0, bound)
+        return bound
+
+    def call(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Call ``func(*args, **kwargs)`` and retry it according to the
+        policy. The last exception is raised if the retries are
+        exhausted."""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not self.is_retryable(e):
+                    raise
+                delay = self.compute_delay(attempt)
+                elapsed = time.monotonic() - start
+                if elapsed + delay > self._max_elapsed:
+                    raise
+                logger.warning(e)
+                logger.warning(f'sleeping {delay:.2f} seconds before next try')
+                time.sleep(delay)
+                attempt += 1
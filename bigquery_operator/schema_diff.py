@@ -0,0 +1,152 @@
+from typing import List, Optional, Dict
+from google.cloud import bigquery
+
+COMPATIBLE_KINDS = [
+    'added_column', 'relaxed_column', 'widened_type', 'changed_description',
+    'changed_require_partition_filter']
+
+STANDARD_TYPES = {
+    'INT64': 'INTEGER', 'FLOAT64': 'FLOAT', 'BOOL': 'BOOLEAN',
+    'STRUCT': 'RECORD', 'DECIMAL': 'NUMERIC', 'BIGDECIMAL': 'BIGNUMERIC'}
+
+WIDENINGS = {
+    'INTEGER': ['NUMERIC', 'BIGNUMERIC', 'FLOAT'],
+    'NUMERIC': ['BIGNUMERIC', 'FLOAT']}
+
+SQL_TYPES = {
+    'NUMERIC': 'NUMERIC', 'BIGNUMERIC': 'BIGNUMERIC', 'FLOAT': 'FLOAT64'}
+
+
+def _normalize_type(field_type: str) -> str:
+    field_type = field_type.upper()
+    return STANDARD_TYPES.get(field_type, field_type)
+
+
+def _normalize_mode(mode: Optional[str]) -> str:
+    if mode is None:
+        return 'NULLABLE'
+    return mode.upper()
+
+
+def _get_options(field: bigquery.SchemaField) -> dict:
+    return {k: v for k, v in field.to_api_repr().items()
+            if k not in ['name', 'type', 'mode', 'description', 'fields']}
+
+
+def _build_change(
+        kind: str,
+        field: Optional[str],
+        reference,
+        table) -> dict:
+    return {'kind': kind, 'field': field, 'reference': reference,
+            'table': table, 'compatible': kind in COMPATIBLE_KINDS}
+
+
+def _diff_field(
+        path: str,
+        reference: bigquery.SchemaField,
+        table: bigquery.SchemaField) -> List[dict]:
+    res = []
+    reference_type = _normalize_type(reference.field_type)
+    table_type = _normalize_type(table.field_type)
+    if reference_type != table_type:
+        kind = 'changed_type'
+        if reference_type in WIDENINGS.get(table_type, []) and '.' not in path:
+            kind = 'widened_type'
+        res.append(_build_change(kind, path, reference_type, table_type))
+    reference_mode = _normalize_mode(reference.mode)
+    table_mode = _normalize_mode(table.mode)
+    if reference_mode != table_mode:
+        kind = 'changed_mode'
+        if (table_mode, reference_mode) == ('REQUIRED', 'NULLABLE'):
+            kind = 'relaxed_column'
+        res.append(_build_change(kind, path, reference_mode, table_mode))
+    if reference.description != table.description:
+        res.append(_build_change(
+            'changed_description', path, reference.description,
+            table.description))
+    reference_options = _get_options(reference)
+    table_options = _get_options(table)
+    if reference_options != table_options:
+        res.append(_build_change(
+            'changed_column', path, reference_options, table_options))
+    if reference_type == 'RECORD' and table_type == 'RECORD':
+        res += diff_schemas(reference.fields, table.fields, f'{path}.')
+    return res
+
+
+def diff_schemas(
+        reference: List[bigquery.SchemaField],
+        table: List[bigquery.SchemaField],
+        prefix: Optional[str] = '') -> List[dict]:
+    """Return the changes turning the schema ``table`` into the schema
+    ``reference``, the fields of records being compared recursively. See the
+    function diff_format_attributes for the format of the changes."""
+    reference_fields = {f.name: f for f in reference}
+    table_fields = {f.name: f for f in table}
+    res = []
+    common_names = [f.name for f in table if f.name in reference_fields]
+    reference_names = [f.name for f in reference]
+    if reference_names[:len(common_names)] != common_names:
+        res.append(_build_change(
+            'reordered_columns', prefix.rstrip('.') or None,
+            reference_names, [f.name for f in table]))
+    for f in table:
+        if f.name not in reference_fields:
+            res.append(_build_change(
+                'removed_column', f'{prefix}{f.name}', None, f.field_type))
+    for f in reference:
+        path = f'{prefix}{f.name}'
+        if f.name in table_fields:
+            res += _diff_field(path, f, table_fields[f.name])
+        elif _normalize_mode(f.mode) == 'REQUIRED':
+            res.append(_build_change(
+                'added_required_column', path, f.field_type, None))
+        else:
+            res.append(_build_change('added_column', path, f.field_type, None))
+    return res
+
+
+def diff_format_attributes(
+        reference: Dict[str, object],
+        table: Dict[str, object]) -> List[dict]:
+    """Return the changes turning the format attributes ``table`` into the
+    format attributes ``reference``, both given by the method
+    get_format_attributes of an Operator.
+
+    Each change is a dict with the keys:
+
+    - kind, one of added_column, relaxed_column, widened_type,
+      changed_description and changed_require_partition_filter, which can
+      be applied to the table in place, or removed_column, reordered_columns,
+      added_required_column, changed_type, changed_mode, changed_column,
+      changed_time_partitioning, changed_range_partitioning and
+      changed_clustering_fields, which require to recreate the table;
+    - field, the path of the column, such as 'a.b' for the field b of the
+      record a, or None;
+    - reference and table, the values compared;
+    - compatible, True if the change can be applied in place.
+    """
+    res = diff_schemas(reference['schema'], table['schema'])
+    for a in ['time_partitioning', 'range_partitioning', 'clustering_fields',
+              'require_partition_filter']:
+        if reference[a] != table[a]:
+            res.append(_build_change(
+                f'changed_{a}', None, reference[a], table[a]))
+    return res
+
+
+def is_compatible(changes: List[dict]) -> bool:
+    """Return True if all the changes can be applied in place."""
+    return all(c['compatible'] for c in changes)
+
+
+def build_alter_statement(table_id: str, changes: List[dict]) -> Optional[str]:
+    """Return the ALTER TABLE statement applying the type widenings among
+    the changes, or None if there is none."""
+    actions = [f"alter column `{c['field']}` set data type "
+               f"{SQL_TYPES[c['reference']]}"
+               for c in changes if c['kind'] == 'widened_type']
+    if not actions:
+        return None
+    return f'alter table `{table_id}` ' + ', '.join(actions)
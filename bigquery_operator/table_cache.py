@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Optional
+from google.cloud import bigquery
+
+
+class TableCache:
+    """In-memory cache of table metadata, to be passed to an Operator.
+
+    Each entry holds the result of a get_table call for one table id:
+    either the table, or None if the table was not found. An entry expires
+    ``ttl`` seconds after it has been stored. When more than ``max_size``
+    entries are stored, the least recently used entry is evicted.
+
+    The methods of the Operator which write a table invalidate its entry.
+    Tables written by other means are seen only once their entry expires.
+
+    Args:
+        ttl (float): The time to live of an entry, in seconds.
+        max_size (int): The maximum number of entries.
+    """
+    def __init__(
+            self,
+            ttl: Optional[float] = 60,
+            max_size: Optional[int] = 1000) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._check_arguments()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_arguments(self) -> None:
+        if self._ttl <= 0:
+            raise ValueError('ttl must be positive')
+        if self._max_size < 1:
+            raise ValueError('max_size must be a positive integer')
+
+    @property
+    def ttl(self) -> float:
+        """float: The time to live of an entry, in seconds."""
+        return self._ttl
+
+    @property
+    def max_size(self) -> int:
+        """int: The maximum number of entries."""
+        return self._max_size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, table_id: str) -> Optional[bigquery.Table]:
+        """Return a copy of the cached table, or None if the table was
+        cached as not found. Raise KeyError if there is no valid entry
+        for the table id."""
+        with self._lock:
+            expiration, table = self._entries[table_id]
+            if expiration <= time.monotonic():
+                del self._entries[table_id]
+                raise KeyError(table_id)
+            self._entries.move_to_end(table_id)
+            return deepcopy(table)
+
+    def set(self, table_id: str, table: Optional[bigquery.Table]) -> None:
+        """Store a copy of a table. Pass None to record that the table was
+        not found."""
+        expiration = time.monotonic() + self._ttl
+        with self._lock:
+            self._entries[table_id] = (expiration, deepcopy(table))
+            self._entries.move_to_end(table_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table_id: str) -> None:
+        """Remove the entry of a table id, if any."""
+        with self._lock:
+            self._entries.pop(table_id, None)
+
+    def invalidate_dataset(self, dataset_id: str) -> None:
+        """Remove the entries of all the tables of a dataset."""
+        prefix = f'{dataset_id}.'
+        with self._lock:
+            for table_id in [k for k in self._entries
+                             if k.startswith(prefix)]:
+                del self._entries[table_id]
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,225 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Optional, List, Iterable, Union, Callable, Tuple
+from google.cloud import bigquery
+from google.api_core import exceptions
+from bigquery_operator.retry_policy import RetryPolicy
+logger = logging.getLogger(__name__)
+
+
+class TableWriter:
+    """Buffered writer appending rows to a BigQuery table with streaming
+    inserts. It is usually obtained with the method table_writer of an
+    Operator.
+
+    The rows are buffered and sent by batches of ``batch_size`` rows. The
+    rows buffered for ``flush_interval`` seconds are sent even if the batch
+    is not full. The batches are sent in background threads, at most
+    ``max_pending_batches`` being pending at the same time: beyond, writing
+    blocks until a batch is done.
+
+    Each row is sent with a unique insert id, which lets BigQuery
+    deduplicate the rows of a batch retried according to ``retry_policy``.
+    If a batch fails, the exception is raised by the next call to
+    write_rows, write_batch, flush or close.
+
+    Args:
+        client (google.cloud.bigquery.client.Client): Client to manage
+            connections to the BigQuery API.
+        table (google.cloud.bigquery.table.Table): The table, whose schema
+            is used to serialize the rows.
+        batch_size (int): The maximum number of rows sent in one request.
+        flush_interval (float): The maximum time a row stays in the
+            buffer, in seconds.
+        max_pending_batches (int): The maximum number of batches being
+            sent at the same time.
+        retry_policy (RetryPolicy): The retry policy applied to each
+            request. If not passed, the default RetryPolicy is used.
+        on_commit (Callable[[], None]): If passed, called after each
+            batch inserted, for instance to invalidate a cached table.
+    """
+    def __init__(
+            self,
+            client: bigquery.Client,
+            table: bigquery.Table,
+            batch_size: Optional[int] = 500,
+            flush_interval: Optional[float] = 1,
+            max_pending_batches: Optional[int] = 4,
+            retry_policy: Optional[RetryPolicy] = None,
+            on_commit: Optional[Callable[[], None]] = None) -> None:
+        self._client = client
+        self._table = table
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending_batches = max_pending_batches
+        self._check_arguments()
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self._retry_policy = retry_policy
+        self._on_commit = on_commit
+        self._buffer = []
+        self._futures = set()
+        self._nb_committed_rows = 0
+        self._error = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._pending = threading.BoundedSemaphore(max_pending_batches)
+        self._executor = ThreadPoolExecutor(max_workers=max_pending_batches)
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def _check_arguments(self) -> None:
+        if self._batch_size < 1:
+            raise ValueError('batch_size must be a positive integer')
+        if self._flush_interval <= 0:
+            raise ValueError('flush_interval must be positive')
+        if self._max_pending_batches < 1:
+            raise ValueError(
+                'max_pending_batches must be a positive integer')
+
+    @property
+    def table_id(self) -> str:
+        """str: The id of the table in the format
+        'project_id.dataset_name.table_name'."""
+        return (f'{self._table.project}.{self._table.dataset_id}.'
+                f'{self._table.table_id}')
+
+    @property
+    def batch_size(self) -> int:
+        """int: The maximum number of rows sent in one request."""
+        return self._batch_size
+
+    @property
+    def flush_interval(self) -> float:
+        """float: The maximum time a row stays in the buffer, in
+        seconds."""
+        return self._flush_interval
+
+    @property
+    def max_pending_batches(self) -> int:
+        """int: The maximum number of batches being sent at the same
+        time."""
+        return self._max_pending_batches
+
+    @property
+    def nb_committed_rows(self) -> int:
+        """int: The number of rows inserted so far."""
+        with self._lock:
+            return self._nb_committed_rows
+
+    def __enter__(self) -> 'TableWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _raise_error(self) -> None:
+        if self._closed:
+            raise ValueError('the writer is closed')
+        with self._lock:
+            error = self._error
+        if error is not None:
+            raise error
+
+    def _insert(self, rows: List[dict]) -> None:
+        row_ids = [uuid.uuid4().hex for _ in rows]
+        errors = self._retry_policy.call(
+            self._client.insert_rows, self._table, rows, row_ids=row_ids)
+        if errors:
+            raise exceptions.BadRequest(
+                f'{len(errors)} rows could not be inserted into '
+                f'{self.table_id}: {errors[:3]}',
+                errors=errors)
+        with self._lock:
+            self._nb_committed_rows += len(rows)
+        if self._on_commit is not None:
+            self._on_commit()
+
+    def _on_done(self, future: Future) -> None:
+        self._pending.release()
+        with self._lock:
+            self._futures.discard(future)
+            if future.exception() is not None and self._error is None:
+                self._error = future.exception()
+
+    def _run(self, rows: List[dict], future: Future) -> None:
+        try:
+            self._insert(rows)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    def _send(self, rows: List[dict], future: Future) -> None:
+        self._pending.acquire()
+        future.add_done_callback(self._on_done)
+        self._executor.submit(self._run, rows, future)
+
+    def _take_batch(self) -> Optional[Tuple[List[dict], Future]]:
+        # Must be called with the lock held. The future of the batch is
+        # registered before the batch waits for a pending slot, so that
+        # flush also waits for the batches which are not submitted yet.
+        if not self._buffer:
+            return None
+        rows = self._buffer
+        self._buffer = []
+        future = Future()
+        self._futures.add(future)
+        return rows, future
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self._flush_interval):
+            with self._lock:
+                batch = self._take_batch()
+            if batch is not None:
+                self._send(*batch)
+
+    def write_rows(self, rows: Iterable[dict]) -> None:
+        """Buffer rows given as dicts mapping column names to values.
+        Block if a full batch has to be sent and max_pending_batches
+        batches are pending."""
+        self._raise_error()
+        for row in rows:
+            with self._lock:
+                self._buffer.append(row)
+                batch = None
+                if len(self._buffer) >= self._batch_size:
+                    batch = self._take_batch()
+            if batch is not None:
+                self._send(*batch)
+
+    def write_batch(
+            self,
+            batch: Union['pyarrow.RecordBatch', 'pyarrow.Table']) -> None:
+        """Buffer the rows of a pyarrow.RecordBatch or pyarrow.Table."""
+        self.write_rows(batch.to_pylist())
+
+    def flush(self) -> None:
+        """Send the buffered rows and wait for all the pending batches."""
+        self._raise_error()
+        with self._lock:
+            batch = self._take_batch()
+        if batch is not None:
+            self._send(*batch)
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+        self._raise_error()
+
+    def close(self) -> int:
+        """Flush and release the threads of the writer. Return the number
+        of rows inserted. Closing a closed writer does nothing."""
+        if self._closed:
+            return self._nb_committed_rows
+        self._stop.set()
+        self._flusher.join()
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+            self._closed = True
+        return self._nb_committed_rows
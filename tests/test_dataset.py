@@ -50,8 +50,48 @@ class DatasetWithApiCallsTest(ut.base_class.BaseClassTest):
             ['table_name_1', 'table_name_2'],
             ut.operators.operator.list_tables())
 
+    def test_iter_tables(self):
+        for n in ['table_name_1', 'table_name_2', 'other_table_name']:
+            ut.table.create_empty_table(n)
+        ut.operators.operator.create_view('select 3', 'table_name_3')
+        computed = ut.operators.operator.iter_tables(page_size=1)
+        self.assertFalse(isinstance(computed, list))
+        self.assertEqual(
+            ['other_table_name', 'table_name_1', 'table_name_2',
+             'table_name_3'],
+            sorted(computed))
+        self.assertEqual(
+            ['table_name_1', 'table_name_2', 'table_name_3'],
+            sorted(ut.operators.operator.iter_tables(prefix='table_')))
+        self.assertEqual(
+            ['table_name_3'],
+            list(ut.operators.operator.iter_tables(table_type='VIEW')))
+        self.assertEqual(
+            ['table_name_1', 'table_name_2'],
+            ut.operators.operator.list_tables(
+                prefix='table_', table_type='TABLE'))
+
+    @ut.base_class.requires_bigquery
+    def test_describe_dataset(self):
+        self.assertEqual({}, ut.operators.operator.describe_dataset())
+        for n in ['table_name_1', 'table_name_2']:
+            ut.table.create_empty_table(n)
+        self.assertEqual(
+            ['table_name_1', 'table_name_2'],
+            sorted(ut.operators.operator.describe_dataset()))
+
     def test_clean_dataset(self):
         for n in ['table_name_1', 'table_name_2']:
             ut.table.create_empty_table(n)
         ut.operators.operator.clean_dataset()
         self.assertEqual([], ut.dataset.list_tables())
+
+    def test_clean_dataset_by_recreating_it(self):
+        for mode in ['recreate_dataset', 'auto']:
+            for n in ['table_name_1', 'table_name_2']:
+                ut.table.create_empty_table(n)
+            ut.operators.operator.clean_dataset(
+                mode=mode, recreate_threshold=2)
+            self.assertEqual([], ut.dataset.list_tables())
+            dataset = ut.dataset.get_dataset()
+            self.assertEqual(ut.constants.dataset_location, dataset.location)
@@ -22,6 +22,63 @@ class ErrorsTest(unittest.TestCase):
                 dataset_id='a.b.c')
         self.assertEqual(msg, str(cm.exception))
 
+    def test_raise_error_if_max_workers_not_positive(self):
+        msg = 'max_workers must be a positive integer'
+        for max_workers in [0, -1, 2.5]:
+            with self.assertRaises(ValueError) as cm:
+                bigquery_operator.Operator(
+                    client=ut.constants.bq_client,
+                    dataset_id='a.b',
+                    max_workers=max_workers)
+            self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_clean_dataset_mode_unknown(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.clean_dataset(mode='drop')
+        msg = ("mode must be one of "
+               "['delete_tables', 'recreate_dataset', 'auto']")
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_sample_method_invalid(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.sample_query('select 3', 1, method='rand')
+        msg = "method must be one of ['count', 'window', 'hash']"
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.sample_query('select 3', 1, method='hash')
+        msg = "key must be passed with the method 'hash'"
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_dependencies_invalid(self):
+        queries = ['select 3', 'select 1']
+        destination_table_names = ['table_name_1', 'table_name_2']
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_dependent_queries(
+                queries=queries,
+                destination_table_names=destination_table_names,
+                dependencies={'table_name_1': ['table_name_2'],
+                              'table_name_2': ['table_name_1']})
+        msg = 'dependencies must not contain a cycle'
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_dependent_queries(
+                queries=queries,
+                destination_table_names=destination_table_names,
+                dependencies={'table_name_1': ['table_name_3']})
+        msg = ('dependencies must only contain names of '
+               'destination_table_names')
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_dependent_queries(
+                queries=queries,
+                destination_table_names=['table_name_1', 'table_name_1'],
+                dependencies={})
+        msg = 'destination_table_names must be unique'
+        self.assertEqual(msg, str(cm.exception))
+
     def test_raise_error_if_queries_empty(self):
         with self.assertRaises(ValueError) as cm:
             ut.operators.operator_quick_setup.run_queries(
@@ -38,6 +95,55 @@ class ErrorsTest(unittest.TestCase):
         msg = 'queries and destination_table_names must have the same length'
         self.assertEqual(msg, str(cm.exception))
 
+    def test_raise_error_if_inline_time_to_live_without_truncate(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_query(
+                query='select 3',
+                destination_table_name='table_name',
+                time_to_live=1,
+                write_disposition='WRITE_APPEND',
+                inline_time_to_live=True)
+        msg = ('inline_time_to_live requires the '
+               'WRITE_TRUNCATE write disposition')
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_pack_size_invalid(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_query(
+                query='select 3',
+                destination_table_name='table_name',
+                pack_size=0)
+        msg = 'pack_size must be a positive integer'
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_query(
+                query='select 3',
+                destination_table_name='table_name',
+                write_disposition='WRITE_APPEND',
+                pack_size=2)
+        msg = 'pack_size requires the WRITE_TRUNCATE write disposition'
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_partition_decorator_not_supported(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.run_query(
+                query='select 3',
+                destination_table_name='table_name$20240101',
+                time_to_live=1,
+                inline_time_to_live=True)
+        msg = ('partition decorators are not supported with '
+               'inline_time_to_live, pack_size and skip_unchanged')
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.backfill(
+                query_template='select 3',
+                destination_table_name='table_name',
+                partitions=[])
+        msg = 'partitions must not be empty'
+        self.assertEqual(msg, str(cm.exception))
+
     def test_raise_error_if_source_table_names_empty_for_extract(self):
         with self.assertRaises(ValueError) as cm:
             ut.operators.operator.extract_tables(
@@ -72,6 +178,41 @@ class ErrorsTest(unittest.TestCase):
                'must have the same length')
         self.assertEqual(msg, str(cm.exception))
 
+    def test_raise_error_if_local_sources_invalid(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.load_files(
+                file_paths=[],
+                destination_table_names=[])
+        msg = 'file_paths must not be empty'
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.load_dataframes(
+                dataframes=[None],
+                destination_table_names=['table_name_1', 'table_name_2'])
+        msg = ('dataframes and destination_table_names '
+               'must have the same length')
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_file_format_unknown(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.extract_table(
+                source_table_name='table_name',
+                destination_uri='uri',
+                destination_format='ORC')
+        msg = ("destination_format must be one of "
+               "['CSV', 'NEWLINE_DELIMITED_JSON', 'AVRO', 'PARQUET']")
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.load_table(
+                source_uri='uri',
+                destination_table_name='table_name',
+                source_format='XML')
+        msg = ("source_format must be one of "
+               "['CSV', 'NEWLINE_DELIMITED_JSON', 'AVRO', 'PARQUET', 'ORC']")
+        self.assertEqual(msg, str(cm.exception))
+
     def test_raise_error_if_source_table_names_empty_for_copy(self):
         with self.assertRaises(ValueError) as cm:
             ut.operators.operator.copy_tables(
@@ -89,6 +230,63 @@ class ErrorsTest(unittest.TestCase):
                'must have the same length')
         self.assertEqual(msg, str(cm.exception))
 
+    def test_raise_error_if_copy_operation_type_invalid(self):
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.copy_table(
+                source_table_name='table_name_1',
+                destination_table_name='table_name_2',
+                operation_type='MOVE')
+        msg = "operation_type must be one of ['COPY', 'CLONE', 'SNAPSHOT']"
+        self.assertEqual(msg, str(cm.exception))
+
+        with self.assertRaises(ValueError) as cm:
+            ut.operators.operator.copy_table(
+                source_table_name=['table_name_1', 'table_name_2'],
+                destination_table_name='table_name_3',
+                operation_type='SNAPSHOT')
+        msg = ('operation_type SNAPSHOT requires a single source table per '
+               'destination table')
+        self.assertEqual(msg, str(cm.exception))
+
+    def test_raise_error_if_incremental_copy_invalid(self):
+        msg = ('incremental requires the COPY operation type, the '
+               'WRITE_TRUNCATE write disposition and a single source table '
+               'per destination table')
+        for kwargs in [{'operation_type': 'CLONE'},
+                       {'write_disposition': 'WRITE_APPEND'},
+                       {'source_table_name': ['table_name_1']}]:
+            kwargs = {'source_table_name': 'table_name_1', **kwargs}
+            with self.assertRaises(ValueError) as cm:
+                ut.operators.operator.copy_table(
+                    destination_table_name='table_name_2',
+                    incremental=True,
+                    **kwargs)
+            self.assertEqual(msg, str(cm.exception))
+
+    def test_run_jobs_raises_first_failure_and_cancels_others(self):
+        from google.api_core.exceptions import BadRequest
+        from google.cloud import bigquery
+
+        o = bigquery_operator.Operator(
+            client=ut.constants.bq_client,
+            dataset_id=ut.constants.dataset_id,
+            cancel_on_error=True)
+        running_job = mock.MagicMock()
+        running_job.done.return_value = False
+        failed_job = mock.MagicMock()
+        failed_job.job_id = 'job_id_1'
+        failed_job.done.return_value = True
+        failed_job.error_result = {'reason': 'invalidQuery'}
+        failed_job.destination = bigquery.TableReference.from_string(
+            'project_id.dataset_name.table_name')
+        failed_job.result.side_effect = BadRequest('invalid query')
+        with self.assertRaises(BadRequest) as cm:
+            o._run_jobs([lambda: running_job, lambda: failed_job])
+        self.assertIn('job_id_1', str(cm.exception))
+        self.assertIn('project_id.dataset_name.table_name', str(cm.exception))
+        running_job.cancel.assert_called_once()
+        failed_job.cancel.assert_not_called()
+
     @mock.patch('tests.utils.operators.operator.get_table')
     @mock.patch('tests.utils.operators.operator._client.update_table')
     def test_set_time_to_live_raises_exception_after_max_retries(
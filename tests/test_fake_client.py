@@ -0,0 +1,231 @@
+import os
+import time
+import unittest
+import bigquery_operator
+from google.api_core.exceptions import BadRequest, InternalServerError, \
+    PreconditionFailed, ServiceUnavailable
+from google.cloud import bigquery
+from bigquery_operator.fake_client import FakeClient
+
+dataset_id = 'project_id.dataset_name'
+
+
+class FakeClientTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.operator = self.build_operator(self.client)
+        self.operator.create_dataset('EU')
+
+    @staticmethod
+    def build_operator(client, **kwargs):
+        return bigquery_operator.Operator(
+            client=client,
+            dataset_id=dataset_id,
+            retry_policy=bigquery_operator.RetryPolicy(initial_delay=0.01),
+            **kwargs)
+
+    def test_run_queries(self):
+        o = self.operator
+        o.run_queries(
+            queries=["select 3 as x, 'a' as y union all select 2, 'b'",
+                     'select 1 as x'],
+            destination_table_names=['table_name_1', 'table_name_2'],
+            time_to_live=2)
+        o.run_dependent_queries(
+            queries=['select x + 1 as x from `dataset_name.table_name_1`'],
+            destination_table_names=['table_name_3'])
+        self.assertEqual(['table_name_1', 'table_name_2', 'table_name_3'],
+                         o.list_tables())
+        self.assertEqual(
+            [(3, 'a'), (2, 'b')],
+            [tuple(r.values()) for r in o.get_table_rows('table_name_1')])
+        self.assertEqual(
+            [4, 3], [r.x for r in o.get_table_rows('table_name_3')])
+        table = o.get_table('table_name_1')
+        self.assertEqual(2, table.num_rows)
+        self.assertEqual(['INTEGER', 'STRING'],
+                         [f.field_type for f in table.schema])
+        self.assertIsNotNone(table.expires)
+        self.assertEqual(
+            [5], [r.s for r in o.get_query_rows(
+                'select sum(x) as s from `dataset_name.table_name_1`')])
+
+    def test_scripts_report_child_jobs(self):
+        o = self.operator
+        o.run_queries(
+            queries=['select 1 as x'] * 3,
+            destination_table_names=['t1', 't2', 't3'],
+            pack_size=2,
+            max_gb_billed=1)
+        self.assertEqual(3, o.last_report['nb_jobs'])
+        self.assertEqual(
+            [f'{dataset_id}.t{i}' for i in range(1, 4)],
+            [r['destination'] for r in o.last_report['jobs']])
+        self.assertEqual(['t1', 't2', 't3'], o.list_tables())
+        self.assertEqual(
+            [2 * 10 ** 9, 10 ** 9],
+            [j.maximum_bytes_billed for j in self.client.list_jobs()
+             if j.maximum_bytes_billed is not None])
+
+    def test_skip_unchanged_ignores_metadata_updates(self):
+        o = self.operator
+        o.run_query('select 1 as x', 'source')
+
+        def run_pipeline():
+            for source, destination in [('source', 't1'), ('t1', 't2')]:
+                o.run_queries(
+                    queries=[f'select x from `dataset_name.{source}`'],
+                    destination_table_names=[destination],
+                    time_to_live=2,
+                    skip_unchanged=True)
+
+        def count_query_jobs():
+            return len([j for j in self.client.list_jobs()
+                        if 'INFORMATION_SCHEMA' not in j.query])
+
+        run_pipeline()
+        nb_jobs = count_query_jobs()
+        o.set_time_to_live('t1', 3)
+        run_pipeline()
+        self.assertEqual(nb_jobs, count_query_jobs())
+        self.assertEqual(['t2'], o.last_report['skipped'])
+        self.assertEqual(
+            o.get_table('t1').expires, o._build_expiration_time(3))
+
+    def test_dependencies_on_new_columns_are_inferred(self):
+        o = self.operator
+        o.run_query('select 1 as x', 'table_name_1')
+        o.run_query('select 1 as x', 'table_name_2')
+        o.run_dependent_queries(
+            queries=['select x, 2 as y from `dataset_name.table_name_1`',
+                     'select y from `dataset_name.table_name_2`'],
+            destination_table_names=['table_name_2', 'table_name_3'])
+        self.assertEqual(
+            [2], [r.y for r in o.get_table_rows('table_name_3')])
+
+    def test_copy_extract_and_load(self):
+        o = self.operator
+        o.run_query("select 3 as x, 'a' as y", 'table_name_1')
+        o.copy_table('table_name_1', 'table_name_2')
+        o.extract_table('table_name_2', 'gs://bucket/dir/table-*.csv.gz')
+        self.assertTrue(os.path.exists(os.path.join(
+            self.client.gcs_dir, 'bucket/dir/table-000000000000.csv.gz')))
+        o.load_table(
+            source_uri='gs://bucket/dir/table-*.csv.gz',
+            destination_table_name='table_name_3',
+            schema=[bigquery.SchemaField('x', 'INTEGER'),
+                    bigquery.SchemaField('y', 'STRING')])
+        self.assertEqual(
+            [(3, 'a')],
+            [tuple(r.values()) for r in o.get_table_rows('table_name_3')])
+        self.assertEqual(
+            1, o.last_report['jobs'][0]['output_rows'])
+
+    def test_table_writer_and_schema_evolution(self):
+        o = self.operator
+        o.create_empty_table('table_name_1', schema=[
+            bigquery.SchemaField('a', 'STRING', mode='REQUIRED'),
+            bigquery.SchemaField('b', 'INTEGER')])
+        o.create_empty_table('table_name_2', schema=[
+            bigquery.SchemaField('a', 'STRING'),
+            bigquery.SchemaField('b', 'NUMERIC'),
+            bigquery.SchemaField('c', 'DATE')])
+        with o.table_writer('table_name_1') as writer:
+            writer.write_rows([{'a': 'x', 'b': 1}])
+        o.delete_table_if_mismatches(
+            'table_name_2', 'table_name_1', evolve_schema=True)
+        self.assertEqual(o.get_format_attributes('table_name_2'),
+                         o.get_format_attributes('table_name_1'))
+        self.assertEqual(1, o.get_table('table_name_1').num_rows)
+
+    def test_update_table_checks_etag(self):
+        o = self.operator
+        o.create_empty_table('table_name')
+        table = o.get_table('table_name')
+        o.set_time_to_live('table_name', 1)
+        table.labels = {'k': 'v'}
+        with self.assertRaises(PreconditionFailed):
+            self.client.update_table(table, ['labels'])
+
+    def test_calls_are_counted_and_delayed(self):
+        client = FakeClient(latencies={'get_table': 0.05})
+        o = self.build_operator(client, max_workers=4)
+        o.create_dataset('EU')
+        for i in range(4):
+            o.create_empty_table(f'table_name_{i}')
+        client.reset_calls()
+        start = time.monotonic()
+        o.set_times_to_live([f'table_name_{i}' for i in range(4)], 1)
+        self.assertTrue(time.monotonic() - start < 0.2)
+        self.assertEqual({'get_table': 4, 'update_table': 4}, client.calls)
+        self.assertEqual(4, client.max_nb_running_calls)
+
+        client.reset_calls()
+        for i in range(120):
+            o.create_empty_table(f'other_table_name_{i}')
+        client.reset_calls()
+        o.clean_dataset()
+        self.assertEqual(
+            {'list_tables': 3, 'delete_table': 124}, client.calls)
+        self.assertEqual(127, client.nb_calls)
+
+    def test_running_jobs_are_polled_with_backoff(self):
+        client = FakeClient(job_duration=1.2)
+        o = self.build_operator(client)
+        o.create_dataset('EU')
+        client.reset_calls()
+        o.run_queries(
+            queries=['select 1 as x'] * 10,
+            destination_table_names=[f'table_name_{i}' for i in range(10)])
+        self.assertEqual({'query': 10, 'get_job': 20}, client.calls)
+
+    def test_jobs_are_done_after_given_number_of_polls(self):
+        client = FakeClient(nb_job_polls=3)
+        o = self.build_operator(client)
+        o.create_dataset('EU')
+        client.reset_calls()
+        o.run_queries(
+            queries=['select 1 as x'] * 10,
+            destination_table_names=[f'table_name_{i}' for i in range(10)])
+        self.assertEqual({'query': 10, 'get_job': 30}, client.calls)
+
+    def test_injected_errors(self):
+        o = self.operator
+        o.create_empty_table('table_name')
+        self.client.inject_error('delete_table', ServiceUnavailable(''), 2)
+        o.delete_table('table_name')
+        self.assertEqual(3, self.client.calls['delete_table'])
+
+        self.client.inject_job_error('backendError', 'boom')
+        with self.assertRaises(InternalServerError) as cm:
+            o.run_query('select 1 as x', 'table_name')
+        self.assertIn('boom', str(cm.exception))
+        self.assertFalse(o.table_exists('table_name'))
+
+        with self.assertRaises(BadRequest):
+            o.run_query('select * from unknown_function()', 'table_name')
+
+    def test_only_transient_job_errors_are_retried(self):
+        o = self.operator
+        submits = o._query_jobs(
+            ['select 1 as x'], ['table_name'],
+            bigquery.WriteDisposition.WRITE_TRUNCATE)
+        self.client.inject_job_error('backendError')
+        o._run_jobs(submits, max_retries=1, min_poll_interval=0)
+        self.assertEqual(2, self.client.calls['query'])
+        self.client.inject_job_error('invalidQuery')
+        with self.assertRaises(BadRequest):
+            o._run_jobs(submits, max_retries=1, min_poll_interval=0)
+        self.assertEqual(3, self.client.calls['query'])
+
+    def test_requeued_jobs_keep_their_order(self):
+        o = self.build_operator(
+            self.client, job_scheduler=bigquery_operator.JobScheduler())
+        self.client.inject_job_error('rateLimitExceeded')
+        names = [f'table_name_{i}' for i in range(4)]
+        o.run_queries(queries=['select 1 as x'] * 4,
+                      destination_table_names=names)
+        self.assertEqual(5, self.client.calls['query'])
+        self.assertEqual(
+            [f'{dataset_id}.{n}' for n in names],
+            [r['destination'] for r in o.last_report['jobs']])
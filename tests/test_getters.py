@@ -1,5 +1,7 @@
 import unittest
 import bigquery_operator
+from datetime import date, datetime
+from unittest import mock
 from tests import utils as ut
 
 
@@ -14,7 +16,54 @@ class GettersTest(unittest.TestCase):
         self.assertEqual('project_id_1.dataset_name_1', o.dataset_id)
         self.assertEqual('project_id_1', o.dataset_project_id)
         self.assertEqual('dataset_name_1', o.dataset_name)
+        self.assertEqual(8, o.max_workers)
+        self.assertFalse(o.cancel_on_error)
 
     def test_call_operator_quick_setup_getter(self):
         o = ut.operators.operator_quick_setup
         self.assertEqual(ut.constants.project_id, o.project_id)
+
+    def test_build_partition_name(self):
+        o = bigquery_operator.Operator
+        self.assertEqual(
+            't$20240102', o.build_partition_name('t', date(2024, 1, 2)))
+        self.assertEqual(
+            't$2024010205',
+            o.build_partition_name('t', datetime(2024, 1, 2, 5)))
+        self.assertEqual('t$30', o.build_partition_name('t', 30))
+        self.assertEqual('t$202401', o.build_partition_name('t', '202401'))
+
+    def test_find_changed_partitions(self):
+        o = bigquery_operator.Operator(
+            mock.MagicMock(), ut.constants.dataset_id)
+
+        def p(modified, num_rows):
+            return {'modified': datetime(2024, 1, modified),
+                    'num_rows': num_rows}
+
+        sources = {
+            't1': {'20240101': p(1, 1), '20240102': p(3, 1),
+                   '20240103': p(1, 1), '20240104': p(1, 2),
+                   '__STREAMING_UNPARTITIONED__': p(3, 1)},
+            't2': {None: p(3, 1)},
+            't3': {None: p(1, 1)},
+            't4': {None: p(1, 1)}}
+        destinations = {
+            'd1': {'20240101': p(2, 1), '20240102': p(2, 1),
+                   '20240104': p(2, 1), '20240105': p(2, 1)},
+            'd2': {None: p(2, 1)},
+            'd3': {None: p(2, 1)}}
+        metadata = {'project_id_1.dataset_name_1': sources,
+                    ut.constants.dataset_id: destinations}
+        with mock.patch.object(
+                o, 'get_partitions_metadata',
+                side_effect=lambda names, dataset_id: metadata[dataset_id]):
+            computed = o._find_changed_partitions(
+                ['t1', 't2', 't3', 't4'], ['d1', 'd2', 'd3', 'd4'],
+                'project_id_1.dataset_name_1')
+        expected = [('t1$20240102', 'd1$20240102'),
+                    ('t1$20240103', 'd1$20240103'),
+                    ('t1$20240104', 'd1$20240104'),
+                    ('t2', 'd2'),
+                    ('t4', 'd4')]
+        self.assertEqual(expected, computed)
@@ -0,0 +1,148 @@
+import threading
+import time
+import unittest
+import bigquery_operator
+from unittest import mock
+from google.api_core.exceptions import BadRequest, Forbidden
+
+dataset_id = 'project_id.dataset_name'
+
+
+class FakeJob:
+    def __init__(self, nb_polls=1, error_result=None):
+        self.job_id = 'job_id'
+        self.nb_polls = nb_polls
+        self.error_result = error_result
+
+    def done(self):
+        self.nb_polls -= 1
+        return self.nb_polls <= 0
+
+    def result(self):
+        raise BadRequest(self.error_result['message'])
+
+
+class JobSchedulerTest(unittest.TestCase):
+    def test_raise_error_if_arguments_not_positive(self):
+        with self.assertRaises(ValueError) as cm:
+            bigquery_operator.JobScheduler(max_in_flight_jobs=0)
+        self.assertEqual(
+            'max_in_flight_jobs must be a positive integer',
+            str(cm.exception))
+        with self.assertRaises(ValueError) as cm:
+            bigquery_operator.JobScheduler(updates_per_second=0)
+        self.assertEqual(
+            'updates_per_second must be positive', str(cm.exception))
+
+    def test_job_inserts_are_rate_limited(self):
+        scheduler = bigquery_operator.JobScheduler(job_inserts_per_second=20)
+        start = time.monotonic()
+        for _ in range(30):
+            scheduler.acquire_job_insert()
+        self.assertTrue(time.monotonic() - start >= 0.45)
+
+
+class OperatorWithJobSchedulerTest(unittest.TestCase):
+    def build_operator(self, **kwargs):
+        return bigquery_operator.Operator(
+            client=mock.MagicMock(),
+            dataset_id=dataset_id,
+            retry_policy=bigquery_operator.RetryPolicy(
+                initial_delay=0.01, max_elapsed=0),
+            job_scheduler=bigquery_operator.JobScheduler(**kwargs))
+
+    def test_in_flight_jobs_are_capped(self):
+        o = self.build_operator(max_in_flight_jobs=2)
+        nb_running = []
+        jobs = []
+
+        def submit():
+            job = FakeJob(nb_polls=2)
+            jobs.append(job)
+            nb_running.append(sum(j.nb_polls > 0 for j in jobs))
+            return job
+
+        computed = o._run_jobs([submit] * 5, min_poll_interval=0)
+        self.assertEqual(jobs, computed)
+        self.assertEqual(2, max(nb_running))
+
+    def test_in_flight_jobs_are_capped_across_operators(self):
+        scheduler = bigquery_operator.JobScheduler(max_in_flight_jobs=2)
+        operators = [self.build_operator() for _ in range(2)]
+        for o in operators:
+            o._job_scheduler = scheduler
+        lock = threading.Lock()
+        nb_running = []
+        jobs = []
+
+        def submit():
+            job = FakeJob(nb_polls=3)
+            with lock:
+                jobs.append(job)
+                nb_running.append(sum(j.nb_polls > 0 for j in jobs))
+            return job
+
+        threads = [threading.Thread(
+            target=o._run_jobs, args=([submit] * 4,),
+            kwargs={'min_poll_interval': 0}) for o in operators]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(8, len(jobs))
+        self.assertEqual(2, max(nb_running))
+
+        submit = mock.MagicMock(return_value=FakeJob(
+            error_result={'reason': 'invalidQuery', 'message': 'invalid'}))
+        with self.assertRaises(BadRequest):
+            operators[0]._run_jobs([submit] * 2, min_poll_interval=0)
+        self.assertTrue(scheduler.acquire_job_slot())
+        self.assertTrue(scheduler.acquire_job_slot())
+        self.assertFalse(scheduler.acquire_job_slot())
+
+    def test_rate_limited_jobs_are_requeued(self):
+        o = self.build_operator(max_requeues=2)
+        rate_limited_job = FakeJob(error_result={
+            'reason': 'jobRateLimitExceeded', 'message': 'rate limited'})
+        succeeded_job = FakeJob()
+        submit = mock.MagicMock(side_effect=[
+            rate_limited_job, rate_limited_job, succeeded_job])
+        self.assertEqual(
+            [succeeded_job], o._run_jobs([submit], min_poll_interval=0))
+        self.assertEqual(3, submit.call_count)
+
+        submit = mock.MagicMock(return_value=rate_limited_job)
+        with self.assertRaises(BadRequest):
+            o._run_jobs([submit], min_poll_interval=0)
+        self.assertEqual(3, submit.call_count)
+
+        submit = mock.MagicMock(side_effect=Forbidden(
+            'too many concurrent queries',
+            errors=[{'reason': 'rateLimitExceeded'}]))
+        with self.assertRaises(Forbidden):
+            o._run_jobs([submit], min_poll_interval=0)
+        self.assertEqual(1, submit.call_count)
+
+        submit = mock.MagicMock(return_value=FakeJob(
+            error_result={'reason': 'invalidQuery', 'message': 'invalid'}))
+        with self.assertRaises(BadRequest):
+            o._run_jobs([submit], min_poll_interval=0)
+        self.assertEqual(1, submit.call_count)
+
+    def test_failed_jobs_are_retried(self):
+        o = self.build_operator()
+        succeeded_job = FakeJob()
+        submit = mock.MagicMock(side_effect=[
+            FakeJob(error_result={'reason': 'backendError', 'message': ''}),
+            succeeded_job])
+        self.assertEqual(
+            [succeeded_job],
+            o._run_jobs([submit], max_retries=1, min_poll_interval=0))
+        self.assertEqual(2, submit.call_count)
+
+    def test_queries_can_run_with_batch_priority(self):
+        o = self.build_operator()
+        o._query_job('select 3', 'table_name', 'WRITE_TRUNCATE',
+                     priority='BATCH')
+        job_config = o.client.query.call_args.kwargs['job_config']
+        self.assertEqual('BATCH', job_config.priority)
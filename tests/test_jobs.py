@@ -1,9 +1,10 @@
 import pandas
-from google.cloud import bigquery
+from google.cloud import bigquery, exceptions
 from tests import utils as ut
 
 
 class JobsTest(ut.base_class.BaseClassTest):
+    @ut.base_class.requires_bigquery
     def test_run_queries(self):
         expected_1 = pandas.DataFrame(
             data={'x': [3], 'y': ['a']})
@@ -20,6 +21,13 @@ class JobsTest(ut.base_class.BaseClassTest):
         self.assertTrue(monitoring['duration'] > 0)
         self.assertEqual(
             ['table_name_1', 'table_name_2'], ut.dataset.list_tables())
+        report = ut.operators.operator.last_report
+        self.assertEqual(2, report['nb_jobs'])
+        self.assertEqual(
+            [ut.table.build_table_id('table_name_1'),
+             ut.table.build_table_id('table_name_2')],
+            [r['destination'] for r in report['jobs']])
+        self.assertTrue(all(r['job_type'] == 'query' for r in report['jobs']))
         computed_1 = ut.load.dataset_to_dataframe('table_name_1')
         computed_2 = ut.load.dataset_to_dataframe('table_name_2')
         self.assert_dataframe_equal(expected_1, computed_1)
@@ -31,6 +39,210 @@ class JobsTest(ut.base_class.BaseClassTest):
             sample_size=1,
             time_to_live=5)
 
+    @ut.base_class.requires_bigquery
+    def test_run_queries_with_sample_methods(self):
+        query = 'select x from unnest(generate_array(1, 1000)) as x'
+        ut.load.query_to_dataset(query, 'table_name')
+        for sample_method, sample_key in [
+                ('window', None), ('hash', 'x'), ('tablesample', None)]:
+            ut.operators.operator.run_queries(
+                queries=['table_name', query],
+                destination_table_names=['sample_1', 'sample_2'],
+                sample_size=100,
+                sample_method=sample_method,
+                sample_key=sample_key)
+            for n in ['sample_1', 'sample_2']:
+                self.assertTrue(ut.table.get_table(n).num_rows <= 1000)
+
+        ut.operators.operator.run_query(
+            query=query,
+            destination_table_name='sample_1',
+            sample_size=100,
+            sample_method='hash',
+            sample_key='x')
+        computed_1 = ut.load.dataset_to_dataframe('sample_1')
+        ut.operators.operator.run_query(
+            query=query,
+            destination_table_name='sample_2',
+            sample_size=100,
+            sample_method='hash',
+            sample_key='x')
+        computed_2 = ut.load.dataset_to_dataframe('sample_2')
+        self.assert_dataframe_equal(computed_1, computed_2)
+
+    @ut.base_class.requires_bigquery
+    def test_run_queries_with_budget(self):
+        ut.load.query_to_dataset(
+            'select x from unnest(generate_array(1, 1000)) as x',
+            'source_table_name')
+        table_id = ut.table.build_table_id('source_table_name')
+        query = f'select x from `{table_id}`'
+        with self.assertRaises(ValueError):
+            ut.operators.operator.run_queries(
+                queries=[query, query],
+                destination_table_names=['table_name_1', 'table_name_2'],
+                max_total_gb=0.000001)
+        self.assertEqual(['source_table_name'], ut.dataset.list_tables())
+        with self.assertRaises(exceptions.GoogleCloudError):
+            ut.operators.operator.run_query(
+                query=query,
+                destination_table_name='table_name_1',
+                max_gb_billed=0.000001)
+        ut.operators.operator.run_query(
+            query=query,
+            destination_table_name='table_name_1',
+            max_gb_billed=1,
+            max_total_gb=1)
+        self.assertEqual(
+            ['source_table_name', 'table_name_1'], ut.dataset.list_tables())
+
+    def test_run_queries_with_inline_time_to_live(self):
+        from datetime import datetime, timedelta, timezone
+        expected = (
+                datetime.now(timezone.utc) +
+                timedelta(days=4 + 1)).date()
+        expected = datetime.combine(
+            expected, datetime.min.time(), tzinfo=timezone.utc)
+        ut.operators.operator.run_queries(
+            queries=['select 3 as x', 'select 1 as x'],
+            destination_table_names=['table_name_1', 'table_name_2'],
+            time_to_live=4,
+            inline_time_to_live=True)
+        for n in ['table_name_1', 'table_name_2']:
+            self.assertEqual(expected, ut.table.get_table(n).expires)
+        computed = ut.load.dataset_to_dataframe('table_name_1')
+        self.assert_dataframe_equal(
+            pandas.DataFrame(data={'x': [3]}), computed)
+
+    def test_run_queries_packed_in_scripts(self):
+        destination_table_names = [f'table_name_{i}' for i in range(5)]
+        monitoring = ut.operators.operator.run_queries(
+            queries=[f'select {i} as x' for i in range(5)],
+            destination_table_names=destination_table_names,
+            time_to_live=4,
+            pack_size=2)
+        self.assertEqual(0.0, monitoring['GB'])
+        self.assertEqual(destination_table_names, ut.dataset.list_tables())
+        report = ut.operators.operator.last_report
+        self.assertEqual(5, report['nb_jobs'])
+        self.assertEqual(
+            [ut.table.build_table_id(n) for n in destination_table_names],
+            [r['destination'] for r in report['jobs']])
+        for i, n in enumerate(destination_table_names):
+            computed = ut.load.dataset_to_dataframe(n)
+            self.assert_dataframe_equal(
+                pandas.DataFrame(data={'x': [i]}), computed)
+            self.assertIsNotNone(ut.table.get_table(n).expires)
+
+    def test_run_queries_skip_unchanged(self):
+        ut.operators.operator.run_query(
+            query='select 3 as x',
+            destination_table_name='source_table_name')
+        source_table_id = ut.table.build_table_id('source_table_name')
+        queries = [f'select x from `{source_table_id}`', 'select 1 as x']
+        destination_table_names = ['table_name_1', 'table_name_2']
+        ut.operators.operator.run_queries(
+            queries=queries,
+            destination_table_names=destination_table_names,
+            skip_unchanged=True)
+        report = ut.operators.operator.last_report
+        self.assertEqual(2, report['nb_jobs'])
+        self.assertEqual([], report['skipped'])
+
+        ut.operators.operator.run_queries(
+            queries=queries,
+            destination_table_names=destination_table_names,
+            skip_unchanged=True)
+        report = ut.operators.operator.last_report
+        self.assertEqual(0, report['nb_jobs'])
+        self.assertEqual(destination_table_names, report['skipped'])
+
+        ut.operators.operator.run_query(
+            query='select 4 as x',
+            destination_table_name='source_table_name')
+        ut.operators.operator.run_queries(
+            queries=queries,
+            destination_table_names=destination_table_names,
+            skip_unchanged=True)
+        report = ut.operators.operator.last_report
+        self.assertEqual(1, report['nb_jobs'])
+        self.assertEqual(['table_name_2'], report['skipped'])
+        computed = ut.load.dataset_to_dataframe('table_name_1')
+        self.assert_dataframe_equal(
+            pandas.DataFrame(data={'x': [4]}), computed)
+
+    def test_run_dependent_queries(self):
+        table_id_1 = ut.table.build_table_id('table_name_1')
+        table_id_2 = ut.table.build_table_id('table_name_2')
+        monitoring = ut.operators.operator.run_dependent_queries(
+            queries=[f'select x + 1 as x from `{table_id_2}`',
+                     f'select x + 1 as x from `{table_id_1}`',
+                     'select 1 as x'],
+            destination_table_names=[
+                'table_name_3', 'table_name_2', 'table_name_1'],
+            time_to_live=4)
+        self.assertEqual(['GB', 'duration'], sorted(monitoring.keys()))
+        report = ut.operators.operator.last_report
+        self.assertEqual(
+            [ut.table.build_table_id(n)
+             for n in ['table_name_3', 'table_name_2', 'table_name_1']],
+            [r['destination'] for r in report['jobs']])
+        computed = ut.load.dataset_to_dataframe('table_name_3')
+        self.assert_dataframe_equal(
+            pandas.DataFrame(data={'x': [3]}), computed)
+        self.assertIsNotNone(ut.table.get_table('table_name_3').expires)
+
+        ut.operators.operator.run_dependent_queries(
+            queries=['select 5 as x',
+                     f'select x + 1 as x from `{table_id_1}`'],
+            destination_table_names=['table_name_1', 'table_name_4'],
+            dependencies={'table_name_4': ['table_name_1']})
+        computed = ut.load.dataset_to_dataframe('table_name_4')
+        self.assert_dataframe_equal(
+            pandas.DataFrame(data={'x': [6]}), computed)
+
+    @ut.base_class.requires_bigquery
+    def test_backfill_partitions(self):
+        from datetime import date
+        ut.operators.operator.run_query(
+            query="""
+            select d, 0 as x
+            from unnest(generate_date_array('2024-01-01', '2024-01-03')) d
+            """,
+            destination_table_name='source_table_name')
+        job_config = bigquery.QueryJobConfig()
+        job_config.destination = ut.table.build_table_id('table_name')
+        job_config.time_partitioning = bigquery.TimePartitioning(field='d')
+        ut.constants.bq_client.query(
+            "select date '2024-01-01' as d, -1 as x",
+            job_config=job_config).result()
+        source_table_id = ut.table.build_table_id('source_table_name')
+        monitoring = ut.operators.operator.backfill(
+            query_template=(
+                f'select d, x + 1 as x from `{source_table_id}` '
+                "where d = '{partition}'"),
+            destination_table_name='table_name',
+            partitions=[date(2024, 1, 1), date(2024, 1, 2)],
+            time_to_live=2)
+        self.assertEqual(['GB', 'duration'], sorted(monitoring.keys()))
+        self.assertEqual(2, ut.operators.operator.last_report['nb_jobs'])
+        self.assertIsNotNone(ut.table.get_table('table_name').expires)
+        computed = ut.load.dataset_to_dataframe('table_name')
+        expected = pandas.DataFrame(
+            data={'d': [date(2024, 1, 1), date(2024, 1, 2)], 'x': [1, 1]})
+        self.assert_dataframe_equal(expected, computed)
+
+        ut.operators.operator.copy_table(
+            source_table_name='table_name$20240102',
+            destination_table_name='table_name$20240103')
+        ut.operators.operator.run_query(
+            query="select date '2024-01-01' as d, 5 as x",
+            destination_table_name=ut.operators.operator.build_partition_name(
+                'table_name', date(2024, 1, 1)))
+        computed = ut.load.dataset_to_dataframe('table_name')
+        self.assertEqual([5, 1, 1], list(computed.sort_values('d')['x']))
+
+    @ut.base_class.requires_bigquery
     def test_extract_tables(self):
         expected_1 = pandas.DataFrame(
             data={'x': [3], 'y': ['a']})
@@ -55,6 +267,42 @@ class JobsTest(ut.base_class.BaseClassTest):
         self.assert_dataframe_equal(expected_2, computed_2)
         ut.bucket.delete_bucket()
 
+    @ut.base_class.requires_bigquery
+    def test_extract_and_load_tables_with_columnar_formats(self):
+        expected = pandas.DataFrame(
+            data={'x': [3, 2], 'y': ['a', 'b']})
+        query = """
+        select 3 as x, 'a' as y union all select 2 as x, 'b' as y
+        """
+        ut.load.query_to_dataset(query, 'table_name')
+        ut.bucket.delete_bucket()
+        ut.bucket.create_bucket()
+        uri_1 = ut.bucket.build_bucket_uri('tmp/table_name-*.parquet')
+        uri_2 = ut.bucket.build_bucket_uri('tmp/table_name-*.avro')
+        ut.operators.operator.extract_tables(
+            source_table_names=['table_name'],
+            destination_uris=[uri_1],
+            compression=bigquery.Compression.SNAPPY,
+            destination_format='PARQUET')
+        ut.operators.operator.extract_table(
+            source_table_name='table_name',
+            destination_uri=uri_2,
+            compression=bigquery.Compression.DEFLATE,
+            destination_format='AVRO')
+        ut.operators.operator.load_table(
+            source_uri=uri_1,
+            destination_table_name='table_name_1',
+            source_format='PARQUET')
+        ut.operators.operator.load_table(
+            source_uri=uri_2,
+            destination_table_name='table_name_2',
+            source_format='AVRO')
+        for n in ['table_name_1', 'table_name_2']:
+            computed = ut.load.dataset_to_dataframe(n)
+            self.assert_dataframe_equal(expected, computed)
+        ut.bucket.delete_bucket()
+
+    @ut.base_class.requires_bigquery
     def test_load_tables(self):
         expected_1 = pandas.DataFrame(
             data={'x': [3], 'y': ['a']})
@@ -76,6 +324,38 @@ class JobsTest(ut.base_class.BaseClassTest):
         self.assert_dataframe_equal(expected_2, computed_2)
         ut.bucket.delete_bucket()
 
+    def test_load_local_data(self):
+        import os
+        import tempfile
+        import pyarrow
+        expected_1 = pandas.DataFrame(
+            data={'x': [3, 2, 1], 'y': ['a', 'b', 'c']})
+        expected_2 = pandas.DataFrame(data={'x': [1]})
+        ut.operators.operator.load_dataframes(
+            dataframes=[expected_1, expected_2],
+            destination_table_names=['table_name_1', 'table_name_2'],
+            time_to_live=2,
+            chunk_size=2)
+        ut.operators.operator.load_arrow(
+            table=pyarrow.Table.from_pandas(expected_1),
+            destination_table_name='table_name_3',
+            schema=[
+                bigquery.SchemaField('x', 'INTEGER'),
+                bigquery.SchemaField('y', 'STRING')],
+            chunk_size=1)
+        with tempfile.TemporaryDirectory() as dir_path:
+            file_path = os.path.join(dir_path, 'table_name_4.csv')
+            expected_1.to_csv(file_path, sep='|', index=False)
+            ut.operators.operator.load_file(
+                file_path=file_path,
+                destination_table_name='table_name_4')
+        for n in ['table_name_1', 'table_name_3', 'table_name_4']:
+            computed = ut.load.dataset_to_dataframe(n)
+            self.assert_dataframe_equal(expected_1, computed)
+        computed = ut.load.dataset_to_dataframe('table_name_2')
+        self.assert_dataframe_equal(expected_2, computed)
+        self.assertIsNotNone(ut.table.get_table('table_name_1').expires)
+
     def test_copy_tables(self):
         expected_1 = pandas.DataFrame(
             data={'x': [3], 'y': ['a']})
@@ -87,11 +367,84 @@ class JobsTest(ut.base_class.BaseClassTest):
         ut.operators.operator.copy_tables(
             source_table_names=['table_name_1', 'table_name_2'],
             destination_table_names=['copy_table_name_1', 'copy_table_name_2'])
+        report = ut.operators.operator.last_report
+        self.assertEqual(
+            ['copy', 'copy'], [r['job_type'] for r in report['jobs']])
         computed_1 = ut.load.dataset_to_dataframe('copy_table_name_1')
         computed_2 = ut.load.dataset_to_dataframe('copy_table_name_2')
         self.assert_dataframe_equal(expected_1, computed_1)
         self.assert_dataframe_equal(expected_2, computed_2)
 
+    def test_copy_tables_with_several_sources_and_operation_types(self):
+        ut.load.query_to_dataset('select 3 as x', 'shard_1')
+        ut.load.query_to_dataset('select 1 as x', 'shard_2')
+        ut.operators.operator.copy_tables(
+            source_table_names=[['shard_1', 'shard_2'], 'shard_1'],
+            destination_table_names=['table_name_1', 'table_name_2'])
+        computed = ut.load.dataset_to_dataframe('table_name_1')
+        self.assert_dataframe_equal(
+            pandas.DataFrame(data={'x': [3, 1]}), computed)
+
+        ut.operators.operator.copy_table(
+            source_table_name='table_name_1',
+            destination_table_name='clone_table_name',
+            operation_type='CLONE')
+        ut.operators.operator.copy_table(
+            source_table_name='table_name_1',
+            destination_table_name='snapshot_table_name',
+            time_to_live=2,
+            operation_type='SNAPSHOT')
+        self.assertEqual(
+            'TABLE', ut.table.get_table('clone_table_name').table_type)
+        snapshot_table = ut.table.get_table('snapshot_table_name')
+        self.assertEqual('SNAPSHOT', snapshot_table.table_type)
+        self.assertIsNotNone(snapshot_table.expires)
+        for n in ['clone_table_name', 'snapshot_table_name']:
+            computed = ut.load.dataset_to_dataframe(n)
+            self.assert_dataframe_equal(
+                pandas.DataFrame(data={'x': [3, 1]}), computed)
+
+    @ut.base_class.requires_bigquery
+    def test_copy_tables_incrementally(self):
+        job_config = bigquery.QueryJobConfig()
+        job_config.destination = ut.table.build_table_id('source_table_name')
+        job_config.time_partitioning = bigquery.TimePartitioning(field='d')
+        ut.constants.bq_client.query(
+            """
+            select d, 0 as x
+            from unnest(generate_date_array('2024-01-01', '2024-01-02')) d
+            """,
+            job_config=job_config).result()
+        ut.operators.operator.copy_table(
+            source_table_name='source_table_name',
+            destination_table_name='table_name',
+            incremental=True)
+        self.assertEqual(
+            ['table_name'], ut.operators.operator.last_report['copied'])
+
+        ut.operators.operator.run_query(
+            query="select date '2024-01-03' as d, 1 as x",
+            destination_table_name='source_table_name$20240103')
+        ut.operators.operator.copy_table(
+            source_table_name='source_table_name',
+            destination_table_name='table_name',
+            time_to_live=2,
+            incremental=True)
+        report = ut.operators.operator.last_report
+        self.assertEqual(['table_name$20240103'], report['copied'])
+        self.assertEqual(1, report['nb_jobs'])
+        self.assertIsNotNone(ut.table.get_table('table_name').expires)
+        computed = ut.load.dataset_to_dataframe('table_name')
+        self.assertEqual([0, 0, 1], list(computed.sort_values('d')['x']))
+
+        ut.operators.operator.copy_table(
+            source_table_name='source_table_name',
+            destination_table_name='table_name',
+            incremental=True)
+        report = ut.operators.operator.last_report
+        self.assertEqual([], report['copied'])
+        self.assertEqual(0, report['nb_jobs'])
+
     def test_run_query(self):
         expected = pandas.DataFrame(
             data={'x': [3, 2], 'y': ['a', 'b']})
@@ -110,6 +463,7 @@ class JobsTest(ut.base_class.BaseClassTest):
         computed = ut.load.dataset_to_dataframe('table_name')
         self.assert_dataframe_equal(expected, computed)
 
+    @ut.base_class.requires_bigquery
     def test_extract_table(self):
         expected = pandas.DataFrame(
             data={'x': [3, 2], 'y': ['a', 'b']})
@@ -129,6 +483,7 @@ class JobsTest(ut.base_class.BaseClassTest):
         self.assert_dataframe_equal(expected, computed)
         ut.bucket.delete_bucket()
 
+    @ut.base_class.requires_bigquery
     def test_load_table(self):
         expected = pandas.DataFrame(
             data={'x': [3, 2], 'y': ['a', 'b']})
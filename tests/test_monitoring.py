@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+from google.cloud import bigquery
+from bigquery_operator import monitoring
+
+
+def build_query_job(job_id, created, started, ended):
+    job_config = bigquery.QueryJobConfig()
+    job_config.destination = 'project_id.dataset_name.table_name'
+    job = bigquery.QueryJob(job_id, 'select 3', mock.MagicMock(), job_config)
+    job._properties['status'] = {'state': 'DONE'}
+    job._properties['statistics'] = {
+        'creationTime': created,
+        'startTime': started,
+        'endTime': ended,
+        'totalSlotMs': '20',
+        'query': {
+            'totalBytesProcessed': '1000',
+            'totalBytesBilled': '10485760',
+            'cacheHit': job_id == 'job_id_2'}}
+    return job
+
+
+class MonitoringTest(unittest.TestCase):
+    def test_build_job_report(self):
+        job = build_query_job('job_id_1', 1000, 1500, 4000)
+        computed = monitoring.build_job_report(job)
+        self.assertEqual('job_id_1', computed['job_id'])
+        self.assertEqual('query', computed['job_type'])
+        self.assertEqual(
+            'project_id.dataset_name.table_name', computed['destination'])
+        self.assertEqual(0.5, computed['queue_seconds'])
+        self.assertEqual(2.5, computed['run_seconds'])
+        self.assertEqual(20, computed['slot_millis'])
+        self.assertEqual(1000, computed['total_bytes_processed'])
+        self.assertEqual(10485760, computed['total_bytes_billed'])
+        self.assertFalse(computed['cache_hit'])
+        self.assertIsNone(computed['output_rows'])
+
+    def test_build_batch_report(self):
+        jobs = [build_query_job('job_id_1', 1000, 1500, 4000),
+                build_query_job('job_id_2', 2000, 2000, 2100)]
+        start = datetime.fromtimestamp(0.5, timezone.utc)
+        end = datetime.fromtimestamp(5, timezone.utc)
+        computed = monitoring.build_batch_report(jobs, start, end)
+        self.assertEqual(2, computed['nb_jobs'])
+        self.assertEqual(4.5, computed['duration'])
+        self.assertEqual(3, computed['longest_job_seconds'])
+        self.assertEqual(40, computed['total_slot_millis'])
+        self.assertEqual(2000, computed['total_bytes_processed'])
+        self.assertEqual(1, computed['nb_cache_hits'])
+        self.assertEqual(
+            ['job_id_1', 'job_id_2'], [r['job_id'] for r in computed['jobs']])
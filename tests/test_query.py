@@ -1,4 +1,5 @@
 import unittest
+import pandas
 from google.cloud import bigquery
 from tests import utils as ut
 
@@ -12,6 +13,25 @@ class QueryTest(unittest.TestCase):
             query='select 3', size=100)
         self.assertEqual(expected, computed)
 
+    def test_sample_query_with_window_and_hash(self):
+        expected = (
+            'select * except(_sample_count) from '
+            '(select *, count(*) over () as _sample_count from (select 3)) '
+            'where rand() < 100/_sample_count')
+        computed = ut.operators.operator.sample_query(
+            query='select 3', size=100, method='window')
+        self.assertEqual(expected, computed)
+
+        expected = (
+            'select * except(_sample_count) from '
+            '(select *, count(*) over () as _sample_count '
+            'from (select 3 as x)) '
+            'where abs(mod(farm_fingerprint(to_json_string(x)), 1000000)) '
+            '< 1000000*100/_sample_count')
+        computed = ut.operators.operator.sample_query(
+            query='select 3 as x', size=100, method='hash', key='x')
+        self.assertEqual(expected, computed)
+
     def test_get_query_rows(self):
         expected = [
             bigquery.Row((5, 'y'), {'a': 0, 'b': 1}),
@@ -21,3 +41,41 @@ class QueryTest(unittest.TestCase):
         """
         computed = ut.operators.operator_quick_setup.get_query_rows(query)
         self.assertEqual(expected, computed)
+
+    @ut.base_class.requires_bigquery
+    def test_get_query_rows_with_max_results(self):
+        query = 'select x from unnest(generate_array(1, 5)) as x'
+        computed = ut.operators.operator.get_query_rows(query, max_results=2)
+        self.assertEqual(2, len(computed))
+
+    @ut.base_class.requires_bigquery
+    def test_iter_query_rows(self):
+        query = 'select x from unnest(generate_array(1, 5)) as x'
+        batches = list(ut.operators.operator.iter_query_rows(
+            query, batch_size=3))
+        self.assertEqual([3, 2], [len(b) for b in batches])
+
+    def test_get_query_dataframe(self):
+        expected = pandas.DataFrame(data={'a': [5, 4], 'b': ['y', 'x']})
+        query = """
+        select 5 as a, 'y' as b union all select 4 as a, 'x' as b
+        """
+        computed = ut.operators.operator.get_query_dataframe(query)
+        ut.dataframe.assert_equal(expected, computed)
+        computed = ut.operators.operator.get_query_arrow(query)
+        self.assertEqual(['a', 'b'], computed.column_names)
+
+    @ut.base_class.requires_bigquery
+    def test_estimate_queries(self):
+        table_id = 'bigquery-public-data.samples.shakespeare'
+        queries = [f'select word from `{table_id}`', 'select 3 as x']
+        computed = ut.operators.operator.estimate_queries(queries)
+        self.assertEqual(2, len(computed))
+        self.assertTrue(computed[0]['bytes'] > 0)
+        self.assertEqual(computed[0]['bytes'] / 10 ** 9, computed[0]['GB'])
+        self.assertEqual([table_id], computed[0]['referenced_tables'])
+        self.assertEqual(['word'], [f.name for f in computed[0]['schema']])
+        self.assertEqual(0, computed[1]['bytes'])
+        self.assertEqual([], computed[1]['referenced_tables'])
+        self.assertEqual(
+            computed[1], ut.operators.operator.estimate_query(queries[1]))
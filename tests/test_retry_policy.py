@@ -0,0 +1,82 @@
+import unittest
+import bigquery_operator
+from unittest import mock
+from google.api_core.exceptions import BadRequest, Conflict, Forbidden, \
+    PreconditionFailed, ServiceUnavailable
+
+dataset_id = 'project_id.dataset_name'
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_is_retryable(self):
+        policy = bigquery_operator.RetryPolicy()
+        self.assertTrue(policy.is_retryable(PreconditionFailed('')))
+        self.assertTrue(policy.is_retryable(ServiceUnavailable('')))
+        self.assertTrue(policy.is_retryable(Forbidden(
+            '', errors=[{'reason': 'rateLimitExceeded'}])))
+        self.assertFalse(policy.is_retryable(Forbidden(
+            '', errors=[{'reason': 'accessDenied'}])))
+        self.assertFalse(policy.is_retryable(BadRequest('')))
+
+    def test_compute_delay(self):
+        policy = bigquery_operator.RetryPolicy(
+            initial_delay=1, multiplier=2, max_delay=5, jitter=False)
+        self.assertEqual(
+            [1, 2, 4, 5], [policy.compute_delay(a) for a in range(4)])
+        policy = bigquery_operator.RetryPolicy(
+            initial_delay=1, multiplier=2, max_delay=5)
+        for a in range(4):
+            self.assertTrue(0 <= policy.compute_delay(a) <= 5)
+
+    @mock.patch('bigquery_operator.retry_policy.time.sleep')
+    def test_call_retries_until_success(self, mock_sleep):
+        policy = bigquery_operator.RetryPolicy(jitter=False)
+        func = mock.MagicMock(
+            side_effect=[ServiceUnavailable(''), PreconditionFailed(''), 3])
+        self.assertEqual(3, policy.call(func, 'a', b='b'))
+        self.assertEqual(3, func.call_count)
+        func.assert_called_with('a', b='b')
+        self.assertEqual(
+            [mock.call(0.2), mock.call(0.4)], mock_sleep.call_args_list)
+
+    @mock.patch('bigquery_operator.retry_policy.time.sleep')
+    def test_call_raises_when_retries_exhausted(self, mock_sleep):
+        policy = bigquery_operator.RetryPolicy(max_elapsed=1, jitter=False)
+        func = mock.MagicMock(side_effect=ServiceUnavailable(''))
+        with self.assertRaises(ServiceUnavailable):
+            policy.call(func)
+        self.assertEqual(4, func.call_count)
+
+        func = mock.MagicMock(side_effect=BadRequest(''))
+        with self.assertRaises(BadRequest):
+            policy.call(func)
+        self.assertEqual(1, func.call_count)
+
+
+class OperatorWithRetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.operator = bigquery_operator.Operator(
+            client=self.client,
+            dataset_id=dataset_id,
+            retry_policy=bigquery_operator.RetryPolicy(initial_delay=0.01))
+
+    def test_set_time_to_live_fetches_table_again_after_failure(self):
+        self.client.get_table.side_effect = [
+            mock.MagicMock(), mock.MagicMock()]
+        self.client.update_table.side_effect = [PreconditionFailed(''), None]
+        self.operator.set_time_to_live('table_name', 3)
+        self.assertEqual(2, self.client.get_table.call_count)
+        self.assertEqual(2, self.client.update_table.call_count)
+
+    def test_job_submission_reuses_job_id(self):
+        job = mock.MagicMock()
+        self.client.query.side_effect = [ServiceUnavailable(''), Conflict('')]
+        self.client.get_job.return_value = job
+        computed = self.operator._query_job(
+            'select 3', 'table_name', 'WRITE_TRUNCATE')
+        self.assertEqual(job, computed)
+        job_ids = [c.kwargs['job_id']
+                   for c in self.client.query.call_args_list]
+        self.assertEqual(job_ids[0], job_ids[1])
+        self.client.get_job.assert_called_once_with(job_ids[0])
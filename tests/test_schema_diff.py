@@ -0,0 +1,76 @@
+import unittest
+from google.cloud import bigquery
+from bigquery_operator import schema_diff
+
+
+def build_format(schema, **kwargs):
+    res = {'schema': schema, 'time_partitioning': None,
+           'range_partitioning': None, 'require_partition_filter': None,
+           'clustering_fields': None}
+    res.update(kwargs)
+    return res
+
+
+class SchemaDiffTest(unittest.TestCase):
+    def test_compatible_changes(self):
+        table = [
+            bigquery.SchemaField('a', 'INTEGER', mode='REQUIRED'),
+            bigquery.SchemaField('b', 'INT64'),
+            bigquery.SchemaField('r', 'RECORD', fields=[
+                bigquery.SchemaField('x', 'STRING')])]
+        reference = [
+            bigquery.SchemaField('a', 'INTEGER', description='desc'),
+            bigquery.SchemaField('b', 'NUMERIC'),
+            bigquery.SchemaField('r', 'RECORD', fields=[
+                bigquery.SchemaField('x', 'STRING'),
+                bigquery.SchemaField('y', 'DATE')]),
+            bigquery.SchemaField('c', 'STRING', mode='REPEATED')]
+        changes = schema_diff.diff_format_attributes(
+            build_format(reference, require_partition_filter=True),
+            build_format(table))
+        computed = [(c['kind'], c['field']) for c in changes]
+        expected = [('relaxed_column', 'a'),
+                    ('changed_description', 'a'),
+                    ('widened_type', 'b'),
+                    ('added_column', 'r.y'),
+                    ('added_column', 'c'),
+                    ('changed_require_partition_filter', None)]
+        self.assertEqual(expected, computed)
+        self.assertTrue(schema_diff.is_compatible(changes))
+        self.assertEqual(
+            'alter table `p.d.t` alter column `b` set data type NUMERIC',
+            schema_diff.build_alter_statement('p.d.t', changes))
+
+    def test_incompatible_changes(self):
+        table = [
+            bigquery.SchemaField('a', 'STRING'),
+            bigquery.SchemaField('b', 'FLOAT'),
+            bigquery.SchemaField('c', 'INTEGER'),
+            bigquery.SchemaField('r', 'RECORD', fields=[
+                bigquery.SchemaField('x', 'INTEGER')])]
+        reference = [
+            bigquery.SchemaField('b', 'INTEGER'),
+            bigquery.SchemaField('a', 'STRING'),
+            bigquery.SchemaField('r', 'RECORD', fields=[
+                bigquery.SchemaField('x', 'NUMERIC')]),
+            bigquery.SchemaField('d', 'STRING', mode='REQUIRED')]
+        changes = schema_diff.diff_format_attributes(
+            build_format(reference, clustering_fields=['a']),
+            build_format(table))
+        computed = [(c['kind'], c['field']) for c in changes]
+        expected = [('reordered_columns', None),
+                    ('removed_column', 'c'),
+                    ('changed_type', 'b'),
+                    ('changed_type', 'r.x'),
+                    ('added_required_column', 'd'),
+                    ('changed_clustering_fields', None)]
+        self.assertEqual(expected, computed)
+        self.assertFalse(schema_diff.is_compatible(changes))
+        self.assertIsNone(schema_diff.build_alter_statement('p.d.t', []))
+
+    def test_same_format_attributes(self):
+        schema = [bigquery.SchemaField('a', 'INT64')]
+        self.assertEqual([], schema_diff.diff_format_attributes(
+            build_format(schema, clustering_fields=['a']),
+            build_format([bigquery.SchemaField('a', 'INTEGER')],
+                         clustering_fields=['a'])))
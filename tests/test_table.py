@@ -1,4 +1,5 @@
 import unittest
+import pandas
 from google.cloud import bigquery
 from tests import utils as ut
 
@@ -82,6 +83,47 @@ class TableWithApiCallsTest(ut.base_class.BaseClassTest):
         self.assertTrue(ut.table.table_exists('table_name_2'))
         self.assertFalse(ut.table.table_exists('table_name_3'))
 
+    def test_delete_table_if_mismatches_with_schema_evolution(self):
+        ut.operators.operator.create_empty_table(
+            table_name='table_name_1',
+            schema=[bigquery.SchemaField('a', 'STRING'),
+                    bigquery.SchemaField('b', 'NUMERIC'),
+                    bigquery.SchemaField('c', 'DATE')],
+            clustering_fields=['a'])
+        for n in ['table_name_2', 'table_name_3']:
+            ut.operators.operator.create_empty_table(
+                table_name=n,
+                schema=[bigquery.SchemaField('a', 'STRING', mode='REQUIRED'),
+                        bigquery.SchemaField('b', 'INTEGER')],
+                clustering_fields=['a'])
+        table_id = ut.table.build_table_id('table_name_2')
+        ut.constants.bq_client.query(
+            f"insert into `{table_id}` values ('x', 1)").result()
+        ut.operators.operator.create_empty_table(
+            table_name='table_name_4',
+            schema=[bigquery.SchemaField('a', 'STRING'),
+                    bigquery.SchemaField('b', 'NUMERIC')],
+            clustering_fields=['b'])
+
+        changes = ut.operators.operator.diff_format_attributes(
+            'table_name_1', 'table_name_2')
+        self.assertEqual(
+            ['relaxed_column', 'widened_type', 'added_column'],
+            [c['kind'] for c in changes])
+        ut.operators.operator.delete_table_if_mismatches(
+            'table_name_1', 'table_name_2', evolve_schema=True)
+        ut.operators.operator.delete_table_if_mismatches(
+            'table_name_1', 'table_name_3')
+        ut.operators.operator.delete_table_if_mismatches(
+            'table_name_1', 'table_name_4', evolve_schema=True)
+
+        self.assertEqual(
+            ut.table.get_table('table_name_1').schema,
+            ut.table.get_table('table_name_2').schema)
+        self.assertEqual(1, ut.table.get_table('table_name_2').num_rows)
+        self.assertFalse(ut.table.table_exists('table_name_3'))
+        self.assertFalse(ut.table.table_exists('table_name_4'))
+
     def test_create_empty_table(self):
         schema = [
             bigquery.SchemaField('a', 'STRING'),
@@ -155,6 +197,41 @@ class TableWithApiCallsTest(ut.base_class.BaseClassTest):
             'table_name')
         self.assertEqual(expected, computed)
 
+    def test_get_table_rows_with_selected_fields(self):
+        expected = [bigquery.Row(('y',), {'b': 0})]
+        query = """
+        select 3 as a, 'y' as b union all select 4 as a, 'x' as b
+        """
+        ut.load.query_to_dataset(query, 'table_name')
+        computed = ut.operators.operator.get_table_rows(
+            'table_name', selected_fields=['b'], max_results=1)
+        self.assertEqual(1, len(computed))
+        self.assertEqual(list(expected[0].keys()), list(computed[0].keys()))
+
+    @ut.base_class.requires_bigquery
+    def test_iter_table_rows(self):
+        query = 'select x from unnest(generate_array(1, 5)) as x'
+        ut.load.query_to_dataset(query, 'table_name')
+        batches = list(ut.operators.operator.iter_table_rows(
+            'table_name', batch_size=2))
+        self.assertEqual([2, 2, 1], [len(b) for b in batches])
+        self.assertEqual(
+            [1, 2, 3, 4, 5], sorted(r['x'] for b in batches for r in b))
+
+    def test_get_table_dataframe(self):
+        expected = pandas.DataFrame(data={'a': [3, 4]})
+        query = """
+        select 3 as a, 'y' as b union all select 4 as a, 'x' as b
+        """
+        ut.load.query_to_dataset(query, 'table_name')
+        computed = ut.operators.operator.get_table_dataframe(
+            'table_name', selected_fields=['a'])
+        self.assert_dataframe_equal(expected, computed)
+        computed = ut.operators.operator.get_table_arrow('table_name')
+        self.assertEqual(['a', 'b'], computed.column_names)
+        self.assertEqual(2, computed.num_rows)
+
+    @ut.base_class.requires_bigquery
     def test_get_format_attributes(self):
         schema = [
             bigquery.SchemaField('a', 'STRING'),
@@ -200,6 +277,19 @@ class TableWithApiCallsTest(ut.base_class.BaseClassTest):
         computed = ut.operators.operator.get_format_attributes('table_name_2')
         self.assertEqual(expected, computed)
 
+    @ut.base_class.requires_bigquery
+    def test_get_tables_metadata(self):
+        ut.table.create_empty_table('table_name_1')
+        ut.load.query_to_dataset("select 3 as a, 'x' as b", 'table_name_2')
+        computed = ut.operators.operator.get_tables_metadata(
+            ['table_name_1', 'table_name_2', 'table_name_3'])
+        self.assertEqual(['table_name_1', 'table_name_2'], sorted(computed))
+        metadata = computed['table_name_2']
+        self.assertEqual('BASE TABLE', metadata['table_type'])
+        self.assertEqual(['a', 'b'], metadata['columns'])
+        self.assertEqual(['INT64', 'STRING'], metadata['data_types'])
+        self.assertEqual([], computed['table_name_1']['columns'])
+
     def test_set_time_to_live(self):
         from datetime import datetime, timedelta, timezone
         expected = (
@@ -211,3 +301,18 @@ class TableWithApiCallsTest(ut.base_class.BaseClassTest):
         ut.operators.operator_quick_setup.set_time_to_live('table_name', 3)
         computed = ut.table.get_table('table_name').expires
         self.assertEqual(expected, computed)
+
+    def test_set_times_to_live(self):
+        from datetime import datetime, timedelta, timezone
+        expected = (
+                datetime.now(timezone.utc) +
+                timedelta(days=2 + 1)).date()
+        expected = datetime.combine(
+            expected, datetime.min.time(), tzinfo=timezone.utc)
+        for n in ['table_name_1', 'table_name_2']:
+            ut.table.create_empty_table(n)
+        ut.operators.operator.set_time_to_live('table_name_1', 2)
+        ut.operators.operator.set_times_to_live(
+            ['table_name_1', 'table_name_2'], 2)
+        for n in ['table_name_1', 'table_name_2']:
+            self.assertEqual(expected, ut.table.get_table(n).expires)
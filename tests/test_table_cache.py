@@ -0,0 +1,96 @@
+import unittest
+import bigquery_operator
+from unittest import mock
+from google.cloud import bigquery, exceptions
+
+dataset_id = 'project_id.dataset_name'
+
+
+class TableCacheTest(unittest.TestCase):
+    def test_raise_error_if_arguments_not_positive(self):
+        with self.assertRaises(ValueError) as cm:
+            bigquery_operator.TableCache(ttl=0)
+        self.assertEqual('ttl must be positive', str(cm.exception))
+        with self.assertRaises(ValueError) as cm:
+            bigquery_operator.TableCache(max_size=0)
+        self.assertEqual(
+            'max_size must be a positive integer', str(cm.exception))
+
+    def test_get_set_invalidate(self):
+        cache = bigquery_operator.TableCache()
+        table = bigquery.Table('p.d.t')
+        with self.assertRaises(KeyError):
+            cache.get('p.d.t')
+        cache.set('p.d.t', table)
+        cache.set('p.d.u', None)
+        self.assertEqual(table, cache.get('p.d.t'))
+        self.assertIsNot(table, cache.get('p.d.t'))
+        self.assertIsNone(cache.get('p.d.u'))
+        cache.invalidate('p.d.t')
+        with self.assertRaises(KeyError):
+            cache.get('p.d.t')
+        cache.invalidate_dataset('p.d')
+        self.assertEqual(0, len(cache))
+
+    @mock.patch('bigquery_operator.table_cache.time.monotonic')
+    def test_entries_expire(self, mock_monotonic):
+        cache = bigquery_operator.TableCache(ttl=10)
+        mock_monotonic.return_value = 100
+        cache.set('p.d.t', bigquery.Table('p.d.t'))
+        mock_monotonic.return_value = 109
+        cache.get('p.d.t')
+        mock_monotonic.return_value = 110
+        with self.assertRaises(KeyError):
+            cache.get('p.d.t')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = bigquery_operator.TableCache(max_size=2)
+        for n in ['t_1', 't_2']:
+            cache.set(f'p.d.{n}', bigquery.Table(f'p.d.{n}'))
+        cache.get('p.d.t_1')
+        cache.set('p.d.t_3', bigquery.Table('p.d.t_3'))
+        cache.get('p.d.t_1')
+        cache.get('p.d.t_3')
+        with self.assertRaises(KeyError):
+            cache.get('p.d.t_2')
+
+
+class OperatorWithTableCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = mock.MagicMock()
+        self.table = bigquery.Table(f'{dataset_id}.table_name')
+        self.table.schema = [bigquery.SchemaField('a', 'STRING')]
+
+        def get_table(table_id):
+            if table_id == self.table.table_id:
+                return self.table
+            raise exceptions.NotFound(table_id)
+
+        self.client.get_table.side_effect = \
+            lambda table_id: get_table(table_id.split('.')[-1])
+        self.operator = bigquery_operator.Operator(
+            client=self.client,
+            dataset_id=dataset_id,
+            table_cache=bigquery_operator.TableCache())
+
+    def test_getters_share_one_api_call(self):
+        o = self.operator
+        self.assertTrue(o.table_exists('table_name'))
+        self.assertEqual(['a'], o.get_columns('table_name'))
+        o.get_format_attributes('table_name')
+        o.delete_table_if_mismatches('table_name', 'table_name')
+        self.assertEqual(1, self.client.get_table.call_count)
+
+        self.assertFalse(o.table_exists('table_name_1'))
+        self.assertFalse(o.table_exists('table_name_1'))
+        self.assertEqual(2, self.client.get_table.call_count)
+
+    def test_writes_invalidate_entries(self):
+        o = self.operator
+        o.get_table('table_name')
+        o.delete_table('table_name')
+        o.get_table('table_name')
+        self.assertEqual(2, self.client.get_table.call_count)
+        o.create_view('select 3', 'table_name')
+        o.get_table('table_name')
+        self.assertEqual(3, self.client.get_table.call_count)
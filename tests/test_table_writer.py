@@ -0,0 +1,135 @@
+import threading
+import time
+import unittest
+import bigquery_operator
+from unittest import mock
+from google.api_core.exceptions import BadRequest, ServiceUnavailable
+from google.cloud import bigquery
+
+dataset_id = 'project_id.dataset_name'
+
+
+class FakeInsertClient:
+    def __init__(self, side_effects=None, delay=0):
+        self.side_effects = list(side_effects or [])
+        self.delay = delay
+        self.rows = {}
+        self.nb_calls = 0
+        self.nb_running = 0
+        self.max_nb_running = 0
+        self.lock = threading.Lock()
+
+    def insert_rows(self, table, rows, row_ids):
+        with self.lock:
+            self.nb_calls += 1
+            self.nb_running += 1
+            self.max_nb_running = max(self.max_nb_running, self.nb_running)
+            side_effect = None
+            if self.side_effects:
+                side_effect = self.side_effects.pop(0)
+        time.sleep(self.delay)
+        with self.lock:
+            self.nb_running -= 1
+            if isinstance(side_effect, Exception):
+                raise side_effect
+            if side_effect is not None:
+                return side_effect
+            for row_id, row in zip(row_ids, rows):
+                self.rows[row_id] = row
+        return []
+
+
+class TableWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.table = bigquery.Table(f'{dataset_id}.table_name')
+
+    def build_writer(self, client, **kwargs):
+        return bigquery_operator.TableWriter(
+            client=client,
+            table=self.table,
+            retry_policy=bigquery_operator.RetryPolicy(initial_delay=0.01),
+            **kwargs)
+
+    def test_raise_error_if_arguments_not_positive(self):
+        with self.assertRaises(ValueError) as cm:
+            self.build_writer(FakeInsertClient(), batch_size=0)
+        self.assertEqual(
+            'batch_size must be a positive integer', str(cm.exception))
+        with self.assertRaises(ValueError) as cm:
+            self.build_writer(FakeInsertClient(), flush_interval=0)
+        self.assertEqual('flush_interval must be positive', str(cm.exception))
+
+    def test_rows_are_sent_by_batches(self):
+        client = FakeInsertClient(delay=0.05)
+        with self.build_writer(
+                client, batch_size=10, max_pending_batches=2) as writer:
+            writer.write_rows({'x': i} for i in range(95))
+            self.assertTrue(client.max_nb_running <= 2)
+        self.assertEqual(95, writer.nb_committed_rows)
+        self.assertEqual(10, client.nb_calls)
+        self.assertEqual(
+            list(range(95)), sorted(r['x'] for r in client.rows.values()))
+
+    def test_buffer_is_flushed_after_interval(self):
+        client = FakeInsertClient()
+        writer = self.build_writer(client, flush_interval=0.05)
+        writer.write_rows([{'x': 1}])
+        time.sleep(0.3)
+        self.assertEqual(1, writer.nb_committed_rows)
+        self.assertEqual(1, writer.close())
+        self.assertEqual(1, writer.close())
+
+    def test_flush_waits_for_batch_blocked_in_flusher(self):
+        client = FakeInsertClient(delay=0.3)
+        writer = self.build_writer(
+            client, flush_interval=0.05, max_pending_batches=1)
+        writer.write_rows([{'x': 1}])
+        time.sleep(0.1)
+        writer.write_rows([{'x': 2}])
+        time.sleep(0.1)
+        writer.flush()
+        self.assertEqual(2, len(client.rows))
+        self.assertEqual(2, writer.close())
+
+    def test_transient_errors_are_retried_with_same_ids(self):
+        client = FakeInsertClient(side_effects=[ServiceUnavailable('')])
+        with mock.patch.object(
+                client, 'insert_rows', wraps=client.insert_rows) as m:
+            writer = self.build_writer(client)
+            writer.write_rows([{'x': 1}, {'x': 2}])
+            self.assertEqual(2, writer.close())
+        self.assertEqual(2, m.call_count)
+        self.assertEqual(
+            m.call_args_list[0].kwargs['row_ids'],
+            m.call_args_list[1].kwargs['row_ids'])
+
+    def test_raise_error_if_rows_rejected(self):
+        client = FakeInsertClient(
+            side_effects=[[{'index': 0, 'errors': ['invalid']}]])
+        writer = self.build_writer(client)
+        writer.write_rows([{'x': 1}])
+        with self.assertRaises(BadRequest):
+            writer.close()
+        self.assertEqual(0, writer.nb_committed_rows)
+        with self.assertRaises(ValueError) as cm:
+            writer.write_rows([{'x': 2}])
+        self.assertEqual('the writer is closed', str(cm.exception))
+
+    def test_operator_table_writer(self):
+        client = mock.MagicMock()
+        client.get_table.return_value = self.table
+        client.insert_rows.return_value = []
+        operator = bigquery_operator.Operator(
+            client=client,
+            dataset_id=dataset_id,
+            max_workers=3,
+            table_cache=bigquery_operator.TableCache())
+        with operator.table_writer('table_name', batch_size=2) as writer:
+            self.assertEqual(3, writer.max_pending_batches)
+            self.assertEqual(self.table.table_id,
+                             writer.table_id.split('.')[-1])
+            writer.write_rows([{'x': 1}, {'x': 2}, {'x': 3}])
+        self.assertEqual(3, writer.nb_committed_rows)
+        self.assertEqual(2, client.insert_rows.call_count)
+        operator.get_table('table_name')
+        self.assertEqual(2, client.get_table.call_count)
@@ -1,5 +1,10 @@
 import unittest
-from tests.utils import dataframe, dataset
+from tests.utils import constants, dataframe, dataset
+
+# Skips the tests which need BigQuery SQL, INFORMATION_SCHEMA or Cloud
+# Storage when the tests run against a FakeClient.
+requires_bigquery = unittest.skipIf(
+    constants.use_fake_client, 'requires BigQuery or Cloud Storage')
 
 
 class BaseClassTest(unittest.TestCase):
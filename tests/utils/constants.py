@@ -1,5 +1,7 @@
+import os
 from google.cloud import bigquery
 from google.cloud import storage
+from bigquery_operator import FakeClient
 
 
 project_id = 'dmp-y-tests'
@@ -7,9 +9,17 @@ dataset_name = 'test_bq_operator'
 dataset_id = f'{project_id}.{dataset_name}'
 dataset_location = 'EU'
 bucket_name = 'bucket_bq_operator'
-bq_client = bigquery.Client(project=project_id)
-gs_client = storage.Client(project=project_id)
-bucket = gs_client.bucket(bucket_name)
 bucket_location = 'EU'
 credentials = None
 field_delimiter = '|'
+# If set, the tests run against a FakeClient and need no credentials. The
+# tests which need BigQuery or Cloud Storage are then skipped.
+use_fake_client = bool(os.environ.get('BIGQUERY_OPERATOR_FAKE_CLIENT'))
+if use_fake_client:
+    bq_client = FakeClient(project=project_id, location=dataset_location)
+    gs_client = None
+    bucket = None
+else:
+    bq_client = bigquery.Client(project=project_id)
+    gs_client = storage.Client(project=project_id)
+    bucket = gs_client.bucket(bucket_name)
@@ -1,3 +1,5 @@
+from contextlib import nullcontext
+from unittest import mock
 from bigquery_operator import Operator, OperatorQuickSetup
 from tests.utils import constants
 
@@ -5,6 +7,12 @@ operator = Operator(
     client=constants.bq_client,
     dataset_id=constants.dataset_id)
 
-operator_quick_setup = OperatorQuickSetup(
-    project_id=constants.project_id,
-    dataset_name=constants.dataset_name)
+# OperatorQuickSetup builds its own client, replaced by the FakeClient.
+client_patch = nullcontext()
+if constants.use_fake_client:
+    client_patch = mock.patch(
+        'google.cloud.bigquery.Client', return_value=constants.bq_client)
+with client_patch:
+    operator_quick_setup = OperatorQuickSetup(
+        project_id=constants.project_id,
+        dataset_name=constants.dataset_name)